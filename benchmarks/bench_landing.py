@@ -0,0 +1,454 @@
+"""
+Benchmark harness for the request path (DBData -> DBLogic -> templates).
+
+Seed a local stand-in `summary` table, then drive the app either in-process
+through the Flask test client or through a real gunicorn instance:
+
+    export DB_HOST=localhost DB_NAME=volva_bench DB_USERNAME=... DB_PASSWORD=...
+    python benchmarks/bench_landing.py seed --countries 20 --scans 365
+    python benchmarks/bench_landing.py run --mode client --requests 500
+    python benchmarks/bench_landing.py run --mode gunicorn --workers 4 --concurrency 16
+
+The app connects with the same DB_* variables as in production, so point them at
+a local database. DB_HOST must be set explicitly: both commands refuse to run without
+it or against the production host, since `seed` drops and recreates `summary` and
+`run --cold` sends every request to the database.
+
+Reported per run: p50/p95/p99 latency, throughput, database round trips per request
+(from the server's transaction counter; every app query runs in autocommit mode so
+it is one transaction) and resident memory per worker.
+"""
+import argparse
+import contextlib
+import http.client
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import psycopg2
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRODUCTION_HOST = '130.208.246.143'
+
+SCHEMA = """
+    DROP TABLE IF EXISTS summary;
+    CREATE TABLE summary (
+        id                  serial PRIMARY KEY,
+        country             text NOT NULL,
+        total_ips_scanned   bigint,
+        total_ips_active    bigint,
+        total_ports_scanned bigint,
+        total_ports_open    bigint,
+        open_ports_count    jsonb,
+        services_count      jsonb,
+        versions_count      jsonb,
+        os_count            jsonb,
+        products_count      jsonb,
+        cpe_count           jsonb,
+        port_scan_done_ts   timestamp
+    );
+    CREATE INDEX summary_country_ts_idx ON summary (country, port_scan_done_ts DESC);
+"""
+
+# One row per (country, scan); breakdown maps are generated server-side per row
+SEED_ROWS = """
+    INSERT INTO summary (
+        country, total_ips_scanned, total_ips_active, total_ports_scanned, total_ports_open,
+        open_ports_count, services_count, versions_count, os_count, products_count, cpe_count,
+        port_scan_done_ts
+    )
+    SELECT
+        c.code,
+        100000 + (random() * 10000)::int,
+        20000 + (random() * 5000)::int,
+        1000,
+        (random() * 50000)::int,
+        (SELECT jsonb_object_agg(k::text, (random() * 10000)::int)
+            FROM generate_series(1, %(ports)s) k WHERE s.n > 0),
+        (SELECT jsonb_object_agg('service-' || k, (random() * 10000)::int)
+            FROM generate_series(1, %(keys)s) k WHERE s.n > 0),
+        (SELECT jsonb_object_agg('version-' || k, (random() * 10000)::int)
+            FROM generate_series(1, %(keys)s) k WHERE s.n > 0),
+        (SELECT jsonb_object_agg('os-' || k, (random() * 10000)::int)
+            FROM generate_series(1, 50) k WHERE s.n > 0),
+        (SELECT jsonb_object_agg('product-' || k, (random() * 10000)::int)
+            FROM generate_series(1, %(keys)s) k WHERE s.n > 0),
+        (SELECT jsonb_object_agg('cpe:/a:vendor:product-' || k, (random() * 10000)::int)
+            FROM generate_series(1, %(cpe_keys)s) k WHERE s.n > 0),
+        timestamp '2025-01-01' + s.n * interval '1 day'
+    FROM unnest(%(codes)s::text[]) AS c(code)
+    CROSS JOIN generate_series(1, %(scans)s) AS s(n);
+"""
+
+
+def benchmark_host():
+    """
+    The database host to benchmark against, from DB_HOST.
+
+    The app falls back to the production host when DB_HOST is unset, so the variable
+    is required here rather than defaulted.
+
+    Returns:
+        str: DB_HOST.
+    """
+    host = os.environ.get('DB_HOST')
+    if not host:
+        sys.exit("DB_HOST is not set; point it at a local Postgres")
+    if host == PRODUCTION_HOST:
+        sys.exit("refusing to benchmark the production database; point DB_HOST at a local Postgres")
+    return host
+
+
+def db_connect():
+    """
+    Connect to the benchmark database with the app's DB_* environment variables.
+
+    Returns:
+        connection (psycopg2.connection): Autocommit connection.
+    """
+    conn = psycopg2.connect(
+        host=benchmark_host(),
+        database=os.environ.get('DB_NAME', 'volva_bench'),
+        user=os.environ['DB_USERNAME'],
+        password=os.environ.get('DB_PASSWORD', '')
+    )
+    conn.autocommit = True
+    return conn
+
+
+def country_codes(count):
+    """
+    Generate distinct two-letter country codes, starting with the ones the site links to.
+
+    Args:
+        count (int): Number of codes.
+
+    Returns:
+        list[str]: Country codes.
+    """
+    codes = ['IS', 'GL', 'FO']
+    for first in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
+        for second in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
+            if len(codes) >= count:
+                return codes[:count]
+            if first + second not in codes:
+                codes.append(first + second)
+    return codes[:count]
+
+
+def seed(args):
+    """Create and fill the stand-in summary table."""
+    codes = country_codes(args.countries)
+    started = time.perf_counter()
+    with contextlib.closing(db_connect()) as conn, conn.cursor() as cur:
+        cur.execute(SCHEMA)
+        for code in codes:
+            cur.execute(SEED_ROWS, {
+                'codes': [code], 'scans': args.scans, 'keys': args.keys,
+                'cpe_keys': args.cpe_keys, 'ports': args.ports
+            })
+        cur.execute("ANALYZE summary")
+        cur.execute("SELECT pg_size_pretty(pg_total_relation_size('summary'))")
+        size = cur.fetchone()[0]
+    print(f"seeded {len(codes)} countries x {args.scans} scans ({size}) in {time.perf_counter() - started:.1f}s")
+
+
+def transaction_count(stats_delay):
+    """
+    Read the database's committed + rolled back transaction counter.
+
+    Args:
+        stats_delay (float): Seconds to wait first. Idle backends (such as pooled app
+            connections) flush their statistics at most every 10 seconds.
+
+    Returns:
+        int: Transactions recorded so far, excluding this lookup.
+    """
+    time.sleep(stats_delay)
+    with contextlib.closing(db_connect()) as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT xact_commit + xact_rollback
+            FROM pg_stat_database
+            WHERE datname = current_database()
+        """)
+        return cur.fetchone()[0]
+
+
+def benchmark_paths(args):
+    """
+    Build the list of URL paths to request, cycling through every seeded country.
+
+    Returns:
+        list[str]: URL paths.
+    """
+    with contextlib.closing(db_connect()) as conn, conn.cursor() as cur:
+        cur.execute("SELECT DISTINCT country FROM summary ORDER BY country")
+        codes = [row[0] for row in cur.fetchall()]
+    paths = []
+    for code in codes:
+        paths.append(f"/{code}")
+        paths.extend(path.format(country=code) for path in args.api_path or [])
+    return paths
+
+
+def app_environment(args):
+    """
+    Environment for the app under test.
+
+    Returns:
+        dict: Environment variables.
+    """
+    env = dict(os.environ)
+    # The same database the benchmark reads from, never the app's production defaults
+    env['DB_HOST'] = benchmark_host()
+    env['DB_NAME'] = os.environ.get('DB_NAME', 'volva_bench')
+    env['SHARED_CACHE_DIR'] = tempfile.mkdtemp(prefix='volva-bench-cache-')
+    if args.cold:
+        # Zero-sized caches evict every entry immediately, so each request hits the database
+        env['LANDING_CACHE_SIZE'] = '0'
+        env['SHARED_CACHE_SIZE'] = '0'
+    return env
+
+
+def rss_kb(pid):
+    """
+    Resident set size of a process.
+
+    Args:
+        pid (int): Process ID.
+
+    Returns:
+        int: RSS in kB, or 0 if unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def child_pids(pid):
+    """
+    Direct children of a process (the gunicorn workers of a master).
+
+    Args:
+        pid (int): Parent process ID.
+
+    Returns:
+        list[int]: Child process IDs.
+    """
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def run_load(send, paths, total, concurrency):
+    """
+    Issue requests from a number of threads and record each latency.
+
+    Args:
+        send (callable): Sends one request for a path and returns its status code.
+        paths (list[str]): Paths to cycle through.
+        total (int): Total number of requests.
+        concurrency (int): Number of client threads.
+
+    Returns:
+        tuple: (latencies in seconds, wall time in seconds, error count)
+    """
+    latencies = []
+    errors = []
+    counter = iter(range(total))
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            started = time.perf_counter()
+            status = send(paths[index % len(paths)])
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if status >= 400:
+                    errors.append(status)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - started, len(errors)
+
+
+def run_client(args, paths):
+    """Benchmark the app in-process through the Flask test client."""
+    os.environ.update(app_environment(args))
+    sys.path.insert(0, PROJECT_ROOT)
+    from src.static.app import app
+
+    client = app.test_client()
+
+    def send(path):
+        return client.get(path, follow_redirects=True).status_code
+
+    for path in paths[:args.warmup]:
+        send(path)
+    before = transaction_count(args.stats_delay)
+    latencies, wall, errors = run_load(send, paths, args.requests, args.concurrency)
+    round_trips = transaction_count(args.stats_delay) - before - 1
+    return latencies, wall, errors, round_trips, [rss_kb(os.getpid())]
+
+
+def wait_for_port(port, timeout=30.0):
+    """Wait until something accepts connections on localhost:port."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    sys.exit(f"gunicorn did not start listening on port {port}")
+
+
+def run_gunicorn(args, paths):
+    """Benchmark the app through a real gunicorn instance, configured as in production."""
+    # The production settings (gthread workers, warm-up hook); only workers and bind are overridden
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'src/static/gunicorn_conf.py', '--workers', str(args.workers),
+         '--bind', f"127.0.0.1:{args.port}", 'src.static.app:app'],
+        cwd=PROJECT_ROOT, env=app_environment(args)
+    )
+    try:
+        wait_for_port(args.port)
+        local = threading.local()
+
+        def send(path):
+            if not hasattr(local, 'conn'):
+                local.conn = http.client.HTTPConnection('127.0.0.1', args.port, timeout=60)
+            try:
+                local.conn.request('GET', path)
+                response = local.conn.getresponse()
+                response.read()
+                return response.status
+            except (OSError, http.client.HTTPException):
+                local.conn.close()
+                del local.conn
+                return 599
+
+        for path in paths[:args.warmup]:
+            send(path)
+        before = transaction_count(args.stats_delay)
+        latencies, wall, errors = run_load(send, paths, args.requests, args.concurrency)
+        round_trips = transaction_count(args.stats_delay) - before - 1
+        memory = [rss_kb(pid) for pid in child_pids(server.pid)]
+        return latencies, wall, errors, round_trips, memory
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values (list[float]): Sorted values.
+        pct (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile value.
+    """
+    index = max(0, min(len(values) - 1, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def run(args):
+    """Run a benchmark and report its results."""
+    paths = benchmark_paths(args)
+    if not paths:
+        sys.exit("summary table is empty; run `seed` first")
+
+    runner = run_client if args.mode == 'client' else run_gunicorn
+    latencies, wall, errors, round_trips, memory = runner(args, paths)
+    latencies.sort()
+
+    report = {
+        'mode': args.mode,
+        'cold': args.cold,
+        'requests': len(latencies),
+        'errors': errors,
+        'concurrency': args.concurrency,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'throughput_rps': len(latencies) / wall,
+        'db_round_trips_per_request': round_trips / len(latencies),
+        'rss_mb_per_worker': [round(kb / 1024, 1) for kb in memory]
+    }
+
+    for key, value in report.items():
+        print(f"{key:>28}: {round(value, 2) if isinstance(value, float) else value}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the Volva request path.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = sub.add_parser('seed', help="create and fill the stand-in summary table")
+    seed_parser.add_argument('--countries', type=int, default=10)
+    seed_parser.add_argument('--scans', type=int, default=100, help="scan rows per country")
+    seed_parser.add_argument('--keys', type=int, default=500, help="entries per service/version/product map")
+    seed_parser.add_argument('--cpe-keys', type=int, default=5000, help="entries per CPE map")
+    seed_parser.add_argument('--ports', type=int, default=1000, help="entries per open ports map")
+    seed_parser.set_defaults(func=seed)
+
+    run_parser = sub.add_parser('run', help="drive the app and report latency, throughput and DB load")
+    run_parser.add_argument('--mode', choices=('client', 'gunicorn'), default='client')
+    run_parser.add_argument('--requests', type=int, default=300)
+    run_parser.add_argument('--concurrency', type=int, default=1)
+    run_parser.add_argument('--warmup', type=int, default=10, help="untimed requests before measuring")
+    run_parser.add_argument('--workers', type=int, default=4, help="gunicorn workers")
+    run_parser.add_argument('--port', type=int, default=8765, help="gunicorn port")
+    run_parser.add_argument('--cold', action='store_true', help="disable the response and shared caches")
+    run_parser.add_argument('--api-path', action='append',
+                            help="extra path per country, e.g. /api/v1/{country}/top (repeatable)")
+    run_parser.add_argument('--stats-delay', type=float, default=11,
+                            help="seconds to wait for Postgres statistics before counting round trips")
+    run_parser.add_argument('--json', help="also write the report to this file")
+    run_parser.set_defaults(func=run)
+
+    args = parser.parse_args()
+    benchmark_host()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
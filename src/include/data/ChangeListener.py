@@ -0,0 +1,101 @@
+import select
+import threading
+
+import psycopg2
+from psycopg2 import sql
+
+from .Metrics import metrics
+
+
+class ChangeListener:
+    """
+    Background subscriber to a Postgres notification channel.
+
+    Holds one dedicated connection (outside the pool, since ``LISTEN`` is tied to
+    its session) and calls ``on_change`` with the payload of every notification.
+    A lost connection is reopened after ``reconnect_delay`` seconds; because
+    notifications sent in the meantime are lost, ``on_reconnect`` is called once
+    listening again so callers can drop everything they cached.
+
+    Attributes:
+        channel (str): Notification channel name.
+        reconnect_delay (float): Seconds to wait before reconnecting.
+        ping_interval (float): Idle seconds after which the connection is checked with ``SELECT 1``.
+    """
+
+    def __init__(self, connect, channel, on_change, on_reconnect=None, reconnect_delay=5.0, ping_interval=60.0):
+        """
+        Initialize the listener without connecting yet.
+
+        Args:
+            connect (callable): Factory returning a new psycopg2 connection or None on failure.
+            channel (str): Notification channel to ``LISTEN`` on.
+            on_change (callable): Called with each notification's payload (str).
+            on_reconnect (callable, optional): Called after listening resumes on a new connection.
+            reconnect_delay (float): Seconds to wait before reconnecting.
+            ping_interval (float): Idle seconds between connection checks.
+        """
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.ping_interval = ping_interval
+        self.__connect = connect
+        self.__on_change = on_change
+        self.__on_reconnect = on_reconnect
+        self.__stopped = threading.Event()
+        self.__thread = None
+
+    def start(self):
+        """Start listening in a daemon thread. Calling it again while running does nothing."""
+        if self.__thread is not None and self.__thread.is_alive():
+            return
+        self.__stopped.clear()
+        self.__thread = threading.Thread(target=self.__run, name=f"listen-{self.channel}", daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """Stop listening. The connection is closed within ``ping_interval`` seconds."""
+        self.__stopped.set()
+
+    def __run(self):
+        """Connect, listen and dispatch notifications until stopped."""
+        listened_before = False
+        while not self.__stopped.is_set():
+            conn = self.__connect()
+            if conn is not None:
+                try:
+                    conn.autocommit = True
+                    with conn.cursor() as cur:
+                        cur.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+                    if listened_before:
+                        self.__dispatch(self.__on_reconnect)
+                    listened_before = True
+                    self.__listen(conn)
+                except psycopg2.Error as e:
+                    print(f"[DB ERROR] change listener lost its connection: {e}")
+                finally:
+                    conn.close()
+            self.__stopped.wait(self.reconnect_delay)
+
+    def __listen(self, conn):
+        """Wait for notifications on an open connection until it fails or the listener stops."""
+        while not self.__stopped.is_set():
+            readable, _, _ = select.select([conn], [], [], self.ping_interval)
+            if not readable:
+                # Nothing arrived for a while: make sure the connection is still alive
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                continue
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                metrics.inc('volva_db_notifications_total', channel=self.channel)
+                self.__dispatch(self.__on_change, notify.payload)
+
+    def __dispatch(self, callback, *args):
+        """Run a callback, logging instead of raising so the listener keeps running."""
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"[DB ERROR] change listener callback failed: {e}")
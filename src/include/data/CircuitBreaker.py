@@ -0,0 +1,90 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Stops calls to the database after repeated connection failures.
+
+    While closed, every request is allowed. After ``failure_threshold`` failures
+    in a row the breaker opens and rejects requests immediately. Once
+    ``reset_timeout`` seconds have passed it goes half-open and lets a single
+    probe request through: success closes the breaker, failure opens it again.
+
+    Attributes:
+        failure_threshold (int): Consecutive failures before the breaker opens.
+        reset_timeout (float): Seconds to stay open before probing for recovery.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures before opening.
+            reset_timeout (float): Seconds before a half-open probe is allowed.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.__state = self.CLOSED
+        self.__failures = 0
+        self.__opened_at = 0.0
+        self.__probe_started_at = 0.0
+        self.__lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        Get the current breaker state.
+
+        Returns:
+            str: One of ``CLOSED``, ``OPEN`` or ``HALF_OPEN``.
+        """
+        return self.__state
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a database call may be attempted now.
+
+        Returns:
+            bool: True if the call may go ahead, False if it should fail fast.
+        """
+        with self.__lock:
+            if self.__state == self.CLOSED:
+                return True
+
+            now = time.monotonic()
+            if self.__state == self.OPEN:
+                if now - self.__opened_at < self.reset_timeout:
+                    return False
+                self.__state = self.HALF_OPEN
+                self.__probe_started_at = now
+                return True
+
+            # Half-open: only one probe at a time, unless the last one never reported back
+            if now - self.__probe_started_at >= self.reset_timeout:
+                self.__probe_started_at = now
+                return True
+            return False
+
+    def record_success(self):
+        """Record a successful call and close the breaker."""
+        with self.__lock:
+            if self.__state != self.CLOSED:
+                print("[DB INFO] database reachable again, closing circuit breaker")
+            self.__state = self.CLOSED
+            self.__failures = 0
+
+    def record_failure(self):
+        """Record a failed call, opening the breaker if the threshold is reached."""
+        with self.__lock:
+            self.__failures += 1
+            if self.__state == self.HALF_OPEN or self.__failures >= self.failure_threshold:
+                if self.__state != self.OPEN:
+                    print(f"[DB ERROR] opening circuit breaker after {self.__failures} failures")
+                self.__state = self.OPEN
+                self.__opened_at = time.monotonic()
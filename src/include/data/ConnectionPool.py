@@ -0,0 +1,257 @@
+import threading
+import time
+
+from psycopg2 import extensions
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection became free within the checkout timeout."""
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of reusable PostgreSQL connections for a single worker process.
+
+    Connections are opened lazily through the given factory, handed out up to
+    ``max_size`` at a time and returned to the pool instead of being closed.
+    Idle connections above ``min_size`` are closed once they have been unused
+    for longer than ``max_idle`` seconds.
+
+    Attributes:
+        min_size (int): Number of idle connections kept open when reaping.
+        max_size (int): Maximum number of connections open at the same time.
+        checkout_timeout (float): Seconds to wait for a free connection.
+        max_idle (float): Seconds an idle connection may live before it is reaped.
+        health_check_interval (float): Idle seconds after which a connection is pinged on checkout.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=5, checkout_timeout=5.0,
+                 max_idle=300.0, health_check_interval=30.0):
+        """
+        Initialize the pool. No connection is opened until the first checkout.
+
+        Args:
+            connect (callable): Factory returning a new psycopg2 connection or None on failure.
+            min_size (int): Idle connections to keep when reaping.
+            max_size (int): Upper bound on open connections.
+            checkout_timeout (float): Seconds to wait for a connection before giving up.
+            max_idle (float): Seconds before an idle connection above min_size is closed.
+            health_check_interval (float): Idle seconds after which checkout runs ``SELECT 1``.
+        """
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.checkout_timeout = checkout_timeout
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+
+        self.__connect = connect
+        self.__idle = []  # (connection, last_used) pairs, most recently used last
+        self.__size = 0
+        # Bumped by close_all; connections checked out in an earlier generation are closed on release
+        self.__generation = 0
+        self.__checked_out = {}  # connection -> generation it was checked out in
+        self.__condition = threading.Condition()
+        self.__reaper = None
+
+    def acquire(self):
+        """
+        Check a healthy connection out of the pool, opening a new one if allowed.
+
+        A pool that is merely exhausted raises instead of returning None, so callers can
+        tell a busy pool apart from a database that cannot be reached.
+
+        Returns:
+            connection (psycopg2.connection): DB connection object or None if connecting failed.
+
+        Raises:
+            PoolTimeout: Every connection stayed checked out for ``checkout_timeout`` seconds.
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            conn, last_used = self.__checkout(deadline)
+            if conn is None and last_used is None:
+                print("[DB ERROR] timed out waiting for a pooled connection")
+                raise PoolTimeout(f"no connection free after {self.checkout_timeout}s")
+
+            if conn is None:
+                # A slot was reserved for us: open a fresh connection
+                conn = self.__connect()
+                if conn is None:
+                    self.__discard(None)
+                    return None
+                conn.autocommit = True
+                self.__start_reaper()
+                return self.__check_out(conn)
+
+            if self.__is_healthy(conn, last_used):
+                return self.__check_out(conn)
+            self.__discard(conn)
+
+    def release(self, conn):
+        """
+        Return a connection to the pool, closing it if it is no longer usable.
+
+        Args:
+            conn (psycopg2.connection): Connection previously returned by ``acquire``.
+        """
+        with self.__condition:
+            generation = self.__checked_out.pop(conn, None)
+        if conn.closed or generation != self.__generation:
+            self.__discard(conn)
+            return
+
+        if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except Exception:
+                self.__discard(conn)
+                return
+
+        with self.__condition:
+            self.__idle.append((conn, time.monotonic()))
+            self.__condition.notify()
+
+    def prefill(self):
+        """
+        Open connections until ``min_size`` are idle, so the first queries skip the connect handshake.
+
+        Returns:
+            int: Number of idle connections afterwards, which is lower than ``min_size`` if connecting failed.
+        """
+        held = []
+        try:
+            for _ in range(self.min_size):
+                try:
+                    conn = self.acquire()
+                except PoolTimeout:
+                    break
+                if conn is None:
+                    break
+                held.append(conn)
+        finally:
+            for conn in held:
+                self.release(conn)
+        return len(held)
+
+    def close_all(self):
+        """Close every idle connection. Connections currently checked out are closed on release."""
+        with self.__condition:
+            self.__generation += 1
+            idle, self.__idle = self.__idle, []
+            self.__size -= len(idle)
+            self.__condition.notify_all()
+        for conn, _ in idle:
+            self.__close(conn)
+
+    def reap_idle(self):
+        """Close idle connections above ``min_size`` that have exceeded ``max_idle``."""
+        now = time.monotonic()
+        expired = []
+        with self.__condition:
+            keep = []
+            # Oldest entries come first, so those are reaped before recently used ones
+            for conn, last_used in self.__idle:
+                idle_count = len(self.__idle) - len(expired)
+                if now - last_used > self.max_idle and idle_count > self.min_size:
+                    expired.append(conn)
+                else:
+                    keep.append((conn, last_used))
+            self.__idle = keep
+            self.__size -= len(expired)
+            if expired:
+                self.__condition.notify_all()
+        for conn in expired:
+            self.__close(conn)
+
+    def __checkout(self, deadline):
+        """
+        Take an idle connection or reserve a slot for a new one, waiting until the deadline.
+
+        Returns:
+            tuple: (connection, last_used) for an idle connection, (None, 0) for a reserved
+            slot, or (None, None) on timeout.
+        """
+        with self.__condition:
+            while True:
+                if self.__idle:
+                    return self.__idle.pop()
+                if self.__size < self.max_size:
+                    self.__size += 1
+                    return None, 0
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None, None
+                self.__condition.wait(remaining)
+
+    def __check_out(self, conn):
+        """
+        Record a connection as checked out in the current generation.
+
+        Args:
+            conn (psycopg2.connection): Connection being handed out.
+
+        Returns:
+            connection (psycopg2.connection): The same connection.
+        """
+        with self.__condition:
+            self.__checked_out[conn] = self.__generation
+        return conn
+
+    def __is_healthy(self, conn, last_used):
+        """
+        Check that an idle connection is still usable, pinging it if it sat idle for a while.
+
+        Args:
+            conn (psycopg2.connection): Connection to check.
+            last_used (float): Monotonic time the connection was returned to the pool.
+
+        Returns:
+            bool: True if the connection can be handed out.
+        """
+        if conn.closed or conn.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    def __discard(self, conn):
+        """
+        Close a connection and free its slot in the pool.
+
+        Args:
+            conn (psycopg2.connection): Connection to close, or None if it was never opened.
+        """
+        if conn is not None:
+            self.__close(conn)
+        with self.__condition:
+            self.__size -= 1
+            self.__condition.notify()
+
+    def __close(self, conn):
+        """Close a connection, ignoring errors from connections that are already broken."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def __start_reaper(self):
+        """Start the background thread that periodically reaps idle connections."""
+        if self.__reaper is not None:
+            return
+        with self.__condition:
+            if self.__reaper is not None:
+                return
+            self.__reaper = threading.Thread(target=self.__reap_forever, name="db-pool-reaper", daemon=True)
+            self.__reaper.start()
+
+    def __reap_forever(self):
+        """Reaper thread loop."""
+        interval = max(self.max_idle / 2, 1.0)
+        while True:
+            time.sleep(interval)
+            self.reap_idle()
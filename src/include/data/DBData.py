@@ -1,57 +1,198 @@
+import copy
 import os
+import time
 import psycopg2
 
+from .ChangeListener import ChangeListener
+from .CircuitBreaker import CircuitBreaker
+from .ConnectionPool import ConnectionPool, PoolTimeout
+from .Metrics import metrics, record_span
+from ..models.countrySummaryModel import CountrySummaryModel
+
+# Bucket sizes accepted by get_open_ports_history; 'scan' returns every scan unaggregated
+HISTORY_GRANULARITIES = ('scan', 'day', 'week', 'month')
+
+# jsonb breakdown columns of the summary table, mapping a name to its occurrence count
+BREAKDOWN_COLUMNS = ('open_ports_count', 'services_count', 'versions_count', 'os_count', 'products_count', 'cpe_count')
+
+# Bucket sizes kept in the summary_rollup table
+ROLLUP_GRANULARITIES = ('day', 'week', 'month')
+# Summary ids below the watermark that every rollup run looks at again. A row whose
+# transaction got its id before the last run but committed after it is not skipped as
+# long as fewer rows than this were inserted in between.
+ROLLUP_ID_OVERLAP = 1000
+
+# Per-country aggregates of the summary counters, maintained by `update_rollups`
+ROLLUP_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS summary_rollup (
+        country text NOT NULL,
+        granularity text NOT NULL CHECK (granularity IN ('day', 'week', 'month')),
+        bucket timestamp NOT NULL,
+        scans integer NOT NULL,
+        total_ips_scanned bigint,
+        total_ips_active bigint,
+        total_ports_scanned bigint,
+        total_ports_open bigint,
+        max_ports_open bigint,
+        last_scan_ts timestamp NOT NULL,
+        PRIMARY KEY (country, granularity, bucket)
+    );
+    CREATE TABLE IF NOT EXISTS summary_rollup_state (
+        id integer PRIMARY KEY CHECK (id = 1),
+        last_summary_id integer NOT NULL
+    );
+    INSERT INTO summary_rollup_state (id, last_summary_id) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+    CREATE INDEX IF NOT EXISTS summary_country_scan_ts ON summary (country, port_scan_done_ts);
+"""
+
+# Channel the summary trigger notifies with the changed row's country code as payload
+NOTIFY_CHANNEL = 'summary_changed'
+
+# Trigger announcing every write to the summary table on NOTIFY_CHANNEL
+CHANGE_NOTIFY_SCHEMA = f"""
+    CREATE OR REPLACE FUNCTION volva_notify_summary_change() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM pg_notify('{NOTIFY_CHANNEL}', OLD.country);
+        ELSE
+            PERFORM pg_notify('{NOTIFY_CHANNEL}', NEW.country);
+        END IF;
+        RETURN NULL;
+    END;
+    $$;
+    DROP TRIGGER IF EXISTS summary_changed ON summary;
+    CREATE TRIGGER summary_changed
+        AFTER INSERT OR UPDATE OR DELETE ON summary
+        FOR EACH ROW EXECUTE FUNCTION volva_notify_summary_change();
+"""
+
+
+def _top_k_sql(column, source='latest'):
+    """
+    Build a scalar subquery returning the `k` largest entries of a jsonb breakdown column.
+
+    The entries are ranked by Postgres and returned as a json object in descending
+    order, so only `k` pairs are sent to and parsed by the app. The limit is read from
+    the ``<column>_k`` query parameter.
+
+    Args:
+        column (str): One of ``BREAKDOWN_COLUMNS``.
+        source (str): Relation the column is read from.
+
+    Returns:
+        str: SQL expression.
+    """
+    if column not in BREAKDOWN_COLUMNS:
+        raise ValueError(f"unknown breakdown column {column!r}")
+    return f"""(
+        SELECT json_object_agg(key, value ORDER BY value DESC, key)
+        FROM (
+            SELECT key, value
+            FROM jsonb_each({source}.{column})
+            ORDER BY value DESC, key
+            LIMIT %({column}_k)s
+        ) AS top
+    )"""
+
 
 class DBData:
     """Handles database interactions for querying scanning summary data."""
 
     def __init__(self):
-        """Initialize configuration values."""
+        """Initialize configuration values, the (lazily connected) connection pool and the circuit breaker."""
+        # Entries of each breakdown returned when the caller does not ask for a specific number
         self.max_multi_cell_values = 5
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.environ.get('DB_BREAKER_THRESHOLD', 3)),
+            reset_timeout=float(os.environ.get('DB_BREAKER_RESET', 30))
+        )
+        # Last successfully fetched snapshot per country, served while the database is unreachable
+        self.__last_good_summaries = {}
+        # Whether the summary_rollup table exists; None until checked
+        self.__has_rollups = None
+        # Background subscriber to NOTIFY_CHANNEL, started by listen_for_changes
+        self.listener = None
+        self.pool = ConnectionPool(
+            self.get_db_connection,
+            min_size=int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+            max_size=int(os.environ.get('DB_POOL_MAX_SIZE', 5)),
+            checkout_timeout=float(os.environ.get('DB_POOL_TIMEOUT', 5)),
+            max_idle=float(os.environ.get('DB_POOL_MAX_IDLE', 300))
+        )
+
+    def prefill_pool(self):
+        """
+        Open the pool's minimum number of connections ahead of the first request.
+
+        Returns:
+            int: Number of idle connections in the pool.
+        """
+        return self.pool.prefill()
+
+    def listen_for_changes(self, on_change, on_reconnect=None):
+        """
+        Start a background listener for writes to the summary table.
+
+        Requires the trigger created by ``create_change_trigger``. Only one listener is
+        started per instance; later calls return the running one.
+
+        Args:
+            on_change (callable): Called with the country code of every changed summary row.
+            on_reconnect (callable, optional): Called when listening resumes after a lost
+                connection, since notifications sent in between were missed.
+
+        Returns:
+            ChangeListener: The running listener.
+        """
+        if self.listener is None:
+            self.listener = ChangeListener(
+                self.get_db_connection,
+                NOTIFY_CHANNEL,
+                on_change,
+                on_reconnect,
+                reconnect_delay=float(os.environ.get('DB_LISTEN_RECONNECT', 5))
+            )
+            self.listener.start()
+        return self.listener
 
     def get_db_connection(self):
         """
-        Establish a connection to the PostgreSQL database using environment credentials.
+        Establish a new connection to the PostgreSQL database using environment credentials.
+
+        Used by the connection pool to open connections; queries should go through ``self.pool``.
 
         Returns:
             connection (psycopg2.connection): DB connection object or None on failure.
         """
         try:
             return psycopg2.connect(
-                host='130.208.246.143',
-                database='scandb',
+                host=os.environ.get('DB_HOST', '130.208.246.143'),
+                database=os.environ.get('DB_NAME', 'scandb'),
                 user=os.environ['DB_USERNAME'],
                 password=os.environ['DB_PASSWORD'],
-                connect_timeout=5
+                connect_timeout=int(os.environ.get('DB_CONNECT_TIMEOUT', 5))
             )
         except psycopg2.OperationalError as e:
             print(f"[DB ERROR] could not connect to database: {e}")
             return None
 
-    def __send_graph_query(self, query):
+    def __send_graph_query(self, query, params=None, name='graph'):
         """
         Execute a query that returns date and count pairs for graph plotting.
 
         Args:
             query (str): SQL query string.
+            params (dict or tuple, optional): Query parameters passed to the driver.
+            name (str): Query name used in metrics and traces.
 
         Returns:
             tuple: (labels: list[str], values: list[int]) or None on failure.
         """
-        conn = self.get_db_connection()
-        if conn is None:
+        rows = self.__send_simple_query(query, params, name)
+        if rows is None:
             return None
 
-        try:
-            cur = conn.cursor()
-            cur.execute(query)
-            rows = cur.fetchall()
-        except Exception as e:
-            print(f"[DB ERROR] query failed: {e}")
-            return None
-        finally:
-            conn.close()
-
         labels = []
         values = []
         for dt, count in rows:
@@ -60,30 +201,107 @@ class DBData:
 
         return labels, values
 
-    def __send_simple_query(self, query):
+    def __send_simple_query(self, query, params=None, name='query'):
         """
-        Execute a query and return all fetched rows.
+        Execute a query and return all fetched rows, recording its timing and row count.
 
         Args:
             query (str): SQL query string.
+            params (dict or tuple, optional): Query parameters passed to the driver.
+            name (str): Query name used in metrics and traces.
 
         Returns:
             list[tuple]: Query results or None on failure.
         """
-        conn = self.get_db_connection()
+        # Fail fast instead of waiting on connect timeouts while the database is down
+        if not self.breaker.allow_request():
+            metrics.inc('volva_db_query_errors_total', query=name, reason='breaker_open')
+            return None
+
+        started = time.perf_counter()
+        try:
+            conn = self.pool.acquire()
+        except PoolTimeout:
+            # A busy pool says nothing about the database, so the breaker is left alone
+            metrics.observe('volva_db_acquire_seconds', time.perf_counter() - started)
+            metrics.inc('volva_db_query_errors_total', query=name, reason='pool_timeout')
+            return None
+        acquire_seconds = time.perf_counter() - started
+        metrics.observe('volva_db_acquire_seconds', acquire_seconds)
         if conn is None:
+            self.breaker.record_failure()
+            metrics.inc('volva_db_query_errors_total', query=name, reason='no_connection')
             return None
 
+        started = time.perf_counter()
+        rows = None
         try:
             cur = conn.cursor()
-            cur.execute(query)
-            rows = cur.fetchall()
+            cur.execute(query, params)
+            # Statements without a result set (DDL, plain updates) return no rows
+            rows = cur.fetchall() if cur.description is not None else []
+            self.breaker.record_success()
             return rows
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            print(f"[DB ERROR] connection lost during query: {e}")
+            self.breaker.record_failure()
+            metrics.inc('volva_db_query_errors_total', query=name, reason='connection_lost')
+            return None
         except Exception as e:
             print(f"[DB ERROR] query failed: {e}")
+            self.breaker.record_success()
+            metrics.inc('volva_db_query_errors_total', query=name, reason='query_failed')
             return None
         finally:
-            conn.close()
+            self.pool.release(conn)
+            query_seconds = time.perf_counter() - started
+            row_count = len(rows) if rows is not None else 0
+            metrics.observe('volva_db_query_seconds', query_seconds, query=name)
+            metrics.inc('volva_db_rows_total', row_count, query=name)
+            record_span('query', name, query_seconds,
+                        acquire_ms=round(acquire_seconds * 1000, 3), rows=row_count)
+
+    def __top_k_params(self, top_k=None):
+        """
+        Build the ``<column>_k`` query parameters used by ``_top_k_sql``.
+
+        Args:
+            top_k (dict, optional): Entries to keep per breakdown column.
+
+        Returns:
+            dict: Parameter name -> limit.
+        """
+        top_k = top_k or {}
+        return {f"{column}_k": top_k.get(column, self.max_multi_cell_values) for column in BREAKDOWN_COLUMNS}
+
+    def __get_top_entries(self, country_code, column, k=None):
+        """
+        Get the largest entries of one breakdown column from the latest scan of a country.
+
+        Args:
+            country_code (str): Country code.
+            column (str): One of ``BREAKDOWN_COLUMNS``.
+            k (int, optional): Entries to keep. Defaults to ``max_multi_cell_values``.
+
+        Returns:
+            dict or int: Name -> count, highest first, or -1 on failure.
+        """
+        query = f"""
+            WITH latest AS (
+                SELECT {column}
+                FROM summary
+                WHERE country = %(country)s
+                ORDER BY port_scan_done_ts DESC NULLS LAST, id DESC
+                LIMIT 1
+            )
+            SELECT {_top_k_sql(column)}
+            FROM latest;
+        """
+        params = {'country': country_code, **self.__top_k_params({column: k} if k is not None else None)}
+        try:
+            return self.__send_simple_query(query, params, name=column)[0][0] or {}
+        except Exception:
+            return -1
 
     def get_country_codes(self):
         """
@@ -95,12 +313,247 @@ class DBData:
         query = """
             SELECT DISTINCT country FROM summary
         """
-        raw_results = self.__send_simple_query(query)
+        raw_results = self.__send_simple_query(query, name='country_codes')
         if raw_results is None:
             return None
 
         return [country[0] for country in raw_results]
 
+    def get_last_scan_ts(self, country_code):
+        """
+        Get when the latest port scan for a country finished.
+
+        Args:
+            country_code (str): Country code.
+
+        Returns:
+            datetime or None: Completion time of the latest scan, or None if unknown or on failure.
+        """
+        query = """
+            SELECT max(port_scan_done_ts)
+            FROM summary
+            WHERE country = %(country)s;
+        """
+        rows = self.__send_simple_query(query, {'country': country_code}, name='last_scan_ts')
+        if not rows:
+            return None
+        return rows[0][0]
+
+    def get_country_summary(self, country_code, top_k=None):
+        """
+        Get every summary counter and the open ports time series for a country in one query.
+
+        The counters come from the most recent scan row; the time series covers the
+        same last 10 scans as ``get_total_open_ports_plot``. Breakdowns are cut down to
+        their largest entries inside Postgres, so the full maps never leave the database.
+
+        Args:
+            country_code (str): Country code.
+            top_k (dict, optional): Entries to keep per column of ``BREAKDOWN_COLUMNS``.
+                Missing columns keep ``max_multi_cell_values`` entries.
+
+        Returns:
+            CountrySummaryModel or None: Snapshot of the country, the last known good
+            snapshot if the database cannot be reached, or None on failure.
+        """
+        query = f"""
+            WITH latest AS (
+                SELECT
+                    total_ips_scanned, total_ips_active, total_ports_scanned,
+                    total_ports_open, open_ports_count, services_count,
+                    versions_count, os_count, products_count, cpe_count,
+                    port_scan_done_ts
+                FROM summary
+                WHERE country = %(country)s
+                ORDER BY port_scan_done_ts DESC NULLS LAST, id DESC
+                LIMIT 1
+            ), history AS (
+                SELECT
+                    port_scan_done_ts::date AS done_date,
+                    total_ports_open AS open_ports
+                FROM summary
+                WHERE
+                    total_ports_open IS NOT NULL AND
+                    port_scan_done_ts IS NOT NULL AND
+                    country = %(country)s
+                ORDER BY port_scan_done_ts DESC
+                LIMIT 10
+            )
+            SELECT
+                latest.total_ips_scanned, latest.total_ips_active, latest.total_ports_scanned,
+                latest.total_ports_open,
+                {_top_k_sql('open_ports_count')},
+                {_top_k_sql('services_count')},
+                {_top_k_sql('versions_count')},
+                {_top_k_sql('os_count')},
+                {_top_k_sql('products_count')},
+                {_top_k_sql('cpe_count')},
+                latest.port_scan_done_ts,
+                (SELECT array_agg(done_date ORDER BY done_date) FROM history),
+                (SELECT array_agg(open_ports ORDER BY done_date) FROM history)
+            FROM latest;
+        """
+        params = {'country': country_code, **self.__top_k_params(top_k)}
+        rows = self.__send_simple_query(query, params, name='country_summary')
+        if rows is None:
+            last_good = self.__last_good_summaries.get(country_code)
+            return self.__fallback_copy(last_good) if last_good is not None else None
+        if not rows:
+            return None
+
+        summary = self.__summary_from_row(country_code, rows[0])
+        self.__last_good_summaries[country_code] = summary
+        return copy.copy(summary)
+
+    def get_country_summaries(self, country_codes, top_k=None):
+        """
+        Get the snapshots of several countries in one query.
+
+        Every country is looked up with the same index walks as ``get_country_summary``
+        (one ``LATERAL`` join per code), so the cost grows with the number of countries
+        but the database is only visited once however many are asked for.
+
+        Args:
+            country_codes (list[str]): Country codes.
+            top_k (dict, optional): Entries to keep per column of ``BREAKDOWN_COLUMNS``.
+
+        Returns:
+            dict or None: Country code -> CountrySummaryModel for every code that has
+            scans. If the database cannot be reached, the last known good snapshots are
+            returned instead, marked with ``is_fallback``, or None if there are none.
+        """
+        codes = list(dict.fromkeys(country_codes))
+        if not codes:
+            return {}
+        query = f"""
+            SELECT
+                codes.country,
+                latest.total_ips_scanned, latest.total_ips_active, latest.total_ports_scanned,
+                latest.total_ports_open,
+                {_top_k_sql('open_ports_count')},
+                {_top_k_sql('services_count')},
+                {_top_k_sql('versions_count')},
+                {_top_k_sql('os_count')},
+                {_top_k_sql('products_count')},
+                {_top_k_sql('cpe_count')},
+                latest.port_scan_done_ts,
+                history.dates,
+                history.open_ports
+            FROM unnest(%(countries)s::text[]) AS codes(country)
+            CROSS JOIN LATERAL (
+                SELECT
+                    total_ips_scanned, total_ips_active, total_ports_scanned,
+                    total_ports_open, open_ports_count, services_count,
+                    versions_count, os_count, products_count, cpe_count,
+                    port_scan_done_ts
+                FROM summary
+                WHERE country = codes.country
+                ORDER BY port_scan_done_ts DESC NULLS LAST, id DESC
+                LIMIT 1
+            ) AS latest
+            CROSS JOIN LATERAL (
+                SELECT
+                    array_agg(done_date ORDER BY done_date) AS dates,
+                    array_agg(open_ports ORDER BY done_date) AS open_ports
+                FROM (
+                    SELECT
+                        port_scan_done_ts::date AS done_date,
+                        total_ports_open AS open_ports
+                    FROM summary
+                    WHERE
+                        total_ports_open IS NOT NULL AND
+                        port_scan_done_ts IS NOT NULL AND
+                        country = codes.country
+                    ORDER BY port_scan_done_ts DESC
+                    LIMIT 10
+                ) AS recent
+            ) AS history;
+        """
+        params = {'countries': codes, **self.__top_k_params(top_k)}
+        rows = self.__send_simple_query(query, params, name='country_summaries')
+        if rows is None:
+            last_good = {code: self.__fallback_copy(self.__last_good_summaries[code])
+                         for code in codes if code in self.__last_good_summaries}
+            return last_good or None
+
+        summaries = {}
+        for row in rows:
+            summary = self.__summary_from_row(row[0], row[1:])
+            self.__last_good_summaries[row[0]] = summary
+            summaries[row[0]] = copy.copy(summary)
+        return summaries
+
+    def __fallback_copy(self, summary):
+        """
+        Copy a last known good snapshot, marked so callers do not cache it as fresh.
+
+        Args:
+            summary (CountrySummaryModel): Snapshot from an earlier successful query.
+
+        Returns:
+            CountrySummaryModel: Shallow copy with ``is_fallback`` set.
+        """
+        fallback = copy.copy(summary)
+        fallback.is_fallback = True
+        return fallback
+
+    def __summary_from_row(self, country_code, row):
+        """
+        Build a CountrySummaryModel from a row of the summary queries.
+
+        Args:
+            country_code (str): Country code.
+            row (tuple): Counters, breakdowns, scan time, history dates and values.
+
+        Returns:
+            CountrySummaryModel: Snapshot of the country.
+        """
+        (ips_scanned, ips_active, ports_scanned, ports_open, open_ports, services,
+         versions, os_count, products, cpe, done_ts, dates, values) = row
+
+        return CountrySummaryModel(
+            country_code,
+            ips_scanned,
+            ips_active,
+            ports_scanned,
+            ports_open,
+            open_ports,
+            services,
+            versions,
+            os_count,
+            products,
+            cpe,
+            [dt.strftime("%d-%m-%Y") for dt in dates or []],
+            list(values or []),
+            done_ts
+        )
+
+    def get_breakdown(self, country_code, column):
+        """
+        Get every entry of one breakdown column from the latest scan of a country.
+
+        Args:
+            country_code (str): Country code.
+            column (str): One of ``BREAKDOWN_COLUMNS``.
+
+        Returns:
+            tuple: (entries: dict of name -> count, port_scan_done_ts: datetime), or None on failure.
+        """
+        if column not in BREAKDOWN_COLUMNS:
+            raise ValueError(f"unknown breakdown column {column!r}")
+        query = f"""
+            SELECT {column}, port_scan_done_ts
+            FROM summary
+            WHERE country = %(country)s
+            ORDER BY port_scan_done_ts DESC NULLS LAST, id DESC
+            LIMIT 1;
+        """
+        rows = self.__send_simple_query(query, {'country': country_code}, name=f'breakdown_{column}')
+        if not rows:
+            return None
+        entries, done_ts = rows[0]
+        return entries or {}, done_ts
+
     def get_ips_count(self, country_code):
         """
         Get the total number of scanned IPs for a given country.
@@ -111,13 +564,15 @@ class DBData:
         Returns:
             int or None: IP count or -1 on failure.
         """
-        query = f"""
+        query = """
             SELECT total_ips_scanned
             FROM summary
-            WHERE country = '{country_code}';
+            WHERE country = %(country)s
+            ORDER BY port_scan_done_ts DESC NULLS LAST, id DESC
+            LIMIT 1;
         """
         try:
-            return self.__send_simple_query(query)[0][0]
+            return self.__send_simple_query(query, {'country': country_code}, name='ips_count')[0][0]
         except Exception:
             return -1
 
@@ -131,13 +586,15 @@ class DBData:
         Returns:
             int or None: Host count or -1 on failure.
         """
-        query = f"""
+        query = """
             SELECT total_ips_active
             FROM summary
-            WHERE country = '{country_code}';
+            WHERE country = %(country)s
+            ORDER BY port_scan_done_ts DESC NULLS LAST, id DESC
+            LIMIT 1;
         """
         try:
-            return self.__send_simple_query(query)[0][0]
+            return self.__send_simple_query(query, {'country': country_code}, name='total_alive_hosts')[0][0]
         except Exception:
             return -1
 
@@ -151,13 +608,15 @@ class DBData:
         Returns:
             int or None: Port count or -1 on failure.
         """
-        query = f"""
+        query = """
             SELECT total_ports_open
             FROM summary
-            WHERE country = '{country_code}';
+            WHERE country = %(country)s
+            ORDER BY port_scan_done_ts DESC NULLS LAST, id DESC
+            LIMIT 1;
         """
         try:
-            return self.__send_simple_query(query)[0][0]
+            return self.__send_simple_query(query, {'country': country_code}, name='total_open_ports')[0][0]
         except Exception:
             return -1
 
@@ -171,13 +630,15 @@ class DBData:
         Returns:
             int or None: Port count or -1 on failure.
         """
-        query = f"""
+        query = """
             SELECT total_ports_scanned
             FROM summary
-            WHERE country = '{country_code}';
+            WHERE country = %(country)s
+            ORDER BY port_scan_done_ts DESC NULLS LAST, id DESC
+            LIMIT 1;
         """
         try:
-            return self.__send_simple_query(query)[0][0]
+            return self.__send_simple_query(query, {'country': country_code}, name='port_amount')[0][0]
         except Exception:
             return -1
 
@@ -191,7 +652,7 @@ class DBData:
         Returns:
             tuple: (labels: list[str], values: list[int]) or None on failure.
         """
-        query = f"""
+        query = """
             SELECT done_date, open_ports
             FROM (
                 SELECT
@@ -202,130 +663,294 @@ class DBData:
                 WHERE
                     total_ports_open IS NOT NULL AND
                     port_scan_done_ts IS NOT NULL AND
-                    country = '{country_code}'
+                    country = %(country)s
                 ORDER BY port_scan_done_ts DESC
                 LIMIT 10
             ) AS last_two
             ORDER BY done_date ASC;
         """
-        return self.__send_graph_query(query)
+        return self.__send_graph_query(query, {'country': country_code}, name='total_open_ports_plot')
 
-    def get_unique_open_ports(self, country_code):
+    def get_open_ports_history(self, country_code, start, end, granularity='day'):
         """
-        Get the count of unique open ports for a country.
+        Get the open ports time series of a country over a time range, aggregated in SQL.
+
+        Day, week and month buckets are read from the summary_rollup table when it exists and
+        has caught up with the country's scans, so the cost does not grow with the length of
+        the scan history. Otherwise they are aggregated from the summary table on the fly.
+        Either way every bucket overlapping the range is returned whole, so both paths give
+        the same series.
 
         Args:
             country_code (str): Country code.
+            start (datetime): Inclusive start of the range.
+            end (datetime): Exclusive end of the range.
+            granularity (str): One of ``HISTORY_GRANULARITIES``. Buckets hold the rounded
+                average of the scans that finished in them.
 
         Returns:
-            int or None: Port count or -1 on failure.
-        """
-        query = f"""
-            SELECT open_ports_count
-            FROM summary
-            WHERE country = '{country_code}';
+            list[tuple]: (bucket start: datetime, open ports: int) ordered by time, or None on failure.
         """
-        try:
-            return self.__send_simple_query(query)[0][0]
-        except Exception:
-            return -1
+        if granularity not in HISTORY_GRANULARITIES:
+            raise ValueError(f"unknown granularity {granularity!r}")
+
+        params = {'country': country_code, 'start': start, 'end': end, 'granularity': granularity}
+        if granularity != 'scan' and self.__rollups_current(country_code):
+            query = """
+                SELECT bucket, total_ports_open
+                FROM summary_rollup
+                WHERE
+                    total_ports_open IS NOT NULL AND
+                    country = %(country)s AND
+                    granularity = %(granularity)s AND
+                    bucket >= date_trunc(%(granularity)s, %(start)s::timestamp) AND
+                    bucket < %(end)s
+                ORDER BY bucket;
+            """
+            return self.__send_simple_query(query, params, name=f'open_ports_rollup_{granularity}')
+
+        if granularity == 'scan':
+            query = """
+                SELECT port_scan_done_ts, total_ports_open
+                FROM summary
+                WHERE
+                    total_ports_open IS NOT NULL AND
+                    country = %(country)s AND
+                    port_scan_done_ts >= %(start)s AND
+                    port_scan_done_ts < %(end)s
+                ORDER BY port_scan_done_ts;
+            """
+        else:
+            query = """
+                SELECT
+                    date_trunc(%(granularity)s, port_scan_done_ts) AS bucket,
+                    round(avg(total_ports_open))::bigint
+                FROM summary
+                WHERE
+                    total_ports_open IS NOT NULL AND
+                    country = %(country)s AND
+                    port_scan_done_ts >= date_trunc(%(granularity)s, %(start)s::timestamp) AND
+                    port_scan_done_ts < date_trunc(%(granularity)s, %(end)s::timestamp - interval '1 microsecond')
+                        + ('1 ' || %(granularity)s)::interval
+                GROUP BY bucket
+                ORDER BY bucket;
+            """
+        return self.__send_simple_query(query, params, name=f'open_ports_history_{granularity}')
 
-    def get_products_count(self, country_code):
+    def __rollups_current(self, country_code):
         """
-        Get the number of identified products in a country.
+        Check whether a country's history can be read from the rollups.
+
+        Whether the summary_rollup table exists is only looked up once. The watermark is checked
+        on every call: while the country has scans the last rollup run has not seen yet, its
+        buckets are stale and the raw rows are aggregated instead.
 
         Args:
             country_code (str): Country code.
 
         Returns:
-            int or None: Product count or -1 on failure.
+            bool: True if the rollups exist and cover every scan of the country.
+        """
+        if self.__has_rollups is None:
+            rows = self.__send_simple_query("SELECT to_regclass('summary_rollup') IS NOT NULL;", name='rollup_check')
+            if rows is None:
+                return False
+            self.__has_rollups = bool(rows[0][0])
+        if not self.__has_rollups:
+            return False
+
+        rows = self.__send_simple_query("""
+            SELECT NOT EXISTS (
+                SELECT 1
+                FROM summary
+                WHERE
+                    id > (SELECT last_summary_id FROM summary_rollup_state WHERE id = 1) AND
+                    country = %(country)s
+            );
+        """, {'country': country_code}, name='rollup_lag_check')
+        return bool(rows and rows[0][0])
+
+    def create_rollup_tables(self):
         """
-        query = f"""
-            SELECT products_count
-            FROM summary
-            WHERE country = '{country_code}';
+        Create the summary_rollup tables and the summary index they are built from, if missing.
+
+        Returns:
+            bool: True on success.
         """
-        try:
-            return self.__send_simple_query(query)[0][0]
-        except Exception:
-            return -1
+        if self.__send_simple_query(ROLLUP_SCHEMA, name='rollup_schema') is None:
+            return False
+        self.__has_rollups = True
+        return True
+
+    def create_change_trigger(self):
+        """
+        Create the trigger that notifies ``NOTIFY_CHANNEL`` whenever a summary row is written.
 
-    def get_services_count(self, country_code):
+        Returns:
+            bool: True on success.
         """
-        Get the number of identified services in a country.
+        return self.__send_simple_query(CHANGE_NOTIFY_SCHEMA, name='change_trigger') is not None
+
+    def update_rollups(self, full=False):
+        """
+        Recompute the rollup buckets touched by summary rows added since the last run.
+
+        Only the day, week and month buckets containing a new scan are aggregated again,
+        from the raw rows of that bucket, so a run costs the same however long the history
+        is. Ids are handed out before a transaction commits, so rows may become visible
+        out of id order; the last ``ROLLUP_ID_OVERLAP`` ids below the watermark are
+        therefore looked at again on every run. Re-running is harmless: buckets are
+        upserted and the watermark only moves forward once they are written.
 
         Args:
-            country_code (str): Country code.
+            full (bool): Rebuild every bucket instead of only those with new scans.
 
         Returns:
-            int or None: Service count or -1 on failure.
+            int or None: Number of buckets written, or None on failure.
+        """
+        rows = self.__send_simple_query("""
+            SELECT
+                (SELECT last_summary_id FROM summary_rollup_state WHERE id = 1),
+                (SELECT coalesce(max(id), 0) FROM summary);
+        """, name='rollup_watermark')
+        if not rows:
+            return None
+        last_id, max_id = rows[0]
+        if max_id == 0:
+            return 0
+        # Rows committed late with an id below the watermark are still picked up
+        start_id = 0 if full else max(last_id - ROLLUP_ID_OVERLAP, 0)
+
+        query = """
+            WITH touched AS (
+                SELECT DISTINCT
+                    s.country,
+                    g.granularity,
+                    date_trunc(g.granularity, s.port_scan_done_ts) AS bucket
+                FROM summary AS s
+                CROSS JOIN unnest(%(granularities)s::text[]) AS g(granularity)
+                WHERE
+                    s.id > %(start_id)s AND
+                    s.id <= %(max_id)s AND
+                    s.port_scan_done_ts IS NOT NULL
+            )
+            INSERT INTO summary_rollup (
+                country, granularity, bucket, scans,
+                total_ips_scanned, total_ips_active, total_ports_scanned,
+                total_ports_open, max_ports_open, last_scan_ts
+            )
+            SELECT
+                t.country,
+                t.granularity,
+                t.bucket,
+                count(*),
+                round(avg(s.total_ips_scanned))::bigint,
+                round(avg(s.total_ips_active))::bigint,
+                round(avg(s.total_ports_scanned))::bigint,
+                round(avg(s.total_ports_open))::bigint,
+                max(s.total_ports_open),
+                max(s.port_scan_done_ts)
+            FROM touched AS t
+            JOIN summary AS s ON
+                s.country = t.country AND
+                s.port_scan_done_ts >= t.bucket AND
+                s.port_scan_done_ts < t.bucket + ('1 ' || t.granularity)::interval
+            GROUP BY t.country, t.granularity, t.bucket
+            ON CONFLICT (country, granularity, bucket) DO UPDATE SET
+                scans = EXCLUDED.scans,
+                total_ips_scanned = EXCLUDED.total_ips_scanned,
+                total_ips_active = EXCLUDED.total_ips_active,
+                total_ports_scanned = EXCLUDED.total_ports_scanned,
+                total_ports_open = EXCLUDED.total_ports_open,
+                max_ports_open = EXCLUDED.max_ports_open,
+                last_scan_ts = EXCLUDED.last_scan_ts
+            RETURNING 1;
+        """
+        params = {'granularities': list(ROLLUP_GRANULARITIES), 'start_id': start_id, 'max_id': max_id}
+        written = self.__send_simple_query(query, params, name='rollup_upsert')
+        if written is None:
+            return None
+
+        if self.__send_simple_query(
+                "UPDATE summary_rollup_state SET last_summary_id = greatest(last_summary_id, %(max_id)s) WHERE id = 1;",
+                {'max_id': max_id}, name='rollup_watermark_update') is None:
+            return None
+        return len(written)
+
+    def get_unique_open_ports(self, country_code, k=None):
         """
-        query = f"""
-            SELECT services_count
-            FROM summary
-            WHERE country = '{country_code}';
+        Get the most common open ports of a country, ranked in the database.
+
+        Args:
+            country_code (str): Country code.
+            k (int, optional): Entries to return. Defaults to ``max_multi_cell_values``.
+
+        Returns:
+            dict or int: Name -> count, highest first, or -1 on failure.
         """
-        try:
-            return self.__send_simple_query(query)[0][0]
-        except Exception:
-            return -1
+        return self.__get_top_entries(country_code, 'open_ports_count', k)
 
-    def get_versions_count(self, country_code):
+    def get_products_count(self, country_code, k=None):
         """
-        Get the number of software versions found in a country.
+        Get the most common identified products of a country, ranked in the database.
 
         Args:
             country_code (str): Country code.
+            k (int, optional): Entries to return. Defaults to ``max_multi_cell_values``.
 
         Returns:
-            int or None: Version count or -1 on failure.
-        """
-        query = f"""
-            SELECT versions_count
-            FROM summary
-            WHERE country = '{country_code}';
+            dict or int: Name -> count, highest first, or -1 on failure.
         """
-        try:
-            return self.__send_simple_query(query)[0][0]
-        except Exception:
-            return -1
+        return self.__get_top_entries(country_code, 'products_count', k)
 
-    def get_os_count(self, country_code):
+    def get_services_count(self, country_code, k=None):
         """
-        Get the number of detected operating systems in a country.
+        Get the most common identified services of a country, ranked in the database.
 
         Args:
             country_code (str): Country code.
+            k (int, optional): Entries to return. Defaults to ``max_multi_cell_values``.
 
         Returns:
-            int or None: OS count or -1 on failure.
+            dict or int: Name -> count, highest first, or -1 on failure.
         """
-        query = f"""
-            SELECT os_count
-            FROM summary
-            WHERE country = '{country_code}';
+        return self.__get_top_entries(country_code, 'services_count', k)
+
+    def get_versions_count(self, country_code, k=None):
         """
-        try:
-            return self.__send_simple_query(query)[0][0]
-        except Exception:
-            return -1
+        Get the most common software versions of a country, ranked in the database.
+
+        Args:
+            country_code (str): Country code.
+            k (int, optional): Entries to return. Defaults to ``max_multi_cell_values``.
+
+        Returns:
+            dict or int: Name -> count, highest first, or -1 on failure.
+        """
+        return self.__get_top_entries(country_code, 'versions_count', k)
 
-    def get_cpe_count(self, country_code):
+    def get_os_count(self, country_code, k=None):
         """
-        Get the number of CPE entries in a country.
+        Get the most common detected operating systems of a country, ranked in the database.
 
         Args:
             country_code (str): Country code.
+            k (int, optional): Entries to return. Defaults to ``max_multi_cell_values``.
 
         Returns:
-            int or None: CPE count or -1 on failure.
+            dict or int: Name -> count, highest first, or -1 on failure.
         """
-        query = f"""
-            SELECT cpe_count
-            FROM summary
-            WHERE country = '{country_code}';
+        return self.__get_top_entries(country_code, 'os_count', k)
+
+    def get_cpe_count(self, country_code, k=None):
         """
-        try:
-            return self.__send_simple_query(query)[0][0]
-        except Exception:
-            return -1
+        Get the most common CPE entries of a country, ranked in the database.
+
+        Args:
+            country_code (str): Country code.
+            k (int, optional): Entries to return. Defaults to ``max_multi_cell_values``.
+
+        Returns:
+            dict or int: Name -> count, highest first, or -1 on failure.
+        """
+        return self.__get_top_entries(country_code, 'cpe_count', k)
@@ -17,6 +17,66 @@ class DataWrapper:
         """
         return self.dbData.get_country_codes()
 
+    def prefill_pool(self):
+        """
+        Open database connections ahead of the first request.
+
+        Returns:
+            int: Number of idle pooled connections.
+        """
+        return self.dbData.prefill_pool()
+
+    def get_last_scan_ts(self, country_code):
+        """
+        Get the completion time of the latest port scan for a given country.
+
+        Args:
+            country_code (str): The country code to query.
+
+        Returns:
+            datetime or None: Latest scan completion time.
+        """
+        return self.dbData.get_last_scan_ts(country_code)
+
+    def get_country_summary(self, country_code, top_k=None):
+        """
+        Get a snapshot of all summary counters and the open ports time series for a country.
+
+        Args:
+            country_code (str): The country code to query.
+            top_k (dict, optional): Breakdown entries to keep per summary column.
+
+        Returns:
+            CountrySummaryModel or None: Country snapshot, or None on failure.
+        """
+        return self.dbData.get_country_summary(country_code, top_k)
+
+    def get_country_summaries(self, country_codes, top_k=None):
+        """
+        Get the snapshots of several countries in one query.
+
+        Args:
+            country_codes (list[str]): The country codes to query.
+            top_k (dict, optional): Breakdown entries to keep per summary column.
+
+        Returns:
+            dict or None: Country code -> CountrySummaryModel, or None on failure.
+        """
+        return self.dbData.get_country_summaries(country_codes, top_k)
+
+    def get_breakdown(self, country_code, column):
+        """
+        Get every entry of one breakdown of a country's latest scan.
+
+        Args:
+            country_code (str): The country code to query.
+            column (str): Breakdown column, e.g. `cpe_count`.
+
+        Returns:
+            tuple or None: (entries, scan completion time).
+        """
+        return self.dbData.get_breakdown(country_code, column)
+
     def get_total_alive_hosts(self, country_code):
         """
         Get the total number of alive hosts for a given country.
@@ -77,74 +137,138 @@ class DataWrapper:
         """
         return self.dbData.get_total_open_ports_plot(country_code)
 
-    def get_unique_open_ports(self, country_code):
+    def get_open_ports_history(self, country_code, start, end, granularity='day'):
+        """
+        Retrieve the open ports time series of a country over a time range.
+
+        Args:
+            country_code (str): The country code to query.
+            start (datetime): Inclusive start of the range.
+            end (datetime): Exclusive end of the range.
+            granularity (str): Bucket size: scan, day, week or month.
+
+        Returns:
+            list[tuple] or None: (bucket start, open ports) rows ordered by time.
+        """
+        return self.dbData.get_open_ports_history(country_code, start, end, granularity)
+
+    def create_rollup_tables(self):
+        """
+        Create the rollup tables if they do not exist.
+
+        Returns:
+            bool: True on success.
+        """
+        return self.dbData.create_rollup_tables()
+
+    def create_change_trigger(self):
+        """
+        Create the trigger announcing summary writes to listening workers.
+
+        Returns:
+            bool: True on success.
+        """
+        return self.dbData.create_change_trigger()
+
+    def listen_for_changes(self, on_change, on_reconnect=None):
+        """
+        Start a background listener for summary writes.
+
+        Args:
+            on_change (callable): Called with the country code of every changed summary row.
+            on_reconnect (callable, optional): Called when listening resumes after a lost connection.
+
+        Returns:
+            ChangeListener: The running listener.
+        """
+        return self.dbData.listen_for_changes(on_change, on_reconnect)
+
+    def update_rollups(self, full=False):
+        """
+        Bring the rollup tables up to date with new scan summaries.
+
+        Args:
+            full (bool): Rebuild every bucket.
+
+        Returns:
+            int or None: Number of buckets written, or None on failure.
+        """
+        return self.dbData.update_rollups(full)
+
+    def get_unique_open_ports(self, country_code, k=None):
         """
-        Get the list or count of unique open ports in a given country.
+        Get the most common open ports in a given country.
 
         Args:
             country_code (str): The country code to query.
+            k (int, optional): Number of top entries to return.
 
         Returns:
-            list or int: Unique open ports data.
+            dict or int: Name -> count, highest first, or -1 on failure.
         """
-        return self.dbData.get_unique_open_ports(country_code)
+        return self.dbData.get_unique_open_ports(country_code, k)
 
-    def get_products_count(self, country_code):
+    def get_products_count(self, country_code, k=None):
         """
-        Get the number of distinct products identified in a given country.
+        Get the most common products identified in a given country.
 
         Args:
             country_code (str): The country code to query.
+            k (int, optional): Number of top entries to return.
 
         Returns:
-            int: Product count.
+            dict or int: Name -> count, highest first, or -1 on failure.
         """
-        return self.dbData.get_products_count(country_code)
+        return self.dbData.get_products_count(country_code, k)
 
-    def get_services_count(self, country_code):
+    def get_services_count(self, country_code, k=None):
         """
-        Get the number of distinct services detected in a given country.
+        Get the most common services detected in a given country.
 
         Args:
             country_code (str): The country code to query.
+            k (int, optional): Number of top entries to return.
 
         Returns:
-            int: Services count.
+            dict or int: Name -> count, highest first, or -1 on failure.
         """
-        return self.dbData.get_services_count(country_code)
+        return self.dbData.get_services_count(country_code, k)
 
-    def get_versions_count(self, country_code):
+    def get_versions_count(self, country_code, k=None):
         """
-        Get the number of distinct software versions detected in a given country.
+        Get the most common software versions detected in a given country.
 
         Args:
             country_code (str): The country code to query.
+            k (int, optional): Number of top entries to return.
 
         Returns:
-            int: Versions count.
+            dict or int: Name -> count, highest first, or -1 on failure.
         """
-        return self.dbData.get_versions_count(country_code)
+        return self.dbData.get_versions_count(country_code, k)
 
-    def get_os_count(self, country_code):
+    def get_os_count(self, country_code, k=None):
         """
-        Get the number of distinct operating systems detected in a given country.
+        Get the most common operating systems detected in a given country.
 
         Args:
             country_code (str): The country code to query.
+            k (int, optional): Number of top entries to return.
 
         Returns:
-            int: OS count.
+            dict or int: Name -> count, highest first, or -1 on failure.
         """
-        return self.dbData.get_os_count(country_code)
+        return self.dbData.get_os_count(country_code, k)
 
-    def get_cpe_count(self, country_code):
+    def get_cpe_count(self, country_code, k=None):
         """
-        Get the number of distinct CPE (Common Platform Enumeration) entries for a given country.
+        Get the most common CPE (Common Platform Enumeration) entries in a given country.
 
         Args:
             country_code (str): The country code to query.
+            k (int, optional): Number of top entries to return.
 
         Returns:
-            int: CPE count.
+            dict or int: Name -> count, highest first, or -1 on failure.
         """
-        return self.dbData.get_cpe_count(country_code)
+        return self.dbData.get_cpe_count(country_code, k)
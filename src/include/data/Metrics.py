@@ -0,0 +1,254 @@
+import contextvars
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Spans recorded during the current request, or None outside a traced request
+_current_trace = contextvars.ContextVar('volva_trace', default=None)
+
+
+class MetricsRegistry:
+    """
+    Process-local counters and histograms with Prometheus text exposition.
+
+    Each gunicorn worker keeps its own registry. Workers periodically dump it to a
+    shared directory with ``dump`` and ``/metrics`` sums every dump with ``render``,
+    so a scrape of any worker reports the whole host.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.__help = {}
+        self.__types = {}
+        self.__counters = {}    # (name, labels) -> value
+        self.__histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self.__lock = threading.Lock()
+        self.__last_dump = 0.0
+
+    def describe(self, name, metric_type, help_text):
+        """
+        Register the type and help text of a metric.
+
+        Args:
+            name (str): Metric name.
+            metric_type (str): ``counter`` or ``histogram``.
+            help_text (str): One-line description.
+        """
+        self.__types[name] = metric_type
+        self.__help[name] = help_text
+
+    def inc(self, name, value=1, **labels):
+        """
+        Increase a counter.
+
+        Args:
+            name (str): Metric name.
+            value (float): Amount to add.
+            **labels: Label values.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock:
+            self.__counters[key] = self.__counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """
+        Record a value in a histogram.
+
+        Args:
+            name (str): Metric name.
+            value (float): Observed value, e.g. seconds.
+            **labels: Label values.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock:
+            state = self.__histograms.get(key)
+            if state is None:
+                state = self.__histograms[key] = [0] * (len(LATENCY_BUCKETS) + 2)
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def snapshot(self):
+        """
+        Copy the current values in a JSON-serializable form.
+
+        Returns:
+            dict: ``counters`` and ``histograms`` as lists of ``[name, labels, value]``.
+        """
+        with self.__lock:
+            return {
+                'counters': [[name, dict(labels), value] for (name, labels), value in self.__counters.items()],
+                'histograms': [[name, dict(labels), list(state)] for (name, labels), state in self.__histograms.items()]
+            }
+
+    def dump(self, directory, min_interval=5.0):
+        """
+        Atomically write this process's snapshot to a shared directory, at most every ``min_interval`` seconds.
+
+        Args:
+            directory (str): Directory shared by all workers.
+            min_interval (float): Minimum seconds between dumps.
+        """
+        now = time.monotonic()
+        if now - self.__last_dump < min_interval:
+            return
+        self.__last_dump = now
+        try:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, os.path.join(directory, f"{os.getpid()}.json"))
+        except OSError as e:
+            print(f"[METRICS ERROR] could not write metrics dump: {e}")
+
+    def render(self, directory=None):
+        """
+        Render metrics in the Prometheus text format.
+
+        Args:
+            directory (str, optional): Directory with worker dumps to sum. If omitted,
+                only this process's values are rendered.
+
+        Returns:
+            str: Exposition text.
+        """
+        snapshots = [self.snapshot()]
+        if directory is not None:
+            self.dump(directory, min_interval=0)
+            snapshots = self.__load_dumps(directory) or snapshots
+
+        counters = {}
+        histograms = {}
+        for snap in snapshots:
+            for name, labels, value in snap['counters']:
+                key = (name, tuple(sorted(labels.items())))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, state in snap['histograms']:
+                key = (name, tuple(sorted(labels.items())))
+                merged = histograms.setdefault(key, [0] * len(state))
+                for index, value in enumerate(state):
+                    merged[index] += value
+
+        lines = []
+        for name in sorted({key[0] for key in counters} | {key[0] for key in histograms}):
+            lines.append(f"# HELP {name} {self.__help.get(name, name)}")
+            lines.append(f"# TYPE {name} {self.__types.get(name, 'untyped')}")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+            for (metric, labels), state in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for index, bound in enumerate(LATENCY_BUCKETS):
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {state[index]}")
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {state[-1]}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {state[-2]}")
+                lines.append(f"{name}_count{_format_labels(labels)} {state[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def __load_dumps(self, directory):
+        """Read every worker dump in a directory."""
+        snapshots = []
+        for name in os.listdir(directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(directory, name), encoding='utf-8') as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+
+def _format_labels(labels):
+    """Format label pairs as ``{a="1",b="2"}``."""
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+metrics = MetricsRegistry()
+metrics.describe('volva_db_query_seconds', 'histogram', "Time spent executing and fetching a query.")
+metrics.describe('volva_db_acquire_seconds', 'histogram', "Time spent checking a connection out of the pool.")
+metrics.describe('volva_db_rows_total', 'counter', "Rows returned by queries.")
+metrics.describe('volva_db_query_errors_total', 'counter', "Queries that failed or could not get a connection.")
+metrics.describe('volva_logic_seconds', 'histogram', "Time spent in LogicWrapper calls.")
+metrics.describe('volva_template_render_seconds', 'histogram', "Time spent rendering templates.")
+metrics.describe('volva_request_seconds', 'histogram', "Time spent handling HTTP requests.")
+metrics.describe('volva_db_notifications_total', 'counter', "Change notifications received from the database.")
+metrics.describe('volva_fragment_renders_total', 'counter', "Template fragments rendered because no cached copy matched.")
+
+
+def start_trace():
+    """
+    Start collecting spans for the current request.
+
+    Returns:
+        contextvars.Token: Token to pass to ``finish_trace``.
+    """
+    return _current_trace.set([])
+
+
+def finish_trace(token):
+    """
+    Stop collecting spans for the current request.
+
+    Args:
+        token (contextvars.Token): Token returned by ``start_trace``.
+
+    Returns:
+        list[dict]: Spans recorded during the request.
+    """
+    spans = _current_trace.get() or []
+    _current_trace.reset(token)
+    return spans
+
+
+def record_span(kind, name, seconds, **fields):
+    """
+    Add a span to the current request's trace, if one is being collected.
+
+    Args:
+        kind (str): Span category, e.g. ``query`` or ``render``.
+        name (str): What was timed.
+        seconds (float): Duration.
+        **fields: Extra values such as row counts.
+    """
+    spans = _current_trace.get()
+    if spans is not None:
+        spans.append({'kind': kind, 'name': name, 'ms': round(seconds * 1000, 3), **fields})
+
+
+def timed(func):
+    """
+    Decorator recording a method's duration under ``volva_logic_seconds`` and in the request trace.
+
+    Args:
+        func (callable): Function to time.
+
+    Returns:
+        callable: Wrapped function.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe('volva_logic_seconds', elapsed, call=func.__name__)
+            record_span('logic', func.__name__, elapsed)
+    return wrapper
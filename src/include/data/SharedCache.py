@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import time
+
+
+def runtime_directory(name):
+    """
+    Path of a host-wide runtime directory, on the memory-backed `/dev/shm` when available.
+
+    Args:
+        name (str): Directory name.
+
+    Returns:
+        str: Absolute path (not created).
+    """
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, name)
+
+
+def private_directory(path):
+    """
+    Create a directory only the current user may access, or check an existing one.
+
+    Directories in shared locations such as `/dev/shm` can be created in advance by
+    another user, so an existing directory is only accepted if it is not a symlink,
+    belongs to the current user and grants no access to group or others.
+
+    Args:
+        path (str): Directory path.
+
+    Returns:
+        bool: True if the directory exists and is private to the current user.
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid() and not info.st_mode & 0o077
+
+
+class SharedCache:
+    """
+    A file-backed key/value cache shared by every worker process on the host.
+
+    Each entry is a small JSON file. By default the files live under ``/dev/shm``,
+    which is memory-backed, so reads never touch the disk. Writes go to a temporary
+    file that is atomically renamed into place, so readers never see a partial
+    entry. When the cache holds more than ``max_entries`` files the oldest are removed.
+
+    Attributes:
+        directory (str): Directory holding the cache files.
+        ttl (float): Seconds an entry stays valid.
+        max_entries (int): Maximum number of entries kept on disk.
+    """
+
+    def __init__(self, directory=None, ttl=300.0, max_entries=256):
+        """
+        Initialize the cache and create its directory if needed.
+
+        Args:
+            directory (str, optional): Cache directory. Defaults to a `volva-cache` folder
+                in `/dev/shm`, or in the system temp directory if `/dev/shm` does not exist.
+            ttl (float): Seconds an entry stays valid.
+            max_entries (int): Maximum number of entries.
+        """
+        if directory is None:
+            directory = runtime_directory('volva-cache')
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+    def get(self, key):
+        """
+        Read a value if it exists and has not expired.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Any: The stored JSON value, or None if missing, expired or unreadable.
+        """
+        try:
+            with open(self.__path(key), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get('stored_at', 0) > self.ttl:
+            return None
+        return entry.get('value')
+
+    def set(self, key, value):
+        """
+        Atomically store a JSON-serializable value and evict old entries if needed.
+
+        Args:
+            key (str): Cache key.
+            value (Any): JSON-serializable value.
+        """
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'stored_at': time.time(), 'value': value}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.__path(key))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[CACHE ERROR] could not write shared cache entry {key!r}: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        self.__evict()
+
+    def delete(self, key):
+        """
+        Remove an entry if it exists.
+
+        Args:
+            key (str): Cache key.
+        """
+        try:
+            os.unlink(self.__path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Remove every entry."""
+        for path, _ in self.__entries():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def __path(self, key):
+        """Map a key to its file path."""
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+    def __entries(self):
+        """
+        List the entry files in the cache directory.
+
+        Returns:
+            list[tuple]: (path, mtime) pairs.
+        """
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    entries.append((entry.path, entry.stat().st_mtime))
+                except FileNotFoundError:
+                    continue
+        return entries
+
+    def __evict(self):
+        """Remove the oldest entries while the cache holds more than ``max_entries``."""
+        entries = self.__entries()
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry[1])
+        for path, _ in entries[:len(entries) - self.max_entries]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,189 @@
+from bisect import bisect_left, bisect_right
+
+# Orders a page can be sorted by
+SORT_ORDERS = ('count', 'name')
+# Ways a search string can match an entry name
+MATCH_MODES = ('prefix', 'substring')
+# Put before every casefolded name in the search text, so a prefix match is a match of SEPARATOR + query
+SEPARATOR = '\x00'
+
+
+class BreakdownIndex:
+    """
+    Precomputed sort orders of one breakdown map, e.g. every CPE of a country's latest scan.
+
+    The entries are sorted once by count and once by name. Pages are located with a
+    binary search on the keyset cursor of the previous page, so any page costs the same
+    as the first. Prefix searches in name order are a binary-searched range as well.
+    Other searches run ``str.find`` over the casefolded names of the sort order, joined
+    into one string, so entries that do not match are skipped without a Python loop.
+
+    Attributes:
+        scanned_at (datetime or None): Completion time of the scan the entries come from.
+    """
+
+    def __init__(self, entries, scanned_at=None):
+        """
+        Sort the entries of a breakdown.
+
+        Args:
+            entries (dict): Name -> count.
+            scanned_at (datetime, optional): Completion time of the scan the entries come from.
+        """
+        self.scanned_at = scanned_at
+        # Cursor keys, ascending: (-count, name) puts the highest count first, ties by name
+        self.__count_keys = sorted((-count, name) for name, count in entries.items())
+        self.__name_keys = sorted((name.casefold(), name) for name in entries)
+        self.__counts = entries
+        self.__search_text = {
+            'count': self.__join_names([name.casefold() for _, name in self.__count_keys]),
+            'name': self.__join_names([folded for folded, _ in self.__name_keys])
+        }
+
+    def __len__(self):
+        """Number of entries in the breakdown."""
+        return len(self.__counts)
+
+    def page(self, sort='count', query=None, match='prefix', after=None, limit=50):
+        """
+        Get one page of entries.
+
+        Args:
+            sort (str): ``count`` (highest first) or ``name`` (alphabetical, case-insensitive).
+            query (str, optional): Case-insensitive search string.
+            match (str): ``prefix`` or ``substring``.
+            after (list, optional): Cursor returned with the previous page.
+            limit (int): Maximum number of entries.
+
+        Returns:
+            tuple: (entries: list of [name, count], next cursor: list or None on the last page).
+
+        Raises:
+            ValueError: If the sort order, match mode, cursor or limit is invalid.
+        """
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"unknown sort order {sort!r}")
+        if match not in MATCH_MODES:
+            raise ValueError(f"unknown match mode {match!r}")
+        if limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+
+        keys = self.__count_keys if sort == 'count' else self.__name_keys
+        start = 0
+        if after is not None:
+            start = bisect_right(keys, self.__parse_cursor(sort, after))
+
+        folded = query.casefold() if query else None
+        if folded is None:
+            return self.__collect(keys, range(start, len(keys)), limit)
+        if match == 'prefix' and sort == 'name':
+            start = max(start, bisect_left(keys, (folded,)))
+            return self.__collect(keys, self.__prefix_range(keys, folded, start), limit)
+        return self.__collect(keys, self.__matches(sort, folded, match, start), limit)
+
+    def __collect(self, keys, indexes, limit):
+        """
+        Turn the first ``limit`` entry indexes into a page.
+
+        Args:
+            keys (list): Sorted keys of the page's sort order.
+            indexes (iterable[int]): Indexes of the matching entries, ascending.
+            limit (int): Maximum number of entries.
+
+        Returns:
+            tuple: (entries, next cursor or None if no entry is left).
+        """
+        rows = []
+        for index in indexes:
+            if len(rows) == limit:
+                return rows, list(keys[last_index])
+            name = keys[index][1]
+            rows.append([name, self.__counts[name]])
+            last_index = index
+        return rows, None
+
+    @staticmethod
+    def __prefix_range(keys, folded, start):
+        """
+        Yield the indexes of the name-ordered entries starting with a prefix, from ``start`` on.
+
+        Args:
+            keys (list): Name order keys.
+            folded (str): Casefolded prefix.
+            start (int): Index of the first entry not before the prefix.
+
+        Yields:
+            int: Entry indexes.
+        """
+        for index in range(start, len(keys)):
+            if not keys[index][0].startswith(folded):
+                return
+            yield index
+
+    def __matches(self, sort, folded, match, start):
+        """
+        Yield the indexes of the entries whose casefolded name matches, from ``start`` on.
+
+        Args:
+            sort (str): Sort order to search in.
+            folded (str): Casefolded search string.
+            match (str): ``prefix`` or ``substring``.
+            start (int): First entry index to consider.
+
+        Yields:
+            int: Entry indexes in sort order.
+        """
+        text, offsets = self.__search_text[sort]
+        if start >= len(offsets):
+            return
+        needle = SEPARATOR + folded if match == 'prefix' else folded
+        position = offsets[start] - 1
+        while True:
+            found = text.find(needle, position)
+            if found == -1:
+                return
+            # A prefix match starts at the separator in front of its entry
+            index = bisect_right(offsets, found if match == 'substring' else found + 1) - 1
+            entry_end = offsets[index + 1] - 1 if index + 1 < len(offsets) else len(text)
+            # A search string containing the separator could span two entries
+            if found + len(needle) <= entry_end:
+                yield index
+            position = entry_end
+
+    @staticmethod
+    def __join_names(folded_names):
+        """
+        Join casefolded names into one search text.
+
+        Args:
+            folded_names (list[str]): Casefolded names in sort order.
+
+        Returns:
+            tuple: (text, offsets) where ``offsets[i]`` is where name ``i`` starts in the text.
+        """
+        offsets = []
+        position = 1
+        for name in folded_names:
+            offsets.append(position)
+            position += len(name) + 1
+        return SEPARATOR + SEPARATOR.join(folded_names), offsets
+
+    def __parse_cursor(self, sort, after):
+        """
+        Validate a cursor and turn it into a sort key.
+
+        Args:
+            sort (str): Sort order the cursor was issued for.
+            after (list): Decoded cursor.
+
+        Returns:
+            tuple: Key comparable with the sorted keys.
+        """
+        if not isinstance(after, (list, tuple)) or len(after) != 2 or not isinstance(after[1], str):
+            raise ValueError("malformed cursor")
+        first = after[0]
+        if sort == 'count' and (isinstance(first, bool) or not isinstance(first, (int, float))):
+            raise ValueError("malformed cursor")
+        if sort == 'name' and not isinstance(first, str):
+            raise ValueError("malformed cursor")
+        return first, after[1]
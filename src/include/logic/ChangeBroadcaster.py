@@ -0,0 +1,60 @@
+import threading
+
+
+class ChangeBroadcaster:
+    """
+    Wakes threads waiting for a country's data to change.
+
+    Each country has a version that ``publish`` increments; publishing without a
+    country bumps a global version seen by every waiter. Waiters compare the version
+    they last saw, so a change published between two waits is never missed.
+    """
+
+    def __init__(self):
+        """Initialize with every version at zero."""
+        self.__versions = {}  # country code, or None for every country -> change count
+        self.__condition = threading.Condition()
+
+    def version(self, country_code):
+        """
+        Get the current version of a country.
+
+        Args:
+            country_code (str): Country code.
+
+        Returns:
+            tuple: Opaque version to pass to ``wait``.
+        """
+        with self.__condition:
+            return self.__current(country_code)
+
+    def publish(self, country_code=None):
+        """
+        Announce that a country's data changed and wake its waiters.
+
+        Args:
+            country_code (str, optional): Changed country, or None if every country may have changed.
+        """
+        with self.__condition:
+            self.__versions[country_code] = self.__versions.get(country_code, 0) + 1
+            self.__condition.notify_all()
+
+    def wait(self, country_code, version, timeout):
+        """
+        Block until a country's version differs from `version` or the timeout passes.
+
+        Args:
+            country_code (str): Country code.
+            version (tuple): Version returned by ``version`` or a previous ``wait``.
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            tuple: The current version, equal to `version` on timeout.
+        """
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.__current(country_code) != version, timeout)
+            return self.__current(country_code)
+
+    def __current(self, country_code):
+        """Version of a country. Must be called with the condition held."""
+        return self.__versions.get(None, 0), self.__versions.get(country_code, 0)
@@ -0,0 +1,107 @@
+import threading
+import time
+
+
+class CountryRegistry:
+    """
+    In-process cache of the country codes that have scan summaries.
+
+    The codes are loaded once on first use and kept in a frozenset for O(1)
+    membership checks. Once the TTL has passed, the current set keeps being
+    served while a single background thread reloads it; a failed reload keeps
+    the current set and is retried once the TTL has passed again. A reload can
+    also be forced with ``refresh`` when new scan summaries land.
+
+    Attributes:
+        ttl (float): Seconds before the loaded codes are considered stale.
+    """
+
+    def __init__(self, loader, ttl=300.0):
+        """
+        Initialize the registry without loading anything yet.
+
+        Args:
+            loader (callable): Returns a list of country codes, or None on failure.
+            ttl (float): Seconds before a background reload is triggered.
+        """
+        self.ttl = ttl
+        self.__loader = loader
+        self.__codes = None
+        # Time of the last load attempt, successful or not
+        self.__attempted_at = 0.0
+        self.__load_lock = threading.Lock()
+        # Guards __refreshing, so concurrent callers start at most one background reload
+        self.__refresh_lock = threading.Lock()
+        self.__refreshing = False
+
+    def contains(self, country_code: str) -> bool | None:
+        """
+        Check if a country code is known.
+
+        Args:
+            country_code (str): Country code to look up (case-insensitive).
+
+        Returns:
+            bool or None: True if known, False if not, None if the codes could not be loaded.
+        """
+        codes = self.__codes
+        if codes is None:
+            codes = self.__load_initial()
+            if codes is None:
+                return None
+        elif time.monotonic() - self.__attempted_at > self.ttl:
+            self.refresh_async()
+        return country_code.upper() in codes
+
+    def codes(self):
+        """
+        Get the known country codes, loading them if needed.
+
+        Returns:
+            frozenset[str] or None: Known country codes or None if they could not be loaded.
+        """
+        if self.__codes is None:
+            return self.__load_initial()
+        return self.__codes
+
+    def refresh(self):
+        """
+        Reload the country codes now. On failure the previously loaded codes are kept.
+
+        Returns:
+            frozenset[str] or None: The current country codes.
+        """
+        with self.__load_lock:
+            return self.__load()
+
+    def refresh_async(self):
+        """Reload the country codes in a background thread unless a reload is already running."""
+        with self.__refresh_lock:
+            if self.__refreshing:
+                return
+            self.__refreshing = True
+        threading.Thread(target=self.__refresh_in_background, name="country-registry-refresh", daemon=True).start()
+
+    def __refresh_in_background(self):
+        """Background reload entry point."""
+        try:
+            self.refresh()
+        finally:
+            with self.__refresh_lock:
+                self.__refreshing = False
+
+    def __load_initial(self):
+        """Load the codes on first use, letting concurrent callers wait for a single load."""
+        with self.__load_lock:
+            if self.__codes is not None:
+                return self.__codes
+            return self.__load()
+
+    def __load(self):
+        """Call the loader and store its result. Must be called with the load lock held."""
+        codes = self.__loader()
+        # Recorded on failure too, so a database outage is not hit with a reload on every call
+        self.__attempted_at = time.monotonic()
+        if codes is not None:
+            self.__codes = frozenset(codes)
+        return self.__codes
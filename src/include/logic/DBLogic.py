@@ -3,7 +3,23 @@
 # current_dir = path.dirname(__file__)
 # sys.path.append(current_dir)
 
+import heapq
+import os
+
 from ..data.DataWrapper import DataWrapper
+from .BreakdownIndex import BreakdownIndex
+from .CountryRegistry import CountryRegistry
+from .downsampleLogic import DownsampleLogic
+
+# Breakdown widgets: summary column -> (CountrySummaryModel field, env var with the number of entries shown)
+BREAKDOWN_WIDGETS = {
+    'open_ports_count': ('unique_open_ports', 'TOP_K_PORTS'),
+    'services_count': ('services_count', 'TOP_K_SERVICES'),
+    'versions_count': ('versions_count', 'TOP_K_VERSIONS'),
+    'os_count': ('os_count', 'TOP_K_OS'),
+    'products_count': ('products_count', 'TOP_K_PRODUCTS'),
+    'cpe_count': ('cpe_count', 'TOP_K_CPE')
+}
 
 
 class DBLogic:
@@ -17,51 +33,133 @@ class DBLogic:
             dataWrapper (DataWrapper): Instance used to query the database.
         """
         self.dataWrapper = dataWrapper
-
-    def __sort_highest_first(self, org_dict: dict) -> dict:
+        self.countryRegistry = CountryRegistry(
+            self.dataWrapper.get_country_codes,
+            ttl=float(os.environ.get('COUNTRY_CODES_TTL', 300))
+        )
+        # Entries shown per breakdown widget, keyed by summary column
+        self.top_k = {
+            column: int(os.environ.get(env_var, 5))
+            for column, (_, env_var) in BREAKDOWN_WIDGETS.items()
+        }
+
+    def __top_entries(self, content: dict, k: int) -> dict:
         """
-        Sort a dictionary by its values in descending order.
+        Keep the `k` largest entries of a breakdown, highest first.
+
+        The data layer already ranks breakdowns in SQL; this only guards against maps
+        that did not come through that query, e.g. cached snapshots, and uses partial
+        selection rather than sorting the whole map.
 
         Args:
-            org_dict (dict): Dictionary to sort.
+            content (dict): Name -> count.
+            k (int): Number of entries to keep.
 
         Returns:
-            dict: Sorted dictionary.
+            dict: Top entries in descending order of count.
         """
-        if not org_dict:
+        if not content:
             return {}
-        return dict(sorted(org_dict.items(), key=lambda value: value[1], reverse=True))
+        return dict(heapq.nlargest(k, content.items(), key=lambda item: item[1]))
 
-    def __shortify(self, long_dict: dict) -> dict:
+    def verify_country_code(self, country_code: str) -> bool | None:
         """
-        Limit dictionary to a maximum of 5 entries.
+        Check if a country code is valid against the cached country registry.
 
         Args:
-            long_dict (dict): Dictionary to truncate.
+            country_code (str): Country code to validate.
 
         Returns:
-            dict: Truncated dictionary.
+            bool or None: True if valid, False if not, None if data fetch fails.
         """
-        if not long_dict:
-            return {}
-        if len(long_dict) > 5:
-            return dict(list(long_dict.items())[:5])
-        return long_dict
+        return self.countryRegistry.contains(country_code)
 
-    def verify_country_code(self, country_code: str) -> bool | None:
+    def refresh_country_codes(self):
         """
-        Check if a country code is valid.
+        Reload the cached country codes, e.g. after a new scan summary was written.
+
+        Returns:
+            frozenset[str] or None: The known country codes.
+        """
+        return self.countryRegistry.refresh()
+
+    def get_last_scan_ts(self, country_code: str):
+        """
+        Return the completion time of the latest port scan for the given country.
 
         Args:
-            country_code (str): Country code to validate.
+            country_code (str): Country code.
 
         Returns:
-            bool or None: True if valid, False if not, None if data fetch fails.
+            datetime or None
         """
-        all_country_codes = self.dataWrapper.get_country_codes()
-        if all_country_codes is None:
+        if not self.verify_country_code(country_code):
             return None
-        return country_code.upper() in all_country_codes
+        return self.dataWrapper.get_last_scan_ts(country_code.upper())
+
+    def get_country_summary(self, country_code: str):
+        """
+        Return the country snapshot with every breakdown reduced to its widget's top entries.
+
+        Args:
+            country_code (str): Country code.
+
+        Returns:
+            CountrySummaryModel or None
+        """
+        if self.verify_country_code(country_code) is None:
+            return None
+        summary = self.dataWrapper.get_country_summary(country_code.upper(), self.top_k)
+        if summary is None:
+            return None
+
+        for column, (field, _) in BREAKDOWN_WIDGETS.items():
+            setattr(summary, field, self.__top_entries(getattr(summary, field), self.top_k[column]))
+        return summary
+
+    def get_country_summaries(self, country_codes):
+        """
+        Return the snapshots of several countries, fetched together in one query.
+
+        Unknown country codes are skipped.
+
+        Args:
+            country_codes (list[str]): Country codes.
+
+        Returns:
+            dict or None: Country code -> CountrySummaryModel, or None on failure.
+        """
+        known = self.countryRegistry.codes()
+        if known is None:
+            return None
+        codes = [code.upper() for code in country_codes if code.upper() in known]
+        summaries = self.dataWrapper.get_country_summaries(codes, self.top_k)
+        if summaries is None:
+            return None
+
+        for summary in summaries.values():
+            for column, (field, _) in BREAKDOWN_WIDGETS.items():
+                setattr(summary, field, self.__top_entries(getattr(summary, field), self.top_k[column]))
+        return summaries
+
+    def get_breakdown_index(self, country_code: str, column: str):
+        """
+        Return every entry of a breakdown, pre-sorted for paging and search.
+
+        Args:
+            country_code (str): Country code.
+            column (str): Summary column of the breakdown, a key of ``BREAKDOWN_WIDGETS``.
+
+        Returns:
+            BreakdownIndex or None
+        """
+        if not self.verify_country_code(country_code):
+            return None
+        breakdown = self.dataWrapper.get_breakdown(country_code.upper(), column)
+        if breakdown is None:
+            return None
+        entries, scanned_at = breakdown
+        return BreakdownIndex(entries, scanned_at)
 
     def get_total_alive_hosts(self, country_code: str):
         """
@@ -131,9 +229,41 @@ class DBLogic:
             return None, None
         return self.dataWrapper.get_total_open_ports_plot(country_code)
 
+    def get_open_ports_history(self, country_code: str, start, end, granularity='day', max_points=None):
+        """
+        Return the open ports time series over a time range, downsampled to a point budget.
+
+        Args:
+            country_code (str): Country code.
+            start (datetime): Inclusive start of the range.
+            end (datetime): Exclusive end of the range.
+            granularity (str): Bucket size: scan, day, week or month.
+            max_points (int, optional): Maximum number of points to return.
+
+        Returns:
+            tuple: (labels, values) or (None, None) on failure.
+        """
+        if not self.verify_country_code(country_code):
+            return None, None
+        rows = self.dataWrapper.get_open_ports_history(country_code.upper(), start, end, granularity)
+        if rows is None:
+            return None, None
+
+        if max_points and len(rows) > max_points:
+            origin = rows[0][0]
+            kept = DownsampleLogic.lttb(
+                [(bucket - origin).total_seconds() for bucket, _ in rows],
+                [value for _, value in rows],
+                max_points
+            )
+            rows = [rows[index] for index in kept]
+
+        label_format = "%d-%m-%Y %H:%M" if granularity == 'scan' else "%d-%m-%Y"
+        return [bucket.strftime(label_format) for bucket, _ in rows], [value for _, value in rows]
+
     def get_unique_open_ports(self, country_code: str):
         """
-        Return top 5 unique open ports sorted by frequency.
+        Return the top unique open ports sorted by frequency.
 
         Args:
             country_code (str): Country code.
@@ -143,12 +273,14 @@ class DBLogic:
         """
         if self.verify_country_code(country_code) is None:
             return None
-        content = self.dataWrapper.get_unique_open_ports(country_code)
-        return self.__shortify(self.__sort_highest_first(content))
+        content = self.dataWrapper.get_unique_open_ports(country_code, self.top_k['open_ports_count'])
+        if not isinstance(content, dict):
+            return None
+        return self.__top_entries(content, self.top_k['open_ports_count'])
 
     def get_products_count(self, country_code: str):
         """
-        Return top 5 products by occurrence.
+        Return the top products by occurrence.
 
         Args:
             country_code (str): Country code.
@@ -158,12 +290,14 @@ class DBLogic:
         """
         if self.verify_country_code(country_code) is None:
             return None
-        content = self.dataWrapper.get_products_count(country_code)
-        return self.__shortify(self.__sort_highest_first(content))
+        content = self.dataWrapper.get_products_count(country_code, self.top_k['products_count'])
+        if not isinstance(content, dict):
+            return None
+        return self.__top_entries(content, self.top_k['products_count'])
 
     def get_services_count(self, country_code: str):
         """
-        Return top 5 services by occurrence.
+        Return the top services by occurrence.
 
         Args:
             country_code (str): Country code.
@@ -173,12 +307,14 @@ class DBLogic:
         """
         if self.verify_country_code(country_code) is None:
             return None
-        content = self.dataWrapper.get_services_count(country_code)
-        return self.__shortify(self.__sort_highest_first(content))
+        content = self.dataWrapper.get_services_count(country_code, self.top_k['services_count'])
+        if not isinstance(content, dict):
+            return None
+        return self.__top_entries(content, self.top_k['services_count'])
 
     def get_versions_count(self, country_code: str):
         """
-        Return top 5 versions by occurrence.
+        Return the top versions by occurrence.
 
         Args:
             country_code (str): Country code.
@@ -188,12 +324,14 @@ class DBLogic:
         """
         if self.verify_country_code(country_code) is None:
             return None
-        content = self.dataWrapper.get_versions_count(country_code)
-        return self.__shortify(self.__sort_highest_first(content))
+        content = self.dataWrapper.get_versions_count(country_code, self.top_k['versions_count'])
+        if not isinstance(content, dict):
+            return None
+        return self.__top_entries(content, self.top_k['versions_count'])
 
     def get_os_count(self, country_code: str):
         """
-        Return top 5 operating systems by occurrence.
+        Return the top operating systems by occurrence.
 
         Args:
             country_code (str): Country code.
@@ -203,12 +341,14 @@ class DBLogic:
         """
         if self.verify_country_code(country_code) is None:
             return None
-        content = self.dataWrapper.get_os_count(country_code)
-        return self.__shortify(self.__sort_highest_first(content))
+        content = self.dataWrapper.get_os_count(country_code, self.top_k['os_count'])
+        if not isinstance(content, dict):
+            return None
+        return self.__top_entries(content, self.top_k['os_count'])
 
     def get_cpe_count(self, country_code: str):
         """
-        Return top 5 CPE identifiers by occurrence.
+        Return the top CPE identifiers by occurrence.
 
         Args:
             country_code (str): Country code.
@@ -218,5 +358,7 @@ class DBLogic:
         """
         if self.verify_country_code(country_code) is None:
             return None
-        content = self.dataWrapper.get_cpe_count(country_code)
-        return self.__shortify(self.__sort_highest_first(content))
+        content = self.dataWrapper.get_cpe_count(country_code, self.top_k['cpe_count'])
+        if not isinstance(content, dict):
+            return None
+        return self.__top_entries(content, self.top_k['cpe_count'])
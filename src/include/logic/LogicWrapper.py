@@ -1,6 +1,14 @@
 from src.include.data.DataWrapper import DataWrapper
+from src.include.data.Metrics import timed
+from src.include.data.SharedCache import SharedCache
+from src.include.models.countrySummaryModel import CountrySummaryModel
+import contextvars
+import os
 import sys
-from .DBLogic import DBLogic
+from concurrent.futures import ThreadPoolExecutor, wait
+from .ChangeBroadcaster import ChangeBroadcaster
+from .DBLogic import BREAKDOWN_WIDGETS, DBLogic
+from .ResponseCache import ResponseCache
 
 sys.path.append('../../')
 
@@ -13,9 +21,284 @@ class LogicWrapper:
     """
 
     def __init__(self):
-        """Initialize LogicWrapper with internal DBLogic and DataWrapper instances."""
+        """Initialize LogicWrapper with internal DBLogic and DataWrapper instances and the host-wide cache."""
         self.dataWrapper = DataWrapper()
         self.dbLogic = DBLogic(self.dataWrapper)
+        # Shared by every gunicorn worker on the host, so one DB fetch warms all of them
+        self.sharedCache = SharedCache(
+            directory=os.environ.get('SHARED_CACHE_DIR') or None,
+            ttl=float(os.environ.get('SHARED_CACHE_TTL', 300)),
+            max_entries=int(os.environ.get('SHARED_CACHE_SIZE', 256))
+        )
+        # Bounded pool for running independent lookups concurrently
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.environ.get('FETCH_WORKERS', 4)),
+            thread_name_prefix='volva-fetch'
+        )
+        self.fetch_deadline = float(os.environ.get('FETCH_DEADLINE', 10))
+        # Latest scan time per country, used as the HTTP cache validator
+        self.scanTimeCache = ResponseCache(
+            ttl=float(os.environ.get('SCAN_TS_TTL', 30)),
+            max_entries=256
+        )
+        # Full breakdowns sorted for paging, keyed by (country, column)
+        self.breakdownCache = ResponseCache(
+            ttl=float(os.environ.get('BREAKDOWN_CACHE_TTL', 300)),
+            max_entries=int(os.environ.get('BREAKDOWN_CACHE_SIZE', 32))
+        )
+        # Wakes live update streams when the change listener reports a country's data changed
+        self.changeBroadcaster = ChangeBroadcaster()
+        # Downsampled history series, keyed by every query parameter
+        self.historyCache = ResponseCache(
+            ttl=float(os.environ.get('HISTORY_CACHE_TTL', 300)),
+            max_entries=128
+        )
+
+    def fetch_concurrently(self, lookups, deadline=None):
+        """
+        Run independent lookups on the worker's thread pool and collect their results.
+
+        A lookup that raises, or has not finished when the deadline passes, yields its
+        fallback value instead, so callers see the same sentinels as a failed query.
+
+        Args:
+            lookups (dict): Maps a result name to a ``(callable, args, fallback)`` tuple.
+            deadline (float, optional): Seconds to wait for all lookups. Defaults to ``fetch_deadline``.
+
+        Returns:
+            dict: Result name -> lookup result or its fallback.
+        """
+        if deadline is None:
+            deadline = self.fetch_deadline
+
+        # Each lookup runs in a copy of the caller's context so it is recorded in the request trace
+        futures = {
+            name: self.executor.submit(contextvars.copy_context().run, func, *args)
+            for name, (func, args, _) in lookups.items()
+        }
+        wait(futures.values(), timeout=deadline)
+
+        results = {}
+        for name, future in futures.items():
+            fallback = lookups[name][2]
+            if not future.done():
+                future.cancel()
+                print(f"[FETCH ERROR] {name} did not finish within {deadline}s")
+                results[name] = fallback
+            elif future.exception() is not None:
+                print(f"[FETCH ERROR] {name} failed: {future.exception()}")
+                results[name] = fallback
+            else:
+                results[name] = future.result()
+        return results
+
+    def warm_up(self, deadline=None):
+        """
+        Open pooled connections, load the country codes and fetch every country's snapshot.
+
+        Snapshots land in the host-wide shared cache, so workers warming up after the
+        first one mostly read from it.
+
+        Args:
+            deadline (float, optional): Seconds to wait for the snapshots. Defaults to ``fetch_deadline``.
+
+        Returns:
+            dict or None: Country code -> snapshot (None where it could not be fetched),
+            or None if the country codes could not be loaded.
+        """
+        self.dataWrapper.prefill_pool()
+        codes = self.refresh_country_codes()
+        if codes is None:
+            return None
+        return self.fetch_concurrently(
+            {code: (self.get_country_summary, (code,), None) for code in codes},
+            deadline
+        )
+
+    def refresh_country_codes(self):
+        """
+        Reload the cached list of valid country codes. Call this when new scan summaries land.
+
+        Returns:
+            frozenset[str] or None: The known country codes.
+        """
+        return self.dbLogic.refresh_country_codes()
+
+    def invalidate_country(self, country_code):
+        """
+        Drop the cached snapshot, scan time, breakdowns and history of a country so the next lookup hits the database.
+
+        Args:
+            country_code (str): The country code.
+        """
+        country_code = country_code.upper()
+        self.sharedCache.delete(f"summary:{country_code}")
+        self.scanTimeCache.invalidate(country_code)
+        for column in BREAKDOWN_WIDGETS:
+            self.breakdownCache.invalidate((country_code, column))
+        # History entries are keyed by range as well, so drop them all; they are cheap to rebuild
+        self.historyCache.invalidate()
+
+    def invalidate_all(self):
+        """Drop every cached snapshot, scan time, breakdown and history, and reload the country codes."""
+        self.sharedCache.clear()
+        self.scanTimeCache.invalidate()
+        self.breakdownCache.invalidate()
+        self.historyCache.invalidate()
+        self.refresh_country_codes()
+
+    def listen_for_changes(self, on_change=None):
+        """
+        Invalidate a country's cached data as soon as the database announces a write to its summary.
+
+        Live update streams waiting on ``changeBroadcaster`` are woken once the caches are fresh.
+
+        Args:
+            on_change (callable, optional): Called after invalidation with the changed
+                country code, or None when everything was invalidated.
+
+        Returns:
+            ChangeListener: The running listener.
+        """
+        def changed(payload):
+            country_code = (payload or '').strip().upper()
+            if not country_code:
+                reconnected()
+                return
+            self.invalidate_country(country_code)
+            codes = self.dbLogic.countryRegistry.codes()
+            if codes is not None and country_code not in codes:
+                self.refresh_country_codes()
+            if on_change is not None:
+                on_change(country_code)
+            self.changeBroadcaster.publish(country_code)
+
+        def reconnected():
+            self.invalidate_all()
+            if on_change is not None:
+                on_change(None)
+            self.changeBroadcaster.publish(None)
+
+        return self.dataWrapper.listen_for_changes(changed, reconnected)
+
+    @timed
+    def get_last_scan_ts(self, country_code):
+        """
+        Get when the latest port scan for a country finished, cached for a short time.
+
+        Args:
+            country_code (str): The country code.
+
+        Returns:
+            datetime or None: Latest scan completion time.
+        """
+        country_code = country_code.upper()
+        return self.scanTimeCache.get(country_code, lambda: self.dbLogic.get_last_scan_ts(country_code))
+
+    @timed
+    def get_country_summary(self, country_code):
+        """
+        Get a snapshot of every landing page statistic for a country in one lookup.
+
+        The snapshot is read from the host-wide shared cache when another worker
+        has already fetched it.
+
+        Args:
+            country_code (str): The country code.
+
+        Returns:
+            CountrySummaryModel or None: Country snapshot with top-ranked breakdowns.
+        """
+        cache_key = f"summary:{country_code.upper()}"
+        cached = self.sharedCache.get(cache_key)
+        if cached is not None:
+            return CountrySummaryModel.from_dict(cached)
+
+        summary = self.dbLogic.get_country_summary(country_code)
+        # Last known good copies are served but not cached, so the next request tries the database again
+        if summary is not None and not summary.is_fallback:
+            self.sharedCache.set(cache_key, summary.to_dict())
+        return summary
+
+    @timed
+    def get_country_summaries(self, country_codes):
+        """
+        Get the snapshots of several countries, e.g. for a comparison.
+
+        Snapshots already in the shared cache are reused; the rest are fetched
+        together in a single query and cached one by one, so they also serve the
+        countries' landing pages. Last known good copies returned while the database
+        is unreachable are not cached.
+
+        Args:
+            country_codes (list[str]): The country codes.
+
+        Returns:
+            dict or None: Country code -> CountrySummaryModel, in the order asked for.
+            Unknown countries are left out.
+        """
+        codes = list(dict.fromkeys(code.upper() for code in country_codes))
+        summaries = {}
+        missing = []
+        for code in codes:
+            cached = self.sharedCache.get(f"summary:{code}")
+            if cached is not None:
+                summaries[code] = CountrySummaryModel.from_dict(cached)
+            else:
+                missing.append(code)
+
+        if missing:
+            fetched = self.dbLogic.get_country_summaries(missing)
+            if fetched is None:
+                return None
+            for code, summary in fetched.items():
+                if not summary.is_fallback:
+                    self.sharedCache.set(f"summary:{code}", summary.to_dict())
+                summaries[code] = summary
+        return {code: summaries[code] for code in codes if code in summaries}
+
+    @timed
+    def get_country_summary_concurrently(self, country_code, deadline=None):
+        """
+        Build the country snapshot by running each section's lookup concurrently.
+
+        Counters that could not be fetched are -1, breakdowns are None and the
+        time series is empty, matching the sequential getters.
+
+        Args:
+            country_code (str): The country code.
+            deadline (float, optional): Seconds to wait for all lookups.
+
+        Returns:
+            CountrySummaryModel or None: Country snapshot with top-ranked breakdowns, or None
+            if the country is unknown or the country codes could not be loaded.
+        """
+        if not self.dbLogic.verify_country_code(country_code):
+            return None
+        country_code = country_code.upper()
+        args = (country_code,)
+
+        results = self.fetch_concurrently({
+            'ips_count': (self.dbLogic.get_ips_count, args, -1),
+            'total_alive_hosts': (self.dbLogic.get_total_alive_hosts, args, -1),
+            'port_amount': (self.dbLogic.get_port_amount, args, -1),
+            'total_open_ports': (self.dbLogic.get_total_open_ports, args, -1),
+            'unique_open_ports': (self.dbLogic.get_unique_open_ports, args, None),
+            'services_count': (self.dbLogic.get_services_count, args, None),
+            'versions_count': (self.dbLogic.get_versions_count, args, None),
+            'os_count': (self.dbLogic.get_os_count, args, None),
+            'products_count': (self.dbLogic.get_products_count, args, None),
+            'cpe_count': (self.dbLogic.get_cpe_count, args, None),
+            'plot': (self.dbLogic.get_total_open_ports_plot, args, (None, None))
+        }, deadline)
+
+        dates, values = results.pop('plot') or (None, None)
+        return CountrySummaryModel(
+            country_code,
+            open_ports_dates=dates or [],
+            open_ports_values=values or [],
+            **results
+        )
 
     def get_total_alive_hosts(self, country_code):
         """
@@ -77,6 +360,49 @@ class LogicWrapper:
         """
         return self.dbLogic.get_total_open_ports_plot(country_code)
 
+    @timed
+    def get_breakdown(self, country_code, column):
+        """
+        Get every entry of a breakdown, sorted once per scan and cached for paging.
+
+        Args:
+            country_code (str): The country code.
+            column (str): Summary column of the breakdown, e.g. `cpe_count`.
+
+        Returns:
+            BreakdownIndex or None: Sorted breakdown.
+        """
+        country_code = country_code.upper()
+        return self.breakdownCache.get(
+            (country_code, column),
+            lambda: self.dbLogic.get_breakdown_index(country_code, column)
+        )
+
+    @timed
+    def get_open_ports_history(self, country_code, start, end, granularity='day', max_points=None):
+        """
+        Get the open ports time series over a time range, aggregated and downsampled.
+
+        Args:
+            country_code (str): The country code.
+            start (datetime): Inclusive start of the range.
+            end (datetime): Exclusive end of the range.
+            granularity (str): Bucket size: scan, day, week or month.
+            max_points (int, optional): Maximum number of points to return.
+
+        Returns:
+            tuple: (labels, values) or (None, None) on failure.
+        """
+        country_code = country_code.upper()
+        key = (country_code, start.isoformat(), end.isoformat(), granularity, max_points)
+        history = self.historyCache.get(key, lambda: self.__fetch_history(country_code, start, end, granularity, max_points))
+        return history or (None, None)
+
+    def __fetch_history(self, country_code, start, end, granularity, max_points):
+        """Fetch a history series, returning None on failure so it is not cached."""
+        labels, values = self.dbLogic.get_open_ports_history(country_code, start, end, granularity, max_points)
+        return None if labels is None else (labels, values)
+
     def get_unique_open_ports(self, country_code):
         """
         Get the most common unique open ports for a country.
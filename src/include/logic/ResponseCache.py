@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class ResponseCache:
+    """
+    A bounded, thread-safe cache with stale-while-revalidate semantics.
+
+    Fresh entries are returned as-is. Expired entries are still returned, while
+    a single background thread rebuilds them. On a miss, concurrent callers for
+    the same key share one build instead of each running the builder. Builders
+    returning None are treated as failures and never cached.
+
+    Attributes:
+        ttl (float): Seconds an entry is considered fresh.
+        max_entries (int): Maximum number of entries kept; least recently used are evicted first.
+        cacheable (callable or None): Predicate a built value must pass to be stored.
+    """
+
+    def __init__(self, ttl=300.0, max_entries=64, cacheable=None):
+        """
+        Initialize an empty cache.
+
+        Args:
+            ttl (float): Seconds an entry is considered fresh.
+            max_entries (int): Maximum number of cached entries.
+            cacheable (callable, optional): Returns False for built values that should be
+                handed to the waiting callers but not stored, e.g. ones built from degraded data.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cacheable = cacheable
+        self.__entries = OrderedDict()  # key -> (value, stored_at)
+        self.__inflight = {}  # key -> Future of a running build
+        self.__lock = threading.Lock()
+
+    def get(self, key, builder):
+        """
+        Get the cached value for a key, building it if missing and refreshing it if stale.
+
+        Args:
+            key (Hashable): Cache key, e.g. a country code.
+            builder (callable): Builds the value; returns None on failure.
+
+        Returns:
+            Any: The cached or freshly built value, or None if the build failed.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+
+        if entry is None:
+            return self.__build(key, builder, wait=True)
+
+        value, stored_at = entry
+        if time.monotonic() - stored_at > self.ttl:
+            self.__build(key, builder, wait=False)
+        return value
+
+    def peek(self, key):
+        """
+        Get a fresh cached value without building, refreshing or reordering anything.
+
+        Args:
+            key (Hashable): Cache key.
+
+        Returns:
+            Any: The value if it is cached and fresh, otherwise None.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def put(self, key, value):
+        """
+        Store a value, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key (Hashable): Cache key.
+            value (Any): Value to store. None values are ignored.
+        """
+        if value is None:
+            return
+        with self.__lock:
+            self.__entries[key] = (value, time.monotonic())
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """
+        Drop one entry, or every entry if no key is given.
+
+        Args:
+            key (Hashable, optional): Key to drop.
+        """
+        with self.__lock:
+            if key is None:
+                self.__entries.clear()
+            else:
+                self.__entries.pop(key, None)
+
+    def __build(self, key, builder, wait):
+        """
+        Run the builder for a key unless a build for it is already running.
+
+        Args:
+            key (Hashable): Cache key.
+            builder (callable): Builds the value.
+            wait (bool): Block until the value is built; otherwise build in a background thread.
+
+        Returns:
+            Any: The built value when waiting, otherwise None.
+        """
+        with self.__lock:
+            future = self.__inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.__inflight[key] = future
+
+        if owner:
+            if wait:
+                self.__run_build(key, builder, future)
+            else:
+                threading.Thread(target=self.__run_build, args=(key, builder, future),
+                                 name="response-cache-refresh", daemon=True).start()
+
+        if not wait:
+            return None
+        return future.result()
+
+    def __run_build(self, key, builder, future):
+        """Run a build and publish its result to every waiting caller."""
+        value = None
+        try:
+            value = builder()
+            if value is not None and (self.cacheable is None or self.cacheable(value)):
+                self.put(key, value)
+        except Exception as e:
+            print(f"[CACHE ERROR] could not build {key!r}: {e}")
+        finally:
+            with self.__lock:
+                self.__inflight.pop(key, None)
+            future.set_result(value)
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+
+class CompareLogic:
+    """A utility class containing static methods for putting several countries on shared charts."""
+
+    @staticmethod
+    def align_series(series, label_format="%d-%m-%Y"):
+        """
+        Put the time series of several countries on one shared x axis.
+
+        The shared labels are the union of every country's labels in chronological
+        order. A country without a point at a label gets None there, which charts
+        draw as a gap.
+
+        Args:
+            series (dict): Country code -> (labels, values).
+            label_format (str): strptime format of the labels.
+
+        Returns:
+            tuple: (labels: list[str], values: dict of country code -> list aligned with the labels).
+        """
+        parsed = {}
+        for labels, _ in series.values():
+            for label in labels:
+                if label not in parsed:
+                    parsed[label] = datetime.strptime(label, label_format)
+        shared = sorted(parsed, key=parsed.get)
+
+        aligned = {}
+        for country_code, (labels, values) in series.items():
+            points = dict(zip(labels, values))
+            aligned[country_code] = [points.get(label) for label in shared]
+        return shared, aligned
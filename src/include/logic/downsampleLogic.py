@@ -0,0 +1,54 @@
+class DownsampleLogic:
+    """A utility class containing static methods for reducing time series to a point budget."""
+
+    @staticmethod
+    def lttb(x_vals, y_vals, threshold):
+        """
+        Downsample a series with the Largest-Triangle-Three-Buckets algorithm.
+
+        The first and last points are always kept. Every other bucket contributes the
+        point that forms the largest triangle with the previously kept point and the
+        average of the next bucket, which preserves peaks and dips in the shape.
+
+        Args:
+            x_vals (list[float]): Increasing x values, e.g. timestamps.
+            y_vals (list[float]): Y values matching `x_vals`.
+            threshold (int): Maximum number of points to return, at least 3.
+
+        Returns:
+            list[int]: Indices of the kept points, in increasing order.
+        """
+        length = len(x_vals)
+        if threshold >= length or threshold < 3:
+            return list(range(length))
+
+        kept = [0]
+        bucket_size = (length - 2) / (threshold - 2)
+        previous = 0
+
+        for bucket in range(threshold - 2):
+            start = int(bucket * bucket_size) + 1
+            end = int((bucket + 1) * bucket_size) + 1
+
+            next_start = end
+            next_end = min(int((bucket + 2) * bucket_size) + 1, length)
+            next_count = next_end - next_start
+            avg_x = sum(x_vals[next_start:next_end]) / next_count
+            avg_y = sum(y_vals[next_start:next_end]) / next_count
+
+            prev_x = x_vals[previous]
+            prev_y = y_vals[previous]
+            best_index = start
+            best_area = -1.0
+            for index in range(start, end):
+                area = abs((prev_x - avg_x) * (y_vals[index] - prev_y)
+                           - (prev_x - x_vals[index]) * (avg_y - prev_y))
+                if area > best_area:
+                    best_area = area
+                    best_index = index
+
+            kept.append(best_index)
+            previous = best_index
+
+        kept.append(length - 1)
+        return kept
@@ -0,0 +1,75 @@
+class SummaryDiffLogic:
+    """A utility class containing static methods for comparing country snapshots."""
+
+    # CountrySummaryModel fields shown as single counters
+    COUNTER_FIELDS = ('ips_count', 'total_alive_hosts', 'port_amount', 'total_open_ports')
+    # CountrySummaryModel fields holding ranked breakdowns
+    BREAKDOWN_FIELDS = ('unique_open_ports', 'services_count', 'versions_count', 'os_count',
+                        'products_count', 'cpe_count')
+
+    @staticmethod
+    def diff(previous, current):
+        """
+        Describe what changed between two snapshots of the same country.
+
+        Args:
+            previous (CountrySummaryModel or None): Snapshot the client already shows,
+                or None if it has nothing yet.
+            current (CountrySummaryModel): Latest snapshot.
+
+        Returns:
+            dict: Changed `counters` and `breakdowns` (as `[name, count]` pairs) and the
+            `series` update, only with the keys that changed; empty if nothing did.
+        """
+        delta = {}
+
+        counters = {
+            field: getattr(current, field) for field in SummaryDiffLogic.COUNTER_FIELDS
+            if previous is None or getattr(previous, field) != getattr(current, field)
+        }
+        if counters:
+            delta['counters'] = counters
+
+        breakdowns = {}
+        for field in SummaryDiffLogic.BREAKDOWN_FIELDS:
+            entries = list((getattr(current, field) or {}).items())
+            if previous is None or list((getattr(previous, field) or {}).items()) != entries:
+                breakdowns[field] = [[name, count] for name, count in entries]
+        if breakdowns:
+            delta['breakdowns'] = breakdowns
+
+        series = SummaryDiffLogic.series_update(
+            None if previous is None else list(zip(previous.open_ports_dates, previous.open_ports_values)),
+            list(zip(current.open_ports_dates, current.open_ports_values))
+        )
+        if series is not None:
+            delta['series'] = {'open_ports': series}
+
+        if delta:
+            delta['scanned_at'] = current.port_scan_done_ts.isoformat() if current.port_scan_done_ts else None
+        return delta
+
+    @staticmethod
+    def series_update(previous, current):
+        """
+        Express a sliding time series window as the points to append to the previous one.
+
+        Args:
+            previous (list[tuple] or None): (label, value) points the client shows.
+            current (list[tuple]): Latest (label, value) points.
+
+        Returns:
+            dict or None: `{"append": [[label, value], ...], "window": n}` if the window only
+            moved forward, `{"replace": [[label, value], ...]}` otherwise, or None if unchanged.
+        """
+        if previous == current:
+            return None
+        if previous:
+            # Largest overlap where the start of the new window is the end of the old one
+            for overlap in range(min(len(previous), len(current)), 0, -1):
+                if previous[-overlap:] == current[:overlap]:
+                    return {
+                        'append': [[label, value] for label, value in current[overlap:]],
+                        'window': len(current)
+                    }
+        return {'replace': [[label, value] for label, value in current]}
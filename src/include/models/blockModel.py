@@ -5,15 +5,18 @@ class BlockModel:
     Attributes:
         title (str): The title or label for the block.
         value (Any): The associated value for the block.
+        key (str): Name of the value in live updates, or None.
     """
 
-    def __init__(self, title, value):
+    def __init__(self, title, value, key=None):
         """
         Initialize a BlockModel instance.
 
         Args:
             title (str): The title of the block.
             value (Any): The value associated with the block.
+            key (str, optional): Name of the value in live updates.
         """
         self.title = title
         self.value = value
+        self.key = key
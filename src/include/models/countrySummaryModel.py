@@ -0,0 +1,105 @@
+from datetime import datetime
+
+
+class CountrySummaryModel:
+    """
+    A snapshot of the latest scan summary for a single country.
+
+    Attributes:
+        country_code (str): The country code the snapshot belongs to.
+        ips_count (int): Total number of scanned IPs.
+        total_alive_hosts (int): Number of IPs that responded.
+        port_amount (int): Number of ports scanned.
+        total_open_ports (int): Number of open ports found.
+        unique_open_ports (dict): Open port -> occurrence count.
+        services_count (dict): Service -> occurrence count.
+        versions_count (dict): Software version -> occurrence count.
+        os_count (dict): Operating system -> occurrence count.
+        products_count (dict): Product -> occurrence count.
+        cpe_count (dict): CPE identifier -> occurrence count.
+        open_ports_dates (list[str]): Scan dates (DD-MM-YYYY) for the open ports time series.
+        open_ports_values (list[int]): Open port totals matching ``open_ports_dates``.
+        port_scan_done_ts (datetime or None): When the latest port scan finished.
+        is_fallback (bool): True for a last known good copy returned while the database was
+            unreachable. Not serialized, so it never outlives the request that fetched it.
+    """
+
+    def __init__(self,
+                 country_code: str,
+                 ips_count: int,
+                 total_alive_hosts: int,
+                 port_amount: int,
+                 total_open_ports: int,
+                 unique_open_ports: dict,
+                 services_count: dict,
+                 versions_count: dict,
+                 os_count: dict,
+                 products_count: dict,
+                 cpe_count: dict,
+                 open_ports_dates: list,
+                 open_ports_values: list,
+                 port_scan_done_ts: datetime | None = None) -> None:
+        """
+        Initialize a CountrySummaryModel instance.
+
+        Args:
+            country_code (str): Country code.
+            ips_count (int): Total scanned IPs.
+            total_alive_hosts (int): Total alive hosts.
+            port_amount (int): Number of ports scanned.
+            total_open_ports (int): Number of open ports.
+            unique_open_ports (dict): Open ports by occurrence.
+            services_count (dict): Services by occurrence.
+            versions_count (dict): Versions by occurrence.
+            os_count (dict): Operating systems by occurrence.
+            products_count (dict): Products by occurrence.
+            cpe_count (dict): CPE identifiers by occurrence.
+            open_ports_dates (list): Time series labels.
+            open_ports_values (list): Time series values.
+            port_scan_done_ts (datetime, optional): Completion time of the latest scan.
+        """
+        self.country_code = country_code
+        self.ips_count = ips_count
+        self.total_alive_hosts = total_alive_hosts
+        self.port_amount = port_amount
+        self.total_open_ports = total_open_ports
+        self.unique_open_ports = unique_open_ports
+        self.services_count = services_count
+        self.versions_count = versions_count
+        self.os_count = os_count
+        self.products_count = products_count
+        self.cpe_count = cpe_count
+        self.open_ports_dates = open_ports_dates
+        self.open_ports_values = open_ports_values
+        self.port_scan_done_ts = port_scan_done_ts
+        self.is_fallback = False
+
+    def to_dict(self) -> dict:
+        """
+        Convert the snapshot to a JSON-serializable dictionary.
+
+        Returns:
+            dict: Snapshot attributes except ``is_fallback``, with the scan timestamp as an ISO 8601 string.
+        """
+        data = dict(self.__dict__)
+        del data['is_fallback']
+        if self.port_scan_done_ts is not None:
+            data['port_scan_done_ts'] = self.port_scan_done_ts.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CountrySummaryModel":
+        """
+        Build a snapshot from a dictionary produced by ``to_dict``.
+
+        Args:
+            data (dict): Snapshot attributes.
+
+        Returns:
+            CountrySummaryModel: The restored snapshot.
+        """
+        data = dict(data)
+        data.pop('is_fallback', None)
+        if data.get('port_scan_done_ts') is not None:
+            data['port_scan_done_ts'] = datetime.fromisoformat(data['port_scan_done_ts'])
+        return cls(**data)
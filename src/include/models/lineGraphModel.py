@@ -7,9 +7,10 @@ class LineGraphModel:
         title (str): The title of the graph.
         x_vals (list): The x-axis values shared by all plots.
         plots (tuple): One or more plot datasets to render.
+        series (str): Name of the series in live updates, or None.
     """
 
-    def __init__(self, canvas_id, title, x_vals, *plots):
+    def __init__(self, canvas_id, title, x_vals, *plots, series=None):
         """
         Initialize the LineGraphModel.
 
@@ -18,11 +19,13 @@ class LineGraphModel:
             title (str): Title of the graph.
             x_vals (list): X-axis values.
             *plots: One or more plot objects or datasets.
+            series (str, optional): Name of the series in live updates.
         """
         self.canvas_id = canvas_id
         self.title = title
         self.x_vals = x_vals
         self.plots = plots
+        self.series = series
 
     def __len__(self):
         """
@@ -5,15 +5,21 @@ class MultiBlockModel:
     Attributes:
         title (str): The title of the block.
         content (Any): The content associated with the block.
+        url (str): Link to the page listing every entry, or None.
+        key (str): Name of the content in live updates, or None.
     """
 
-    def __init__(self, title, content):
+    def __init__(self, title, content, url=None, key=None):
         """
         Initialize a MultiBlockModel instance.
 
         Args:
             title (str): The block title.
             content (Any): The associated content (e.g., list, dict, text).
+            url (str, optional): Link to the page listing every entry.
+            key (str, optional): Name of the content in live updates.
         """
         self.title = title
         self.content = content
+        self.url = url
+        self.key = key
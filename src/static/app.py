@@ -1,10 +1,33 @@
+from src.include.data.DBData import HISTORY_GRANULARITIES
+from src.include.data.Metrics import finish_trace, metrics, record_span, start_trace
+from src.include.data.SharedCache import private_directory, runtime_directory
+from src.include.logic.DBLogic import BREAKDOWN_WIDGETS
 from src.include.logic.LogicWrapper import LogicWrapper
+from src.include.logic.ResponseCache import ResponseCache
+from src.include.logic.compareLogic import CompareLogic
+from src.include.logic.summaryDiffLogic import SummaryDiffLogic
 from src.include.models.lineGraphModel import LineGraphModel
 from src.include.models.blockModel import BlockModel
 from src.include.models.multiBlockModel import MultiBlockModel
+from src.static.assets import BUILD_DIR, BUILD_MANIFEST, IMAGE_MANIFEST, bundle_urls, install_asset_resolver, \
+    load_manifest, responsive_image
+from src.static.compression import install_compression
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import os
 import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
-from flask import Flask, render_template
+from flask import Flask, Response, before_render_template, g, make_response, render_template, request, \
+    stream_template, template_rendered, url_for
+from jinja2 import FileSystemBytecodeCache, TemplateError
+from markupsafe import Markup
+from werkzeug.http import is_resource_modified
 
 # Load environment variables from .env file
 load_dotenv()
@@ -13,7 +36,222 @@ load_dotenv()
 
 # Initialize Flask app and logic interface
 app = Flask(__name__)
+# Set by the static export: pages leave out live updates and links to pages it does not export
+app.config['STATIC_EXPORT'] = False
+# Compiled templates are kept on disk, so restarted workers load them instead of compiling again.
+# Jinja keys each entry by the template source's checksum, so edited templates are recompiled.
+TEMPLATE_CACHE_DIR = os.environ.get('TEMPLATE_CACHE_DIR') or runtime_directory('volva-templates')
+if os.environ.get('TEMPLATE_BYTECODE_CACHE', '1') == '1':
+    # Cached bytecode is executed on load, so the cache is only used if no one else can write it
+    if private_directory(TEMPLATE_CACHE_DIR):
+        app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)}
+    else:
+        print(f"[TEMPLATE ERROR] {TEMPLATE_CACHE_DIR} is not a directory private to this user, "
+              "the bytecode cache is disabled")
 logicWrapper = LogicWrapper()
+# Assembled landing page models per country, served stale while one refresh rebuilds them.
+# Models built from a last known good snapshot while the database is down are never stored.
+landingCache = ResponseCache(
+    ttl=float(os.environ.get('LANDING_CACHE_TTL', 300)),
+    max_entries=int(os.environ.get('LANDING_CACHE_SIZE', 64)),
+    cacheable=lambda landing_models: not landing_models['is_fallback']
+)
+# Seconds browsers and proxies may reuse a JSON API response without revalidating
+API_MAX_AGE = int(os.environ.get('API_MAX_AGE', 60))
+# Point budget of the history endpoint: default and upper bound of its `points` parameter
+HISTORY_DEFAULT_POINTS = int(os.environ.get('HISTORY_DEFAULT_POINTS', 200))
+HISTORY_MAX_POINTS = int(os.environ.get('HISTORY_MAX_POINTS', 1000))
+# Breakdowns by URL name: (summary column, title of its landing page cell)
+BREAKDOWN_KINDS = {
+    'ports': ('open_ports_count', "Ports Identified"),
+    'services': ('services_count', "Services Identified"),
+    'versions': ('versions_count', "Versions Identified"),
+    'os': ('os_count', "OS Identified"),
+    'products': ('products_count', "Products Identified"),
+    'cpe': ('cpe_count', "CPE Identified")
+}
+# Entries per breakdown page: default and upper bound of the `limit` parameter
+BREAKDOWN_PAGE_SIZE = 50
+BREAKDOWN_MAX_PAGE_SIZE = 200
+# Most countries one comparison may ask for
+COMPARE_MAX_COUNTRIES = int(os.environ.get('COMPARE_MAX_COUNTRIES', 50))
+# "buffered" renders the landing page before sending it; "streamed" sends the page head and
+# static shell first and renders the data-dependent cells once the snapshot has been fetched
+LANDING_RENDER_MODE = os.environ.get('LANDING_RENDER_MODE', 'buffered')
+# Rendered chunks are sent in pieces of about this many bytes once the snapshot is there
+STREAM_BUFFER_SIZE = 8192
+# Rendered by templates as `{{ stream_flush }}` where a streamed page sends its head; empty when buffered
+STREAM_FLUSH_MARKER = Markup('<!--volva:flush-->')
+# Live update streams: concurrent streams per worker, seconds before a stream ends and the
+# browser reconnects, seconds between keep-alive comments and between scan time checks
+SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', 8))
+SSE_STREAM_LIFETIME = float(os.environ.get('SSE_STREAM_LIFETIME', 300))
+SSE_HEARTBEAT = float(os.environ.get('SSE_HEARTBEAT', 15))
+SSE_POLL_INTERVAL = float(os.environ.get('SSE_POLL_INTERVAL', 30))
+streamSlots = threading.BoundedSemaphore(max(SSE_MAX_STREAMS, 1))
+
+
+# Built asset names from `python -m src.static.build_assets`; without a build the source files are linked
+ASSET_MANIFEST = os.environ.get('ASSET_MANIFEST') or os.path.join(app.root_path, BUILD_DIR, BUILD_MANIFEST)
+assetManifest = load_manifest(ASSET_MANIFEST)
+install_asset_resolver(app, assetManifest)
+# Responsive image variants from the same build, for `srcset`
+IMAGE_MANIFEST_PATH = os.path.join(os.path.dirname(ASSET_MANIFEST), IMAGE_MANIFEST)
+imageManifest = load_manifest(IMAGE_MANIFEST_PATH)
+
+
+@app.template_global()
+def asset_urls(name):
+    """
+    URLs to load an asset bundle from, e.g. `js/app.js`: its built file, or its members without a build.
+
+    Args:
+        name (str): Bundle name.
+
+    Returns:
+        list[str]: URLs in load order.
+    """
+    return bundle_urls(name, assetManifest, app.root_path, lambda filename: url_for('static', filename=filename))
+
+
+@app.template_global()
+def image_variants(name):
+    """
+    Responsive variants of a built image, e.g. `img/volva-logo-cropped.png`.
+
+    Args:
+        name (str): Source image name.
+
+    Returns:
+        dict or None: `src`, `width`, `height` and `sources` with a `type` and `srcset`,
+        or None if the image was not built.
+    """
+    return responsive_image(name, imageManifest, lambda filename: url_for('static', filename=filename))
+
+
+def compute_render_version():
+    """
+    Hash the templates and this module so cache validators change when a deploy changes the output.
+
+    Returns:
+        str: Short hex digest.
+    """
+    digest = hashlib.sha1()
+    paths = [__file__]
+    paths.extend(path for path in (ASSET_MANIFEST, IMAGE_MANIFEST_PATH) if os.path.exists(path))
+    for root, _, files in os.walk(os.path.join(app.root_path, app.template_folder)):
+        paths.extend(os.path.join(root, name) for name in files)
+    for path in sorted(paths):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+RENDER_VERSION = compute_render_version()
+
+# Every worker dumps its metrics here so /metrics can report the whole host
+METRICS_DIR = os.environ.get('METRICS_DIR') or runtime_directory('volva-metrics')
+# One JSON line per request with the timing of every query, logic call and template render
+traceLogger = logging.getLogger('volva.trace')
+if os.environ.get('TRACE_LOG') == '1':
+    traceLogger.setLevel(logging.INFO)
+    traceLogger.addHandler(logging.StreamHandler())
+# Rendered macro output (landing page cells and chart scripts), keyed by a hash of the macro and its arguments
+fragmentCache = ResponseCache(ttl=float('inf'), max_entries=int(os.environ.get('FRAGMENT_CACHE_SIZE', 1024)))
+# Set once this worker has warmed its caches; /readyz reports 503 until then
+appReady = threading.Event()
+warmUpLock = threading.Lock()
+warmUpThread = None
+
+
+@app.before_request
+def start_request_trace():
+    """Start timing the request and collecting its trace spans."""
+    g.trace_token = start_trace()
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def finish_request_trace(response):
+    """
+    Record the request duration, log its trace and share this worker's metrics.
+
+    Args:
+        response (Response): Outgoing response.
+
+    Returns:
+        Response: The same response.
+    """
+    if 'trace_token' not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    spans = finish_trace(g.pop('trace_token'))
+    metrics.observe('volva_request_seconds', elapsed, endpoint=request.endpoint or 'unknown',
+                    status=response.status_code)
+    if traceLogger.isEnabledFor(logging.INFO):
+        traceLogger.info(json.dumps({
+            'path': request.path,
+            'status': response.status_code,
+            'ms': round(elapsed * 1000, 3),
+            'spans': spans
+        }, separators=(',', ':')))
+    metrics.dump(METRICS_DIR)
+    return response
+
+
+# gzip/Brotli for clients that accept it, so responses are small even without nginx in front
+if os.environ.get('COMPRESS_RESPONSES', '1') == '1':
+    install_compression(
+        app,
+        min_size=int(os.environ.get('COMPRESS_MIN_SIZE', 500)),
+        level=int(os.environ.get('COMPRESS_LEVEL', 6)),
+        brotli_quality=int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+    )
+
+
+@before_render_template.connect_via(app)
+def start_render_timer(sender, template, context, **extra):
+    """Remember when a template started rendering."""
+    g.setdefault('render_started', {})[template.name] = time.perf_counter()
+
+
+@template_rendered.connect_via(app)
+def record_render_time(sender, template, context, **extra):
+    """Record how long a template took to render."""
+    started = g.get('render_started', {}).pop(template.name, None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    metrics.observe('volva_template_render_seconds', elapsed, template=template.name)
+    record_span('render', template.name, elapsed)
+
+
+@app.template_global()
+def fragment(template_name, macro_name, *args):
+    """
+    Render a macro, reusing the HTML from an earlier call with the same arguments.
+
+    The cache key is a hash of the macro and the content of its arguments, so a cell
+    is rendered again only after a scan changed its values. With template
+    auto-reloading on (debug mode), fragments are always rendered fresh.
+
+    Args:
+        template_name (str): Template defining the macro, e.g. `cell.html`.
+        macro_name (str): Macro name.
+        *args: Macro arguments; must be JSON-serializable or convertible with `str`.
+
+    Returns:
+        Markup: Rendered HTML.
+    """
+    def render():
+        metrics.inc('volva_fragment_renders_total', template=template_name)
+        return getattr(app.jinja_env.get_template(template_name).module, macro_name)(*args)
+
+    if app.jinja_env.auto_reload:
+        return render()
+    key = hashlib.sha1(json.dumps([template_name, macro_name, args], default=str,
+                                  separators=(',', ':')).encode('utf-8')).hexdigest()
+    return fragmentCache.get(key, render)
 
 
 def populate_label(labels):
@@ -64,6 +302,271 @@ def populate_values(values):
     values.append(random.randint(0, 25))
 
 
+def build_landing_models(country_code):
+    """
+    Assemble the block, multi-block and line graph models shown on a country's landing page.
+
+    Args:
+        country_code (str): ISO country code (e.g., "IS" for Iceland).
+
+    Returns:
+        dict or None: Template context with `simple_cells`, `multi_cells` and `line_graphs`,
+        or None if the data could not be fetched.
+    """
+    # Every statistic on the page comes from a single summary snapshot, either fetched
+    # in one batched query or assembled from concurrent per-section lookups
+    if os.environ.get('LANDING_FETCH_MODE', 'batched') == 'parallel':
+        summary = logicWrapper.get_country_summary_concurrently(country_code)
+    else:
+        summary = logicWrapper.fetch_concurrently({
+            'summary': (logicWrapper.get_country_summary, (country_code,), None)
+        })['summary']
+    if summary is None:
+        return None
+
+    exported = app.config['STATIC_EXPORT']
+
+    def breakdown_url(name):
+        return None if exported else f"/{country_code}/breakdown/{name}"
+
+    # A list of BlockModel objects representing simple data blocks on the landing page
+    simple_block_models = []
+    # A list of MultiBlockModel objects representing multi data blocks on the landing page
+    multi_block_models = []
+    # A list of LineGraphModel objects representing data for Line Graphs on the landing page
+    line_graph_models = []
+
+    # Simple Block Cell: Total IPs Scanned
+    simple_block_models.append(BlockModel("Total IPs Scanned", summary.ips_count, "ips_count"))
+
+    # Simple Block Cell: Total Active IPs
+    simple_block_models.append(BlockModel("Total Active IPs", summary.total_alive_hosts, "total_alive_hosts"))
+
+    # Simple Block Cell: Total Ports Scanned
+    simple_block_models.append(BlockModel("Ports Scanned", summary.port_amount, "port_amount"))
+
+    # Simple Block Cell: Total Active Ports
+    simple_block_models.append(BlockModel("Total Open Ports", summary.total_open_ports, "total_open_ports"))
+
+    # Line Graph: Total Open Ports
+    line_graph_models.append(
+        LineGraphModel(
+            "line-graph_total-open-ports",
+            "Total Open Ports",
+            summary.open_ports_dates,
+            summary.open_ports_values,
+            series="open_ports"
+        )
+    )
+
+    # Multi-Block Cells: top entries of each breakdown
+    multi_block_models.append(MultiBlockModel("Ports Identified", summary.unique_open_ports,
+                                              breakdown_url('ports'), "unique_open_ports"))
+    multi_block_models.append(MultiBlockModel("Services Identified", summary.services_count,
+                                              breakdown_url('services'), "services_count"))
+    multi_block_models.append(MultiBlockModel("Versions Identified", summary.versions_count,
+                                              breakdown_url('versions'), "versions_count"))
+    multi_block_models.append(MultiBlockModel("OS Identified", summary.os_count,
+                                              breakdown_url('os'), "os_count"))
+    multi_block_models.append(MultiBlockModel("Products Identified", summary.products_count,
+                                              breakdown_url('products'), "products_count"))
+    multi_block_models.append(MultiBlockModel("CPE Identified", summary.cpe_count,
+                                              breakdown_url('cpe'), "cpe_count"))
+
+    # Live updates of this page, resumed from the scan it was rendered from
+    stream_url = ''
+    if not exported:
+        stream_url = f"/api/v1/{country_code}/stream?since={scan_epoch(summary.port_scan_done_ts) or ''}"
+
+    return {
+        'simple_cells': simple_block_models,
+        'multi_cells': multi_block_models,
+        'line_graphs': line_graph_models,
+        'scanned_at': summary.port_scan_done_ts,
+        'is_fallback': summary.is_fallback,
+        'stream_url': stream_url
+    }
+
+
+def scan_epoch(scanned_at):
+    """
+    Convert a scan completion time to Unix seconds, reading naive times as UTC.
+
+    Args:
+        scanned_at (datetime or None): Scan completion time.
+
+    Returns:
+        int or None: Seconds since the epoch.
+    """
+    if scanned_at is None:
+        return None
+    if scanned_at.tzinfo is None:
+        scanned_at = scanned_at.replace(tzinfo=timezone.utc)
+    return int(scanned_at.timestamp())
+
+
+def scan_validators(country_code, scanned_at):
+    """
+    Build HTTP cache validators from a country's scan completion time.
+
+    Args:
+        country_code (str): ISO country code.
+        scanned_at (datetime or None): Scan completion time the response is based on.
+
+    Returns:
+        tuple: (etag, last_modified) or (None, None) if the scan time is unknown.
+    """
+    if scanned_at is None:
+        return None, None
+    if scanned_at.tzinfo is None:
+        scanned_at = scanned_at.replace(tzinfo=timezone.utc)
+    etag = f"{country_code.upper()}-{scan_epoch(scanned_at)}-{RENDER_VERSION}"
+    return etag, scanned_at
+
+
+def not_modified_response(country_code):
+    """
+    Answer a conditional request from the latest scan time alone, before any expensive work.
+
+    Args:
+        country_code (str): ISO country code.
+
+    Returns:
+        Response or None: A 304 response if the client's copy is current, otherwise None.
+    """
+    if 'HTTP_IF_NONE_MATCH' not in request.environ and 'HTTP_IF_MODIFIED_SINCE' not in request.environ:
+        return None
+
+    etag, last_modified = scan_validators(country_code, logicWrapper.get_last_scan_ts(country_code))
+    if etag is None or is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+
+    response = app.response_class(status=304)
+    return add_validators(response, etag, last_modified)
+
+
+def add_validators(response, etag, last_modified):
+    """
+    Attach ETag and Last-Modified headers to a response.
+
+    Args:
+        response (Response): Response to modify.
+        etag (str or None): Entity tag.
+        last_modified (datetime or None): Last modification time.
+
+    Returns:
+        Response: The same response.
+    """
+    if etag is not None:
+        response.set_etag(etag)
+        response.last_modified = last_modified
+    return response
+
+
+class DeferredValue:
+    """
+    Template value that is only computed when the template first uses it.
+
+    Lets a streamed template send everything before the first data-dependent
+    section while the data is still being fetched.
+    """
+
+    def __init__(self, load, key, default):
+        """
+        Initialize without loading anything.
+
+        Args:
+            load (callable): Returns the dict holding the value, or None on failure. Should cache its result.
+            key (str): Key of the value in that dict.
+            default (Any): Value used if loading failed.
+        """
+        self.__load = load
+        self.__key = key
+        self.__default = default
+
+    def get(self):
+        """Load and return the value."""
+        loaded = self.__load()
+        return self.__default if loaded is None else loaded[self.__key]
+
+    def __iter__(self):
+        return iter(self.get())
+
+    def __len__(self):
+        return len(self.get())
+
+    def __bool__(self):
+        return bool(self.get())
+
+    def __str__(self):
+        return str(self.get())
+
+
+def buffer_chunks(chunks, flush_marker, size=STREAM_BUFFER_SIZE):
+    """
+    Join small rendered chunks into larger writes, sending everything up to a flush marker at once.
+
+    The page up to the marker is collected into one write, sent just before the template
+    starts on its data-dependent sections. Everything after it is sent in pieces of about
+    `size` bytes.
+
+    Args:
+        chunks (iterable[str]): Rendered template chunks.
+        flush_marker (str): Text the template renders where the collected output should be sent; removed.
+        size (int): Bytes to collect per write after the marker.
+
+    Yields:
+        str: Chunks to send.
+    """
+    buffer = []
+    length = 0
+    flushed = False
+    for chunk in chunks:
+        if not flushed and flush_marker in chunk:
+            head, chunk = chunk.split(flush_marker, 1)
+            buffer.append(head)
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+            flushed = True
+        buffer.append(chunk)
+        length += len(chunk)
+        if flushed and length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_landing_page(country_code, landing_models=None):
+    """
+    Render a landing page as a stream whose head is sent before the country snapshot is fetched.
+
+    Args:
+        country_code (str): ISO country code.
+        landing_models (dict, optional): Models already at hand; the snapshot is fetched otherwise.
+
+    Returns:
+        iterable[str]: Page chunks.
+    """
+    state = {} if landing_models is None else {'models': landing_models}
+
+    def load():
+        if 'models' not in state:
+            state['models'] = landingCache.get(country_code, lambda: build_landing_models(country_code))
+            if state['models'] is None:
+                print(f"[FETCH ERROR] landing data for {country_code} unavailable after the page was started")
+        return state['models']
+
+    context = {
+        key: DeferredValue(load, key, default)
+        for key, default in (('simple_cells', []), ('multi_cells', []), ('line_graphs', []), ('stream_url', ''))
+    }
+    return buffer_chunks(stream_template('landing.html', stream_flush=STREAM_FLUSH_MARKER, **context),
+                         STREAM_FLUSH_MARKER)
+
+
 @app.route('/', defaults={'country_code': "IS"})
 @app.route("/<string:country_code>")
 def landing_page(country_code):
@@ -83,93 +586,742 @@ def landing_page(country_code):
     if valid_code is None:
         return render_template('not_found.html')
 
-    # A list of BlockModel objects representing simple data blocks on the landing page
-    simple_block_models = []
-    # A list of MultiBlockModel objects representing multi data blocks on the landing page
-    multi_block_models = []
-    # A list of LineGraphModel objects representing data for Line Graphs on the landing page
-    line_graph_models = []
+    country_code = country_code.upper()
+    not_modified = not_modified_response(country_code)
+    if not_modified is not None:
+        return not_modified
 
-    # Simple Block Cell: Total IPs Scanned
-    scanned_ips_title = "Total IPs Scanned"
-    scanned_ips_value = logicWrapper.get_ips_count(country_code)
-    # if scanned_ips_value is None: return render_template('not_found.html')
+    if LANDING_RENDER_MODE == 'streamed':
+        # The status is sent with the head, before the data is known to be available. Validators
+        # are only sent for models already cached, so a page that ends up without cells is never
+        # revalidated as current for its scan.
+        landing_models = landingCache.peek(country_code)
+        response = Response(stream_landing_page(country_code, landing_models), mimetype='text/html')
+        response.cache_control.no_cache = True
+        response.headers['X-Accel-Buffering'] = 'no'
+        if landing_models is None:
+            return response
+        return add_validators(response, *scan_validators(country_code, landing_models['scanned_at']))
 
-    simple_block_models.append(BlockModel(scanned_ips_title, scanned_ips_value))
+    landing_models = landingCache.get(country_code, lambda: build_landing_models(country_code))
+    if landing_models is None:
+        return render_template('not_found.html')
 
-    # Simple Block Cell: Total Active IPs
-    active_ips_title = "Total Active IPs"
-    active_ips_value = logicWrapper.get_total_alive_hosts(country_code)
-    # if active_ips_value is None: return render_template('not_found.html')
+    response = make_response(render_template('landing.html', **landing_models))
+    # Browsers keep the page but revalidate it, which is a cheap 304 until the next scan
+    response.cache_control.no_cache = True
+    if landing_models['is_fallback']:
+        # Served while the database is down: the next request must fetch the page again
+        return response
+    return add_validators(response, *scan_validators(country_code, landing_models['scanned_at']))
 
-    simple_block_models.append(BlockModel(active_ips_title, active_ips_value))
 
-    # Simple Block Cell: Total Ports Scanned
-    ports_scanned_title = "Ports Scanned"
-    ports_scanned_value = logicWrapper.get_port_amount(country_code)
-    # if ports_scanned_value is None: return render_template('not_found.html')
+def json_response(payload, status=200, summary=None, validators=None):
+    """
+    Build a compact, cacheable JSON response that honours conditional request headers.
 
-    simple_block_models.append(BlockModel(ports_scanned_title, ports_scanned_value))
+    Keys are not sorted, so ranked maps keep their order. Responses built from a
+    country snapshot are validated by its scan time, others by a hash of the body.
 
-    # Simple Block Cell: Total Active Ports
-    open_ports_title = "Total Open Ports"
-    open_ports_value = logicWrapper.get_total_open_ports(country_code)
-    # if open_ports_value is None: return render_template('not_found.html')
+    Args:
+        payload (Any): JSON-serializable response body.
+        status (int): HTTP status code.
+        summary (CountrySummaryModel, optional): Snapshot the payload was built from.
+        validators (tuple, optional): (etag, last_modified) to use instead of the snapshot's.
+
+    Returns:
+        Response: JSON response with validators, or 304 Not Modified if the client's copy matches.
+    """
+    body = json.dumps(payload, separators=(',', ':'))
+    response = app.response_class(body, status=status, mimetype='application/json')
+    if status != 200:
+        return response
 
-    simple_block_models.append(BlockModel(open_ports_title, open_ports_value))
+    response.cache_control.public = True
+    response.cache_control.max_age = API_MAX_AGE
+    etag, last_modified = validators or (None, None)
+    if etag is None and summary is not None:
+        etag, last_modified = scan_validators(summary.country_code, summary.port_scan_done_ts)
+    if etag is None:
+        etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+    add_validators(response, etag, last_modified)
+    return response.make_conditional(request)
 
-    # Line Graph: Total Open Ports
-    graph_open_ports_canvas_id = "line-graph_total-open-ports"
-    graph_open_ports_title = "Total Open Ports"
-    graph_open_ports_dates, graph_open_ports_plots = logicWrapper.get_total_open_ports_plot(country_code)
-    # if graph_open_ports_dates is None: return render_template('not_found.html')
-    # if graph_open_ports_plots is None: return render_template('not_found.html')
 
-    line_graph_models.append(
-        LineGraphModel(
-            graph_open_ports_canvas_id,
-            graph_open_ports_title,
-            graph_open_ports_dates,
-            graph_open_ports_plots
+def api_country_summary(country_code):
+    """
+    Fetch the country snapshot for an API endpoint, short-circuiting unchanged conditional requests.
+
+    Args:
+        country_code (str): ISO country code.
+
+    Returns:
+        tuple: (CountrySummaryModel, None) on success or (None, Response) with an error or a 304.
+    """
+    valid_code = logicWrapper.dbLogic.verify_country_code(country_code)
+    if valid_code is False:
+        return None, json_response({'error': 'unknown country code'}, 404)
+
+    if valid_code:
+        not_modified = not_modified_response(country_code)
+        if not_modified is not None:
+            not_modified.cache_control.public = True
+            not_modified.cache_control.max_age = API_MAX_AGE
+            return None, not_modified
+
+    summary = logicWrapper.get_country_summary(country_code) if valid_code else None
+    if summary is None:
+        return None, json_response({'error': 'data unavailable'}, 503)
+    return summary, None
+
+
+@app.route("/api/v1/countries")
+def api_countries():
+    """
+    List the country codes that have scan data.
+
+    Returns:
+        Response: JSON `{"countries": [...]}`.
+    """
+    codes = logicWrapper.dbLogic.countryRegistry.codes()
+    if codes is None:
+        return json_response({'error': 'data unavailable'}, 503)
+    return json_response({'countries': sorted(codes)})
+
+
+@app.route("/api/v1/<string:country_code>/summary")
+def api_summary(country_code):
+    """
+    Summary counters of the latest scan for a country.
+
+    Args:
+        country_code (str): ISO country code.
+
+    Returns:
+        Response: JSON object with the counters and the scan completion time.
+    """
+    summary, error = api_country_summary(country_code)
+    if error is not None:
+        return error
+    return json_response({
+        'country': summary.country_code,
+        'scanned_at': summary.port_scan_done_ts.isoformat() if summary.port_scan_done_ts else None,
+        'ips_count': summary.ips_count,
+        'total_alive_hosts': summary.total_alive_hosts,
+        'port_amount': summary.port_amount,
+        'total_open_ports': summary.total_open_ports
+    }, summary=summary)
+
+
+@app.route("/api/v1/<string:country_code>/top")
+def api_top(country_code):
+    """
+    Top entries of every breakdown for a country, highest count first.
+
+    Args:
+        country_code (str): ISO country code.
+
+    Returns:
+        Response: JSON object mapping each breakdown to a list of `[name, count]` pairs.
+    """
+    summary, error = api_country_summary(country_code)
+    if error is not None:
+        return error
+
+    def pairs(content):
+        return [[key, value] for key, value in (content or {}).items()]
+
+    return json_response({
+        'country': summary.country_code,
+        'ports': pairs(summary.unique_open_ports),
+        'services': pairs(summary.services_count),
+        'versions': pairs(summary.versions_count),
+        'os': pairs(summary.os_count),
+        'products': pairs(summary.products_count),
+        'cpe': pairs(summary.cpe_count)
+    }, summary=summary)
+
+
+@app.route("/api/v1/<string:country_code>/open-ports")
+def api_open_ports(country_code):
+    """
+    Open ports time series for a country, as plotted on the landing page.
+
+    Args:
+        country_code (str): ISO country code.
+
+    Returns:
+        Response: JSON object with parallel `labels` and `values` lists.
+    """
+    summary, error = api_country_summary(country_code)
+    if error is not None:
+        return error
+    return json_response({
+        'country': summary.country_code,
+        'labels': summary.open_ports_dates,
+        'values': summary.open_ports_values
+    }, summary=summary)
+
+
+def parse_history_date(value, default):
+    """
+    Parse a `from`/`to` query parameter of the history endpoint.
+
+    Args:
+        value (str or None): ISO date or date-time, e.g. `2025-04-01`.
+        default (datetime): Value used when the parameter is missing.
+
+    Returns:
+        datetime: Naive UTC date-time, matching `port_scan_done_ts`.
+
+    Raises:
+        ValueError: If the value is not an ISO date.
+    """
+    if not value:
+        return default
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+@app.route("/api/v1/<string:country_code>/open-ports/history")
+def api_open_ports_history(country_code):
+    """
+    Open ports time series for a country over any time range, aggregated and downsampled on the server.
+
+    Query parameters:
+        from: ISO start date, inclusive. Defaults to one year before `to`.
+        to: ISO end date, exclusive. Defaults to tomorrow.
+        granularity: `scan`, `day`, `week` or `month`. Defaults to `day`.
+        points: Maximum number of points returned. Defaults to `HISTORY_DEFAULT_POINTS`.
+
+    Args:
+        country_code (str): ISO country code.
+
+    Returns:
+        Response: JSON object with parallel `labels` and `values` lists.
+    """
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in HISTORY_GRANULARITIES:
+        return json_response({'error': f"granularity must be one of {', '.join(HISTORY_GRANULARITIES)}"}, 400)
+    try:
+        end = parse_history_date(request.args.get('to'),
+                                 datetime.combine(datetime.now(timezone.utc).date() + timedelta(days=1), datetime.min.time()))
+        start = parse_history_date(request.args.get('from'), end - timedelta(days=365))
+        points = int(request.args.get('points', HISTORY_DEFAULT_POINTS))
+    except ValueError:
+        return json_response({'error': 'from and to must be ISO dates and points an integer'}, 400)
+    if start >= end:
+        return json_response({'error': 'from must be before to'}, 400)
+    points = min(max(points, 3), HISTORY_MAX_POINTS)
+
+    valid_code = logicWrapper.dbLogic.verify_country_code(country_code)
+    if valid_code is False:
+        return json_response({'error': 'unknown country code'}, 404)
+    if valid_code is None:
+        return json_response({'error': 'data unavailable'}, 503)
+
+    # Validated by a hash of the body: the series depends on the window, granularity, points and
+    # how far the rollup has caught up, not only on the latest scan time.
+    country_code = country_code.upper()
+    labels, values = logicWrapper.get_open_ports_history(country_code, start, end, granularity, points)
+    if labels is None:
+        return json_response({'error': 'data unavailable'}, 503)
+    return json_response({
+        'country': country_code,
+        'granularity': granularity,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'labels': labels,
+        'values': values
+    })
+
+
+def encode_cursor(key):
+    """
+    Encode a keyset cursor as an opaque URL-safe string.
+
+    Args:
+        key (list or None): Cursor returned by ``BreakdownIndex.page``.
+
+    Returns:
+        str or None: Encoded cursor.
+    """
+    if key is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(value):
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        value (str or None): Encoded cursor from the query string.
+
+    Returns:
+        list or None: Cursor key.
+
+    Raises:
+        ValueError: If the cursor cannot be decoded.
+    """
+    if not value:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(value.encode('ascii')))
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError("malformed cursor") from e
+
+
+def breakdown_page(country_code, kind):
+    """
+    Look up one page of a breakdown from the request's query parameters.
+
+    Query parameters:
+        q: Case-insensitive search string.
+        match: `prefix` (default) or `substring`.
+        sort: `count` (default, highest first) or `name`.
+        limit: Entries per page, up to `BREAKDOWN_MAX_PAGE_SIZE`.
+        cursor: `next_cursor` of the previous page.
+
+    Args:
+        country_code (str): ISO country code.
+        kind (str): Breakdown URL name, a key of `BREAKDOWN_KINDS`.
+
+    Returns:
+        tuple: (page dict, BreakdownIndex) on success or (None, (error message, HTTP status)).
+    """
+    if kind not in BREAKDOWN_KINDS:
+        return None, ('unknown breakdown', 404)
+    valid_code = logicWrapper.dbLogic.verify_country_code(country_code)
+    if valid_code is False:
+        return None, ('unknown country code', 404)
+    if valid_code is None:
+        return None, ('data unavailable', 503)
+
+    options = {
+        'q': request.args.get('q', '').strip(),
+        'match': request.args.get('match', 'prefix'),
+        'sort': request.args.get('sort', 'count')
+    }
+    index = logicWrapper.get_breakdown(country_code, BREAKDOWN_KINDS[kind][0])
+    if index is None:
+        return None, ('data unavailable', 503)
+    try:
+        limit = min(max(int(request.args.get('limit', BREAKDOWN_PAGE_SIZE)), 1), BREAKDOWN_MAX_PAGE_SIZE)
+        entries, next_key = index.page(
+            sort=options['sort'],
+            query=options['q'] or None,
+            match=options['match'],
+            after=decode_cursor(request.args.get('cursor')),
+            limit=limit
         )
-    )
+    except ValueError as e:
+        return None, (str(e), 400)
+
+    return {
+        'country': country_code.upper(),
+        'breakdown': kind,
+        'total': len(index),
+        **options,
+        'limit': limit,
+        'entries': entries,
+        'next_cursor': encode_cursor(next_key)
+    }, index
+
+
+@app.route("/api/v1/<string:country_code>/breakdown/<string:kind>")
+def api_breakdown(country_code, kind):
+    """
+    Every entry of a breakdown, paginated with keyset cursors and searchable by name.
+
+    Args:
+        country_code (str): ISO country code.
+        kind (str): `ports`, `services`, `versions`, `os`, `products` or `cpe`.
+
+    Returns:
+        Response: JSON page with `entries` as `[name, count]` pairs and the `next_cursor`, null on the last page.
+    """
+    page, index = breakdown_page(country_code, kind)
+    if page is None:
+        message, status = index
+        return json_response({'error': message}, status)
+    return json_response(page, validators=scan_validators(page['country'], index.scanned_at))
+
+
+@app.route("/<string:country_code>/breakdown/<string:kind>")
+def breakdown_view(country_code, kind):
+    """
+    Drill-down page listing every entry of a breakdown, with search and paging.
+
+    Args:
+        country_code (str): ISO country code.
+        kind (str): `ports`, `services`, `versions`, `os`, `products` or `cpe`.
+
+    Returns:
+        Response: Rendered page or error page.
+    """
+    page, index = breakdown_page(country_code, kind)
+    if page is None:
+        message, status = index
+        if status == 404:
+            return render_template('404.html'), 404
+        if status == 400:
+            return render_template('breakdown.html', title=BREAKDOWN_KINDS[kind][1], error=message,
+                                   page=None), 400
+        return render_template('not_found.html')
+
+    response = make_response(render_template('breakdown.html', title=BREAKDOWN_KINDS[kind][1], page=page,
+                                             error=None))
+    response.cache_control.no_cache = True
+    return add_validators(response, *scan_validators(page['country'], index.scanned_at)).make_conditional(request)
+
+
+def compare_countries():
+    """
+    Look up the countries of a comparison from the request's `countries` parameter.
+
+    Query parameters:
+        countries: Comma-separated country codes. Defaults to every known country, at most
+            `COMPARE_MAX_COUNTRIES` of them.
+
+    Returns:
+        tuple: (comparison dict, None) on success or (None, (error message, HTTP status)).
+        The comparison has the `countries` in the order asked for, their `summaries`
+        and the open ports series on shared `labels`.
+    """
+    known = logicWrapper.dbLogic.countryRegistry.codes()
+    if known is None:
+        return None, ('data unavailable', 503)
+
+    requested = [code.strip().upper() for code in request.args.get('countries', '').split(',') if code.strip()]
+    # Without a selection the first countries alphabetically are compared, up to the limit
+    codes = list(dict.fromkeys(requested)) or sorted(known)[:COMPARE_MAX_COUNTRIES]
+    if len(codes) > COMPARE_MAX_COUNTRIES:
+        return None, (f"at most {COMPARE_MAX_COUNTRIES} countries can be compared", 400)
+    unknown = [code for code in codes if code not in known]
+    if unknown:
+        return None, (f"unknown country codes: {', '.join(unknown)}", 404)
+
+    summaries = logicWrapper.get_country_summaries(codes)
+    if summaries is None:
+        return None, ('data unavailable', 503)
 
-    # Multi-Block Cell: Total Unique Ports Open
-    unique_ports_title = "Ports Identified"
-    unique_ports_content = logicWrapper.get_unique_open_ports(country_code)
-    multi_block_models.append(MultiBlockModel(unique_ports_title, unique_ports_content))
-
-    # Multi-Block Cell: Get Services Count
-    services_title = "Services Identified"
-    services_content = logicWrapper.get_services_count(country_code)
-    multi_block_models.append(MultiBlockModel(services_title, services_content))
-
-    # Multi-Block Cell: Get Versions Count
-    versions_title = "Versions Identified"
-    versions_content = logicWrapper.get_versions_count(country_code)
-    multi_block_models.append(MultiBlockModel(versions_title, versions_content))
-
-    # Multi-Block Cell: Get Services Count
-    services_title = "OS Identified"
-    services_content = logicWrapper.get_os_count(country_code)
-    multi_block_models.append(MultiBlockModel(services_title, services_content))
-
-    # Multi-Block Cell: Get Products Count
-    products_title = "Products Identified"
-    products_content = logicWrapper.get_products_count(country_code)
-
-    multi_block_models.append(MultiBlockModel(products_title, products_content))
-
-    # Multi-Block Cell: Get Versions Count
-    versions_title = "CPE Identified"
-    versions_content = logicWrapper.get_cpe_count(country_code)
-    multi_block_models.append(MultiBlockModel(versions_title, versions_content))
-
-    return render_template('landing.html',
-                           simple_cells=simple_block_models,
-                           multi_cells=multi_block_models,
-                           line_graphs=line_graph_models
-                           )
+    labels, series = CompareLogic.align_series({
+        code: (summary.open_ports_dates, summary.open_ports_values) for code, summary in summaries.items()
+    })
+    return {
+        'countries': list(summaries),
+        'summaries': summaries,
+        'labels': labels,
+        'series': series
+    }, None
+
+
+def compare_validators(comparison):
+    """
+    Build HTTP cache validators for a comparison from the scan times of its countries.
+
+    Args:
+        comparison (dict): Comparison returned by ``compare_countries``.
+
+    Returns:
+        tuple: (etag, last_modified) or (None, None) if a scan time is unknown.
+    """
+    scans = [(code, scan_epoch(summary.port_scan_done_ts)) for code, summary in comparison['summaries'].items()]
+    if not scans or any(epoch is None for _, epoch in scans):
+        return None, None
+    digest = hashlib.sha1(json.dumps(scans, separators=(',', ':')).encode('utf-8')).hexdigest()[:16]
+    last_modified = datetime.fromtimestamp(max(epoch for _, epoch in scans), timezone.utc)
+    return f"compare-{digest}-{RENDER_VERSION}", last_modified
+
+
+@app.route("/api/v1/compare")
+def api_compare():
+    """
+    Counters, top entries and open ports series of several countries, fetched in one query.
+
+    Query parameters:
+        countries: Comma-separated country codes, e.g. `IS,GL,FO`. Defaults to every
+            known country; at most `COMPARE_MAX_COUNTRIES`.
+
+    Returns:
+        Response: JSON object with one entry per country under `countries` and the open
+        ports series aligned on shared `labels`, null where a country has no scan.
+    """
+    comparison, error = compare_countries()
+    if comparison is None:
+        message, status = error
+        return json_response({'error': message}, status)
+
+    def pairs(content):
+        return [[key, value] for key, value in (content or {}).items()]
+
+    countries = []
+    for code, summary in comparison['summaries'].items():
+        countries.append({
+            'country': code,
+            'scanned_at': summary.port_scan_done_ts.isoformat() if summary.port_scan_done_ts else None,
+            'ips_count': summary.ips_count,
+            'total_alive_hosts': summary.total_alive_hosts,
+            'port_amount': summary.port_amount,
+            'total_open_ports': summary.total_open_ports,
+            'top': {kind: pairs(getattr(summary, BREAKDOWN_WIDGETS[column][0]))
+                    for kind, (column, _) in BREAKDOWN_KINDS.items()}
+        })
+    return json_response({
+        'countries': countries,
+        'open_ports': {'labels': comparison['labels'], 'series': comparison['series']}
+    }, validators=compare_validators(comparison))
+
+
+@app.route("/compare")
+def compare_view():
+    """
+    Side-by-side comparison page: counters and top ports per country and one shared open ports chart.
+
+    Returns:
+        Response: Rendered page or error page.
+    """
+    comparison, error = compare_countries()
+    if comparison is None:
+        message, status = error
+        if status == 503:
+            return render_template('not_found.html')
+        return render_template('compare.html', comparison=None, error=message,
+                               known=sorted(logicWrapper.dbLogic.countryRegistry.codes() or ())), status
+
+    response = make_response(render_template('compare.html', comparison=comparison, error=None,
+                                             known=sorted(logicWrapper.dbLogic.countryRegistry.codes() or ())))
+    response.cache_control.no_cache = True
+    return add_validators(response, *compare_validators(comparison)).make_conditional(request)
+
+
+def sse_event(event, data, event_id=None):
+    """
+    Format one Server-Sent Events message.
+
+    Args:
+        event (str): Event type.
+        data (Any): JSON-serializable payload.
+        event_id (Any, optional): Event ID the browser sends back as `Last-Event-ID` when it reconnects.
+
+    Returns:
+        str: Message text.
+    """
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def stream_updates(country_code, previous, send_initial):
+    """
+    Yield update events for a country until the stream's lifetime runs out.
+
+    Waits for the change listener to report the country changed, and also checks
+    the cached scan time every `SSE_POLL_INTERVAL` seconds in case notifications
+    are disabled. Only what differs from the last sent snapshot is sent.
+
+    Args:
+        country_code (str): ISO country code.
+        previous (CountrySummaryModel): Snapshot the client is known to show.
+        send_initial (bool): Send the whole snapshot first, because the client's copy is older.
+
+    Yields:
+        str: SSE messages and keep-alive comments.
+    """
+    yield f"retry: {int(SSE_HEARTBEAT * 1000)}\n\n"
+    if send_initial:
+        yield sse_event('update', SummaryDiffLogic.diff(None, previous), scan_epoch(previous.port_scan_done_ts))
+
+    deadline = time.monotonic() + SSE_STREAM_LIFETIME
+    version = logicWrapper.changeBroadcaster.version(country_code)
+    last_poll = time.monotonic()
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        new_version = logicWrapper.changeBroadcaster.wait(country_code, version, min(SSE_HEARTBEAT, remaining))
+        if new_version == version:
+            if time.monotonic() - last_poll < SSE_POLL_INTERVAL:
+                yield ": ping\n\n"
+                continue
+            last_poll = time.monotonic()
+            if logicWrapper.get_last_scan_ts(country_code) == previous.port_scan_done_ts:
+                yield ": ping\n\n"
+                continue
+        version = new_version
+
+        current = logicWrapper.get_country_summary(country_code)
+        delta = SummaryDiffLogic.diff(previous, current) if current is not None else {}
+        if not delta:
+            yield ": ping\n\n"
+            continue
+        previous = current
+        yield sse_event('update', delta, scan_epoch(current.port_scan_done_ts))
+
+
+@app.route("/api/v1/<string:country_code>/stream")
+def api_stream(country_code):
+    """
+    Server-Sent Events stream of a country's changed counters, breakdowns and new time series points.
+
+    The `since` query parameter (or the `Last-Event-ID` header on reconnects) is the
+    scan time, in Unix seconds, of the data the client shows. If it is out of date the
+    stream starts with the full snapshot.
+
+    Args:
+        country_code (str): ISO country code.
+
+    Returns:
+        Response: `text/event-stream` response, or a JSON error.
+    """
+    valid_code = logicWrapper.dbLogic.verify_country_code(country_code)
+    if valid_code is False:
+        return json_response({'error': 'unknown country code'}, 404)
+    country_code = country_code.upper()
+    summary = logicWrapper.get_country_summary(country_code) if valid_code else None
+    if summary is None:
+        return json_response({'error': 'data unavailable'}, 503)
+
+    since = request.headers.get('Last-Event-ID') or request.args.get('since')
+    send_initial = since != str(scan_epoch(summary.port_scan_done_ts))
+
+    # Every open stream holds a worker thread, so cap them to keep threads for page requests
+    if not streamSlots.acquire(blocking=False):
+        response = json_response({'error': 'too many live streams'}, 503)
+        response.headers['Retry-After'] = '60'
+        return response
+
+    response = Response(stream_updates(country_code, summary, send_initial), mimetype='text/event-stream')
+    response.call_on_close(streamSlots.release)
+    response.cache_control.no_store = True
+    # Let nginx pass events through as they are written
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def on_country_changed(country_code):
+    """
+    Rebuild a country's landing page models after the database announced a change to it.
+
+    Args:
+        country_code (str or None): Changed country, or None if every cache was dropped.
+    """
+    if country_code is None:
+        landingCache.invalidate()
+        return
+    landingCache.invalidate(country_code)
+    if logicWrapper.dbLogic.verify_country_code(country_code):
+        landingCache.get(country_code, lambda: build_landing_models(country_code))
+
+
+def warm_up(notify=None):
+    """
+    Prepare this worker before it serves traffic.
+
+    Starts the change listener, opens pooled database connections, loads the
+    country registry, caches every country's snapshot, scan time and landing page
+    models, and compiles every template. Marks the worker ready when done.
+
+    Args:
+        notify (callable, optional): Called between steps, e.g. gunicorn's worker
+            heartbeat, so a slow warm-up is not mistaken for a hung worker.
+
+    Returns:
+        bool: True if the worker is ready.
+    """
+    started = time.perf_counter()
+    deadline = float(os.environ.get('WARM_UP_DEADLINE', 20))
+    # Listen first, so no change announced while the caches fill is missed
+    if os.environ.get('DB_LISTEN', '1') == '1':
+        logicWrapper.listen_for_changes(on_country_changed)
+    summaries = logicWrapper.warm_up(deadline)
+    if summaries is None:
+        print("[WARM-UP ERROR] could not load country codes, worker stays unready")
+        return False
+    if notify is not None:
+        notify()
+
+    for country_code, summary in summaries.items():
+        if summary is None:
+            print(f"[WARM-UP ERROR] no snapshot for {country_code}")
+            continue
+        logicWrapper.get_last_scan_ts(country_code)
+        landingCache.get(country_code, lambda code=country_code: build_landing_models(code))
+    if notify is not None:
+        notify()
+
+    compile_templates()
+
+    appReady.set()
+    print(f"[WARM-UP] ready after {time.perf_counter() - started:.2f}s, {len(summaries)} countries cached")
+    return True
+
+
+def compile_templates():
+    """
+    Load every template, compiling those missing from the bytecode cache and storing them there.
+
+    Returns:
+        list[str]: Names of the templates that failed to compile.
+    """
+    failed = []
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        try:
+            app.jinja_env.get_template(name)
+        except TemplateError as e:
+            print(f"[TEMPLATE ERROR] {name}: {e}")
+            failed.append(name)
+    return failed
+
+
+def start_warm_up():
+    """
+    Run ``warm_up`` in a background thread unless it already ran or is running.
+
+    Used when no gunicorn hook warmed the worker, e.g. under the Flask development server.
+    """
+    global warmUpThread
+    with warmUpLock:
+        if appReady.is_set() or (warmUpThread is not None and warmUpThread.is_alive()):
+            return
+        warmUpThread = threading.Thread(target=warm_up, name='volva-warm-up', daemon=True)
+        warmUpThread.start()
+
+
+@app.route("/readyz")
+def readyz():
+    """
+    Readiness probe: 200 once this worker has warmed its caches, 503 before.
+
+    A probe arriving before any warm-up ran starts one in the background.
+
+    Returns:
+        Response: JSON `{"status": "ready"}` or `{"status": "warming up"}`.
+    """
+    if appReady.is_set():
+        body, status = {'status': 'ready'}, 200
+    else:
+        start_warm_up()
+        body, status = {'status': 'warming up'}, 503
+    response = app.response_class(json.dumps(body), status=status, mimetype='application/json')
+    response.cache_control.no_store = True
+    return response
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """
+    Prometheus metrics for every worker on the host.
+
+    Returns:
+        Response: Metrics in the Prometheus text format.
+    """
+    return Response(metrics.render(METRICS_DIR), mimetype='text/plain; version=0.0.4')
 
 
 @app.route("/chart")
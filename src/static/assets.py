@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+# Directories under static/ whose files are fingerprinted
+ASSET_DIRS = ('css', 'js', 'img')
+# Directory under static/ that `build_assets` writes hashed, minified and compressed files to
+BUILD_DIR = 'dist'
+BUILD_MANIFEST = 'manifest.json'
+# Responsive variants of each optimized image, written next to the build manifest
+IMAGE_MANIFEST = 'images.json'
+
+# Third-party files kept under static/, pinned to a version: path -> download URL
+CHART_JS_VERSION = '4.4.9'
+VENDORED = {
+    'js/vendor/chart.umd.js': f"https://cdn.jsdelivr.net/npm/chart.js@{CHART_JS_VERSION}/dist/chart.umd.js"
+}
+# SHA-256 of every vendored download, by URL, committed next to the vendored files
+VENDOR_LOCK = 'js/vendor/vendor-lock.json'
+# Files concatenated into one asset, in order: bundle name -> member paths
+BUNDLES = {
+    'js/app.js': ('js/vendor/chart.umd.js', 'js/graphs.js')
+}
+
+
+def atomic_write(path, data):
+    """
+    Write a file so readers only ever see the old or the complete new content.
+
+    Args:
+        path (str): Destination path.
+        data (bytes or str): File content.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, mode) as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def fingerprint_name(filename, content):
+    """
+    Insert a short content hash before a file's extension.
+
+    Args:
+        filename (str): Relative file name, e.g. `css/general.css`.
+        content (bytes): File content.
+
+    Returns:
+        str: Fingerprinted name, e.g. `css/general.3f2a1b9c0d.css`.
+    """
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{hashlib.sha1(content).hexdigest()[:10]}{ext}"
+
+
+def fingerprint_assets(static_dir, out_dir):
+    """
+    Copy every asset under `static_dir` into `out_dir` with a content hash in its name.
+
+    Args:
+        static_dir (str): The app's static folder.
+        out_dir (str): Folder the fingerprinted copies are written to.
+
+    Returns:
+        dict: Original relative name -> fingerprinted relative name.
+    """
+    manifest = {}
+    for asset_dir in ASSET_DIRS + (BUILD_DIR,):
+        for root, _, files in os.walk(os.path.join(static_dir, asset_dir)):
+            for name in sorted(files):
+                source = os.path.join(root, name)
+                filename = os.path.relpath(source, static_dir).replace(os.sep, '/')
+                with open(source, 'rb') as f:
+                    content = f.read()
+                # Built files already carry their hash
+                hashed = filename if asset_dir == BUILD_DIR else fingerprint_name(filename, content)
+                target = os.path.join(out_dir, hashed)
+                if not os.path.exists(target):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    shutil.copyfile(source, target)
+                manifest[filename] = hashed
+    return manifest
+
+
+def load_manifest(path):
+    """
+    Load an asset manifest written by `fingerprint_assets` callers.
+
+    Args:
+        path (str): Manifest path.
+
+    Returns:
+        dict: Original name -> fingerprinted name, empty if the manifest does not exist.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def install_asset_resolver(app, manifest):
+    """
+    Make `url_for('static', filename=...)` resolve to fingerprinted names.
+
+    Args:
+        app (Flask): The Flask app.
+        manifest (dict): Original name -> fingerprinted name, read on every lookup.
+    """
+    @app.url_defaults
+    def resolve_fingerprinted_asset(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in manifest:
+            values['filename'] = manifest[values['filename']]
+
+
+def bundle_urls(name, manifest, static_dir, static_url):
+    """
+    List the URLs a page loads for an asset bundle.
+
+    A built bundle is one file. Without a build the members are loaded one by one,
+    and a vendored file that was never downloaded falls back to its pinned CDN URL.
+
+    Args:
+        name (str): Bundle name, a key of `BUNDLES`.
+        manifest (dict): Build manifest, original name -> built name.
+        static_dir (str): The app's static folder.
+        static_url (callable): Maps a relative static file name to its URL.
+
+    Returns:
+        list[str]: URLs in load order.
+    """
+    if name in manifest:
+        return [static_url(name)]
+    urls = []
+    for member in BUNDLES.get(name, (name,)):
+        if member in VENDORED and not os.path.exists(os.path.join(static_dir, member)):
+            urls.append(VENDORED[member])
+        else:
+            urls.append(static_url(member))
+    return urls
+
+
+def responsive_image(name, images, static_url):
+    """
+    Describe the responsive variants of an image for a `<picture>` element.
+
+    Args:
+        name (str): Source image name, e.g. `img/volva-logo-cropped.png`.
+        images (dict): Image manifest written by `build_assets`.
+        static_url (callable): Maps a relative static file name to its URL.
+
+    Returns:
+        dict or None: `src`, `width`, `height` and `sources` (each with a MIME `type` and a
+        `srcset` string, best format first), or None if the image has no variants.
+    """
+    image = images.get(name)
+    if image is None:
+        return None
+    return {
+        'src': static_url(name),
+        'width': image['width'],
+        'height': image['height'],
+        'sources': [
+            {
+                'type': source['type'],
+                'srcset': ', '.join(f"{static_url(variant)} {width}w" for variant, width in source['variants'])
+            }
+            for source in image['sources']
+        ]
+    }
@@ -0,0 +1,406 @@
+"""
+Build the static assets: vendor pinned third-party files, minify and bundle CSS/JS,
+resize images into responsive WebP/AVIF variants, fingerprint every file and write
+precompressed copies.
+
+Usage (from the project root):
+
+    python -m src.static.build_assets            # build into src/static/dist/
+    python -m src.static.build_assets --vendor   # download the vendored files again first
+
+Every output file has a content hash in its name and sits next to `.gz` and `.br`
+copies, so nginx can serve it with
+`gzip_static`/`brotli_static` and immutable cache headers. `dist/manifest.json` maps
+source names to built names; the app reads it at startup so `url_for('static', ...)`
+links to the built files, and `dist/images.json` lists the image variants for `srcset`.
+The build needs the packages in `requirements-build.txt`. Files of earlier builds are kept for pages still cached
+with their old names.
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import urllib.request
+
+from src.static.assets import ASSET_DIRS, BUILD_DIR, BUILD_MANIFEST, BUNDLES, IMAGE_MANIFEST, VENDOR_LOCK, \
+    VENDORED, atomic_write, fingerprint_name
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+STATIC_DIR = os.path.dirname(os.path.abspath(__file__))
+# Extensions worth compressing; images are already compressed
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ico', '.json')
+# Outputs smaller than this are not compressed
+MIN_COMPRESS_SIZE = 256
+
+# Images the pages load through the `picture.html` macros, resized into responsive variants, and the
+# widths (in pixels) generated for them. Other images are only stripped of metadata.
+RESPONSIVE_IMAGES = ('img/volva-logo-cropped.png',)
+# Extensions of images that are re-encoded without metadata
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+IMAGE_WIDTHS = (320, 480, 640, 960, 1280)
+# Variant formats, best first: (Pillow format, MIME type, save options)
+IMAGE_FORMATS = (
+    ('AVIF', 'image/avif', {'quality': 50}),
+    ('WEBP', 'image/webp', {'quality': 80, 'method': 6})
+)
+# Image.info keys that carry metadata worth stripping
+METADATA_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'icc_profile', 'comment')
+# Keywords after which a `/` starts a regular expression literal
+REGEX_KEYWORDS = ('return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw', 'case', 'do',
+                  'else', 'yield', 'await')
+WORD_CHARS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$'
+
+
+def vendor_files(static_dir, download=False):
+    """
+    Make sure the pinned third-party files are in the tree, downloading the ones that are not.
+
+    Every download is checked against the SHA-256 recorded for its URL in `VENDOR_LOCK`. A URL
+    without a recorded hash, e.g. after a version bump, is pinned on its first download; commit
+    the file and the lock together. A committed file is used as long as it matches its pin, so
+    a normal build never touches the network.
+
+    Args:
+        static_dir (str): The app's static folder.
+        download (bool): Download every vendored file, replacing the committed copy.
+
+    Returns:
+        bool: True if every vendored file is present and matches its pin.
+    """
+    lock_path = os.path.join(static_dir, VENDOR_LOCK)
+    try:
+        with open(lock_path, encoding='utf-8') as f:
+            pins = json.load(f)
+    except (OSError, ValueError):
+        pins = {}
+
+    ok = True
+    pinned_new = False
+    for path, url in VENDORED.items():
+        target = os.path.join(static_dir, path)
+        pinned = pins.get(url)
+        if not download and pinned is not None and os.path.exists(target):
+            with open(target, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() != pinned:
+                    print(f"[BUILD ERROR] {path} does not match the sha256 pinned for {url}; run with --vendor")
+                    ok = False
+            continue
+
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                content = response.read()
+        except OSError as e:
+            print(f"[BUILD ERROR] could not download {url}: {e}")
+            ok = False
+            continue
+        digest = hashlib.sha256(content).hexdigest()
+        if pinned is None:
+            pins[url] = digest
+            pinned_new = True
+        elif digest != pinned:
+            print(f"[BUILD ERROR] {url} has sha256 {digest}, pinned {pinned}; not vendored")
+            ok = False
+            continue
+        atomic_write(target, content)
+        print(f"[BUILD] vendored {url}")
+
+    if pinned_new:
+        atomic_write(lock_path, json.dumps(pins, indent=2, sort_keys=True) + '\n')
+        print(f"[BUILD] pinned new downloads in {VENDOR_LOCK}; commit it with the vendored files")
+    return ok
+
+
+def _split_code(text, quotes):
+    """
+    Split source text into code, string and comment tokens.
+
+    Args:
+        text (str): CSS or JavaScript source.
+        quotes (str): Characters that open a string literal.
+
+    Returns:
+        list[tuple]: (kind, text) with kind ``code``, ``string`` or ``comment``.
+    """
+    tokens = []
+    code_start = 0
+    index = 0
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if char in quotes:
+            end = index + 1
+            while end < length and text[end] != char:
+                end += 2 if text[end] == '\\' else 1
+            kind, end = 'string', end + 1
+        elif text.startswith('/*', index):
+            end = text.find('*/', index + 2)
+            kind, end = 'comment', (length if end == -1 else end + 2)
+        elif text.startswith('//', index) and '`' in quotes:
+            end = text.find('\n', index)
+            kind, end = 'comment', (length if end == -1 else end)
+        elif char == '/' and '`' in quotes and _starts_regex(text, index):
+            end = index + 1
+            in_class = False
+            while end < length and text[end] != '\n' and (in_class or text[end] != '/'):
+                if text[end] == '\\':
+                    end += 1
+                elif text[end] == '[':
+                    in_class = True
+                elif text[end] == ']':
+                    in_class = False
+                end += 1
+            kind, end = 'string', end + 1
+        else:
+            index += 1
+            continue
+        tokens.append(('code', text[code_start:index]))
+        tokens.append((kind, text[index:end]))
+        index = code_start = end
+    tokens.append(('code', text[code_start:]))
+    return tokens
+
+
+def _starts_regex(text, index):
+    """Whether the `/` at `index` opens a regular expression literal rather than dividing."""
+    before = text[:index].rstrip()
+    if not before or before[-1] in '(,=:[!&|?{};+-*%<>~^':
+        return True
+    # After a keyword such as `return` an expression starts; after a name or `obj.return` it divides
+    word = before[len(before.rstrip(WORD_CHARS)):]
+    return word in REGEX_KEYWORDS and not before[:-len(word)].endswith('.')
+
+
+def minify_css(text):
+    """
+    Minify a stylesheet: drop comments and whitespace around punctuation.
+
+    Args:
+        text (str): CSS source.
+
+    Returns:
+        str: Minified CSS.
+    """
+    parts = []
+    for kind, token in _split_code(text, '"\''):
+        if kind == 'comment':
+            continue
+        if kind == 'code':
+            token = ' '.join(token.split())
+            for punctuation in '{};,>':
+                token = token.replace(f' {punctuation}', punctuation).replace(f'{punctuation} ', punctuation)
+            token = token.replace(': ', ':').replace(';}', '}')
+        parts.append(token)
+    return ''.join(parts).strip()
+
+
+def minify_js(text):
+    """
+    Minify a script conservatively: drop comments, indentation and blank lines.
+
+    Line breaks are kept so automatic semicolon insertion behaves as in the source.
+
+    Args:
+        text (str): JavaScript source.
+
+    Returns:
+        str: Minified JavaScript.
+    """
+    parts = []
+    for kind, token in _split_code(text, '"\'`'):
+        if kind == 'comment':
+            # A block comment between two tokens still separates them
+            parts.append('\n' if '\n' in token else ' ')
+            continue
+        if kind == 'code':
+            lines = [' '.join(line.split()) for line in token.split('\n')]
+            token = '\n'.join(lines)
+        parts.append(token)
+    joined = ''.join(parts)
+    return '\n'.join(line.strip() for line in joined.split('\n') if line.strip())
+
+
+def minify(name, content):
+    """
+    Minify a CSS or JavaScript file; other files and vendored files are returned unchanged.
+
+    Args:
+        name (str): Relative file name.
+        content (bytes): File content.
+
+    Returns:
+        bytes: Minified content.
+    """
+    if name in VENDORED or name.endswith('.min.js'):
+        return content
+    if name.endswith('.css'):
+        return minify_css(content.decode('utf-8')).encode('utf-8')
+    if name.endswith('.js'):
+        return minify_js(content.decode('utf-8')).encode('utf-8')
+    return content
+
+
+def write_compressed(path, content):
+    """
+    Write the `.gz` and `.br` siblings of a built file.
+
+    Args:
+        path (str): Path of the built file.
+        content (bytes): Its content.
+    """
+    if len(content) < MIN_COMPRESS_SIZE or not path.endswith(COMPRESSIBLE):
+        return
+    # mtime=0 keeps the output identical across builds of the same content
+    atomic_write(path + '.gz', gzip.compress(content, compresslevel=9, mtime=0))
+    atomic_write(path + '.br', brotli.compress(content, quality=11))
+
+
+def encode_image(image, image_format, **options):
+    """
+    Encode an image without its metadata (EXIF, XMP, ICC profile, text chunks).
+
+    Args:
+        image (PIL.Image.Image): Image to encode.
+        image_format (str): Pillow format name, e.g. `WEBP`.
+        **options: Encoder options.
+
+    Returns:
+        bytes: Encoded image.
+    """
+    # Pillow only writes metadata that is passed to save(), and a copy drops image.info
+    clean = image.copy()
+    clean.info = {}
+    buffer = io.BytesIO()
+    clean.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def build_images(static_dir, outputs):
+    """
+    Resize each of `RESPONSIVE_IMAGES` to `IMAGE_WIDTHS` in every supported `IMAGE_FORMATS`.
+
+    Every image is also re-encoded in its own format without metadata, which for the
+    responsive ones is the fallback for browsers that support none of the variant formats.
+
+    Args:
+        static_dir (str): The app's static folder.
+        outputs (dict): Built files so far, file name -> bytes; variants and
+            re-encoded originals are added to it.
+
+    Returns:
+        dict: Image manifest, source name -> size and variants.
+    """
+    formats = [entry for entry in IMAGE_FORMATS if features.check(entry[0].lower())]
+
+    images = {}
+    for name in sorted(outputs):
+        if not name.endswith(IMAGE_EXTENSIONS):
+            continue
+        with Image.open(os.path.join(static_dir, name)) as source:
+            original_format = source.format
+            has_metadata = any(key in source.info for key in METADATA_KEYS)
+            image = source.convert('RGBA' if 'A' in source.getbands() or source.mode == 'P' else 'RGB')
+
+        fallback_options = {'optimize': True} if original_format == 'PNG' else {'quality': 85}
+        fallback = encode_image(image, original_format, **fallback_options)
+        # Keep the original if re-encoding only made it bigger and there is nothing to strip
+        if has_metadata or len(fallback) < len(outputs[name]):
+            outputs[name] = fallback
+        if name not in RESPONSIVE_IMAGES:
+            continue
+
+        width, height = image.size
+        widths = [w for w in IMAGE_WIDTHS if w < width] + [width]
+        stem, _ = os.path.splitext(name)
+        sources = []
+        for image_format, mime_type, options in formats:
+            variants = []
+            for variant_width in widths:
+                resized = image if variant_width == width else image.resize(
+                    (variant_width, max(1, round(height * variant_width / width))), Image.LANCZOS)
+                variant = f"{stem}-{variant_width}w.{image_format.lower()}"
+                outputs[variant] = encode_image(resized, image_format, **options)
+                variants.append([variant, variant_width])
+            sources.append({'type': mime_type, 'variants': variants})
+        images[name] = {'width': width, 'height': height, 'sources': sources}
+    return images
+
+
+def build_assets(static_dir=STATIC_DIR, vendor=False):
+    """
+    Build every asset and bundle into `<static_dir>/dist`.
+
+    Args:
+        static_dir (str): The app's static folder.
+        vendor (bool): Download the vendored files.
+
+    Returns:
+        int: Exit status, 0 on success and 1 if a vendored file or a build requirement is missing.
+    """
+    missing = [package for package, module in (('brotli', brotli), ('Pillow', Image)) if module is None]
+    if missing:
+        print(f"[BUILD ERROR] {', '.join(missing)} not installed; pip install -r requirements-build.txt")
+        return 1
+
+    # Without a vendored file the rest is still built; pages then load that file from its CDN
+    vendored = vendor_files(static_dir, download=vendor)
+
+    sources = {}
+    for asset_dir in ASSET_DIRS:
+        for root, _, files in os.walk(os.path.join(static_dir, asset_dir)):
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                name = os.path.relpath(path, static_dir).replace(os.sep, '/')
+                if name != VENDOR_LOCK:
+                    sources[name] = path
+
+    outputs = {}
+    for name, path in sorted(sources.items()):
+        with open(path, 'rb') as f:
+            outputs[name] = minify(name, f.read())
+    for name, members in BUNDLES.items():
+        if not all(member in outputs for member in members):
+            print(f"[BUILD ERROR] {name} not bundled, some of its files are missing")
+            continue
+        # A newline and semicolon keep one script's last statement from running into the next
+        separator = b'\n;\n' if name.endswith('.js') else b'\n'
+        outputs[name] = separator.join(outputs[member].rstrip() for member in members)
+    images = build_images(static_dir, outputs)
+
+    manifest = {}
+    for name, content in outputs.items():
+        built = f"{BUILD_DIR}/{fingerprint_name(name, content)}"
+        target = os.path.join(static_dir, built)
+        if not os.path.exists(target):
+            atomic_write(target, content)
+            write_compressed(target, content)
+        manifest[name] = built
+
+    # Written last, so a running app never links to a file that is not there yet
+    atomic_write(os.path.join(static_dir, BUILD_DIR, IMAGE_MANIFEST), json.dumps(images, indent=2, sort_keys=True))
+    atomic_write(os.path.join(static_dir, BUILD_DIR, BUILD_MANIFEST), json.dumps(manifest, indent=2, sort_keys=True))
+    total = sum(len(content) for content in outputs.values())
+    print(f"[BUILD] {len(manifest)} assets, {total} bytes before compression")
+    return 0 if vendored else 1
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Build fingerprinted, minified and precompressed static assets.")
+    parser.add_argument('--vendor', action='store_true', help="download the pinned third-party files")
+    args = parser.parse_args()
+    raise SystemExit(build_assets(vendor=args.vendor))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Compile every template into the Jinja bytecode cache ahead of time.
+
+Usage (from the project root), e.g. as a deploy step before restarting the service:
+
+    python -m src.static.compile_templates
+
+Workers started afterwards load the compiled templates from `TEMPLATE_CACHE_DIR`
+instead of parsing and compiling them, so the first request after a restart is as
+fast as the rest. Run it as the service user, since the cache directory is private.
+"""
+import os
+import time
+
+from src.static.app import TEMPLATE_CACHE_DIR, app, compile_templates
+
+
+def main():
+    """Command line entry point."""
+    if app.jinja_env.bytecode_cache is None:
+        print("[TEMPLATE ERROR] the bytecode cache is disabled (TEMPLATE_BYTECODE_CACHE=0 or an unsafe "
+              "TEMPLATE_CACHE_DIR)")
+        raise SystemExit(1)
+    started = time.perf_counter()
+    failed = compile_templates()
+    compiled = len(app.jinja_env.list_templates(extensions=['html'])) - len(failed)
+    print(f"[TEMPLATE] {compiled} templates compiled into {os.path.abspath(TEMPLATE_CACHE_DIR)} "
+          f"in {time.perf_counter() - started:.2f}s")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
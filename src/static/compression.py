@@ -0,0 +1,130 @@
+import gzip
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# MIME types worth compressing; images and fonts are compressed already
+COMPRESSIBLE_TYPES = ('text/html', 'text/css', 'text/plain', 'text/csv', 'application/json',
+                      'application/javascript', 'text/javascript', 'image/svg+xml', 'application/xml')
+# Never compressed here: proxies must be able to pass events through as they are written
+STREAMING_TYPES = ('text/event-stream',)
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick the best content coding the client accepts.
+
+    Args:
+        accept_encoding (werkzeug.datastructures.Accept): Parsed `Accept-Encoding` header.
+
+    Returns:
+        str or None: `br`, `gzip` or None for an uncompressed response.
+    """
+    offered = ('br', 'gzip') if brotli is not None else ('gzip',)
+    # best_match ignores codings with q=0 and prefers the order above on ties
+    return accept_encoding.best_match(offered)
+
+
+def compress_body(data, encoding, level=6, brotli_quality=5):
+    """
+    Compress a whole response body.
+
+    Args:
+        data (bytes): Body.
+        encoding (str): `br` or `gzip`.
+        level (int): gzip level.
+        brotli_quality (int): Brotli quality.
+
+    Returns:
+        bytes: Compressed body.
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=level)
+
+
+def compress_stream(chunks, encoding, level=6, brotli_quality=5):
+    """
+    Compress a streamed body chunk by chunk.
+
+    Every chunk is flushed, so the client can decode and show it before the next one
+    has been produced.
+
+    Args:
+        chunks (iterable): Body chunks, str or bytes.
+        encoding (str): `br` or `gzip`.
+        level (int): gzip level.
+        brotli_quality (int): Brotli quality.
+
+    Yields:
+        bytes: Compressed data.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=brotli_quality)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        process, flush, finish = (compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+                                  compressor.flush)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        if chunk:
+            yield process(chunk) + flush()
+    yield finish()
+
+
+def install_compression(app, min_size=500, level=6, brotli_quality=5):
+    """
+    Compress responses for clients that accept gzip or Brotli.
+
+    Buffered bodies smaller than `min_size` bytes are sent as they are. Streamed
+    bodies are compressed chunk by chunk, except Server-Sent Events. Responses to
+    clients that accept a compressed coding get a weak ETag, including 304s and
+    bodies too small to compress, so a 304 repeats the ETag of the full response.
+    The compressed bytes differ from the uncompressed representation, and a weak
+    ETag still matches `If-None-Match` revalidation.
+
+    Args:
+        app (Flask): The Flask app.
+        min_size (int): Smallest buffered body worth compressing, in bytes.
+        level (int): gzip level.
+        brotli_quality (int): Brotli quality.
+    """
+    @app.after_request
+    def compress_response(response):
+        mimetype = response.mimetype or ''
+        if mimetype in STREAMING_TYPES or mimetype not in COMPRESSIBLE_TYPES:
+            return response
+        response.vary.add('Accept-Encoding')
+        # A 304 must repeat the ETag the full response would carry, so it is weakened whenever
+        # the client could get a compressed representation, whatever the status
+        if negotiate_encoding(request.accept_encodings) is not None:
+            etag, weak = response.get_etag()
+            if etag is not None and not weak:
+                response.set_etag(etag, weak=True)
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough or 'Content-Encoding' in response.headers):
+            return response
+
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding, level, brotli_quality)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(compress_body(data, encoding, level, brotli_quality))
+
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,165 @@
+"""
+Pre-render every country page and its JSON API responses to static files.
+
+Usage (from the project root):
+
+    python -m src.static.export --out /var/www/volva
+
+Countries whose latest `port_scan_done_ts` has not changed since the previous export
+are skipped unless `--full` is given. Assets are copied with content hashes in their
+names and the rendered pages link to those copies, so nginx can serve them with
+long-lived cache headers. Pages are rendered without live updates and without links
+to the breakdown and comparison pages, which are not exported.
+"""
+import argparse
+import json
+import os
+
+from src.static.app import RENDER_VERSION, app, fragmentCache, landingCache, logicWrapper
+from src.static.assets import atomic_write, fingerprint_assets, install_asset_resolver
+
+MANIFEST_NAME = 'export-manifest.json'
+DEFAULT_COUNTRY = 'IS'
+
+# API endpoints exported for every country, relative to /api/v1/<country>/
+COUNTRY_ENDPOINTS = ('summary', 'top', 'open-ports')
+
+
+def load_export_manifest(out_dir):
+    """
+    Load the manifest of the previous export.
+
+    Args:
+        out_dir (str): Export directory.
+
+    Returns:
+        dict: Previous manifest, or an empty one if there is none.
+    """
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'render_version': None, 'assets': {}, 'countries': {}}
+
+
+def fetch(client, path):
+    """
+    Request a page from the app and return its body.
+
+    Args:
+        client (FlaskClient): Test client of the app.
+        path (str): URL path.
+
+    Returns:
+        bytes or None: Response body, or None if the response was not 200 OK.
+    """
+    response = client.get(path, follow_redirects=True)
+    if response.status_code != 200:
+        print(f"[EXPORT ERROR] {path} returned {response.status_code}")
+        return None
+    return response.get_data()
+
+
+def export_country(client, out_dir, country_code):
+    """
+    Write a country's landing page and API responses.
+
+    Args:
+        client (FlaskClient): Test client of the app.
+        out_dir (str): Export directory.
+        country_code (str): Country code.
+
+    Returns:
+        bool: True if every file was written.
+    """
+    page = fetch(client, f"/{country_code}")
+    if page is None:
+        return False
+
+    api_files = {}
+    for endpoint in COUNTRY_ENDPOINTS:
+        body = fetch(client, f"/api/v1/{country_code}/{endpoint}")
+        if body is None:
+            return False
+        api_files[os.path.join(out_dir, 'api', 'v1', country_code, f"{endpoint}.json")] = body
+
+    # Only write once everything rendered, so a failed country keeps its previous export
+    atomic_write(os.path.join(out_dir, country_code, 'index.html'), page)
+    if country_code == DEFAULT_COUNTRY:
+        atomic_write(os.path.join(out_dir, 'index.html'), page)
+    for path, body in api_files.items():
+        atomic_write(path, body)
+    return True
+
+
+def export_site(out_dir, full=False, only=None):
+    """
+    Export every country page, skipping countries whose scan has not changed.
+
+    Args:
+        out_dir (str): Export directory.
+        full (bool): Re-export every country regardless of the previous export.
+        only (list[str], optional): Restrict the export to these country codes.
+
+    Returns:
+        int: Exit status, 0 on success.
+    """
+    country_codes = logicWrapper.dataWrapper.get_country_codes()
+    if country_codes is None:
+        print("[EXPORT ERROR] could not fetch country codes")
+        return 1
+    if only:
+        country_codes = [code for code in country_codes if code in {c.upper() for c in only}]
+
+    previous = load_export_manifest(out_dir)
+    # css/, js/ and img/ sit next to app.py and are served under /static/
+    asset_map = fingerprint_assets(app.root_path, os.path.join(out_dir, 'static'))
+    install_asset_resolver(app, asset_map)
+    # Nothing rendered before this point may be reused: it links to the live app
+    app.config['STATIC_EXPORT'] = True
+    landingCache.invalidate()
+    fragmentCache.invalidate()
+
+    # Templates or assets changed: every page links to them, so re-render everything
+    if previous['render_version'] != RENDER_VERSION or previous['assets'] != asset_map:
+        full = True
+
+    manifest = {'render_version': RENDER_VERSION, 'assets': asset_map, 'countries': dict(previous['countries'])}
+    client = app.test_client()
+    failures = 0
+    for country_code in sorted(country_codes):
+        scanned_at = logicWrapper.get_last_scan_ts(country_code)
+        scanned_at = scanned_at.isoformat() if scanned_at else None
+
+        if not full and scanned_at is not None and previous['countries'].get(country_code) == scanned_at:
+            print(f"[EXPORT] {country_code} unchanged, skipping")
+            continue
+
+        # Render from fresh data rather than a snapshot another worker cached before the scan
+        logicWrapper.invalidate_country(country_code)
+        if export_country(client, out_dir, country_code):
+            manifest['countries'][country_code] = scanned_at
+            print(f"[EXPORT] {country_code} exported")
+        else:
+            failures += 1
+
+    countries = fetch(client, "/api/v1/countries")
+    if countries is not None:
+        atomic_write(os.path.join(out_dir, 'api', 'v1', 'countries.json'), countries)
+
+    atomic_write(os.path.join(out_dir, MANIFEST_NAME), json.dumps(manifest, indent=2))
+    return 1 if failures else 0
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Pre-render country pages to static files.")
+    parser.add_argument('--out', required=True, help="directory to write the static site to")
+    parser.add_argument('--full', action='store_true', help="re-export countries whose scan has not changed")
+    parser.add_argument('--country', action='append', help="only export this country (repeatable)")
+    args = parser.parse_args()
+    raise SystemExit(export_site(args.out, full=args.full, only=args.country))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+Gunicorn settings for the volva service.
+
+Usage (from the project root):
+
+    python -m gunicorn -c src/static/gunicorn_conf.py src.static.app:app
+
+Every worker warms its caches in `post_worker_init`, before it accepts its first
+connection, so a restart does not hand cold workers to visitors.
+"""
+import os
+import shutil
+
+from dotenv import load_dotenv
+
+from src.include.data.SharedCache import runtime_directory
+
+load_dotenv()
+
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+# Threaded workers, so open live update streams do not block page requests or the worker heartbeat
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+
+
+def on_starting(server):
+    """Drop metric dumps of the previous run's workers."""
+    shutil.rmtree(os.environ.get('METRICS_DIR') or runtime_directory('volva-metrics'), ignore_errors=True)
+
+
+def post_worker_init(worker):
+    """Warm the worker's caches before it starts accepting requests."""
+    from src.static.app import warm_up
+    warm_up(notify=worker.notify)
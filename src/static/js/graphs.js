@@ -21,6 +21,9 @@ function get_color(name) {
 const line1_color = get_color('--line1');
 const line2_color = get_color('--line2');
 
+// Chart instances by canvas ID, so live updates can patch them in place
+const charts = {};
+
 /**
  * Generate a single-line chart
  * @param {Array} labels - X-axis labels
@@ -32,7 +35,7 @@ const line2_color = get_color('--line2');
 function generate_one_data_graph(labels, values, id, title = "No title given", chartTitle = "Missing Title") {
     const ctx = document.getElementById(id).getContext("2d");
 
-    new Chart(ctx, {
+    charts[id] = new Chart(ctx, {
         type: "line",
         data: {
             labels: labels,
@@ -84,7 +87,7 @@ function generate_one_data_graph(labels, values, id, title = "No title given", c
 function generate_two_data_graph(labels, values1, values2, id, label1 = "Label1", label2 = "Label2", chartTitle = "Missing Title") {
     const ctx = document.getElementById(id).getContext("2d");
 
-    new Chart(ctx, {
+    charts[id] = new Chart(ctx, {
         type: "line",
         data: {
             labels: labels,
@@ -133,6 +136,71 @@ function generate_two_data_graph(labels, values1, values2, id, label1 = "Label1"
     });
 }
 
+/**
+ * Pick a distinct line color for the nth series, starting with the theme's colors
+ * @param {number} index - Series position
+ * @returns {string} CSS color
+ */
+function series_color(index) {
+    const theme = [line1_color, line2_color, get_color('--accent')];
+    if (index < theme.length) {
+        return theme[index];
+    }
+    // Golden-angle hue steps keep neighbouring series apart however many there are
+    return `hsl(${Math.round(index * 137.508) % 360}, 60%, 45%)`;
+}
+
+/**
+ * Generate a chart with one line per series on a shared x axis
+ * @param {Array} labels - Shared X-axis labels
+ * @param {Object} series - Series label -> values aligned with labels (null where missing)
+ * @param {string} id - Canvas element ID
+ * @param {string} chartTitle - Main chart title
+ */
+function generate_multi_data_graph(labels, series, id, chartTitle = "Missing Title") {
+    const ctx = document.getElementById(id).getContext("2d");
+
+    charts[id] = new Chart(ctx, {
+        type: "line",
+        data: {
+            labels: labels,
+            datasets: Object.entries(series).map(([label, values], index) => ({
+                label: label,
+                data: values,
+                fill: false,
+                borderColor: series_color(index),
+                backgroundColor: series_color(index),
+                spanGaps: true,
+                lineTension: 0.1
+            }))
+        },
+        options: {
+            responsive: true,
+            plugins: {
+                title: {
+                    display: true,
+                    text: chartTitle,
+                    color: default_chart_title_color,
+                    font: { size: default_chart_title_size }
+                },
+                legend: {
+                    labels: {
+                        color: get_color('--primary')
+                    }
+                }
+            },
+            scales: {
+                x: {
+                    ticks: { color: get_color('--primary') }
+                },
+                y: {
+                    ticks: { color: get_color('--primary') }
+                }
+            }
+        }
+    });
+}
+
 /**
  * Generate a two-part doughnut chart
  * @param {number} value1 - First value
@@ -180,3 +248,132 @@ function generate_two_data_doughnut(value1, value2, id, label1 = "Label1", label
 
     new Chart(document.getElementById(id), doughnutConfig);
 }
+
+/**
+ * Replace the rows of a multi-cell with new [name, count] pairs
+ * @param {HTMLElement} container - Element with the data-breakdown attribute
+ * @param {Array} entries - [name, count] pairs, highest first
+ */
+function replace_breakdown(container, entries) {
+    container.replaceChildren(...entries.map(([name, count]) => {
+        const row = document.createElement("div");
+        row.className = "cell-content-subcontainer";
+        const key = document.createElement("p");
+        key.className = "multi-cell-key";
+        key.textContent = name;
+        const value = document.createElement("p");
+        value.className = "multi-cell-value";
+        value.textContent = count;
+        row.append(key, value);
+        return row;
+    }));
+}
+
+/**
+ * Patch a line chart with new points, keeping its sliding window length
+ * @param {Chart} chart - Chart.js instance
+ * @param {Object} update - {append: [[label, value]], window: n} or {replace: [[label, value]]}
+ */
+function patch_series(chart, update) {
+    const labels = chart.data.labels;
+    const values = chart.data.datasets[0].data;
+    if (update.replace) {
+        labels.length = 0;
+        values.length = 0;
+    }
+    for (const [label, value] of update.append || update.replace) {
+        labels.push(label);
+        values.push(value);
+    }
+    while (update.window && labels.length > update.window) {
+        labels.shift();
+        values.shift();
+    }
+    chart.update();
+}
+
+/**
+ * Apply one update from the live stream to the page
+ * @param {Object} delta - Changed counters, breakdowns and series
+ */
+function apply_update(delta) {
+    for (const [key, value] of Object.entries(delta.counters || {})) {
+        document.querySelectorAll(`[data-counter="${key}"]`).forEach(el => { el.textContent = value; });
+    }
+    for (const [key, entries] of Object.entries(delta.breakdowns || {})) {
+        document.querySelectorAll(`[data-breakdown="${key}"]`).forEach(el => replace_breakdown(el, entries));
+    }
+    for (const [key, update] of Object.entries(delta.series || {})) {
+        document.querySelectorAll(`canvas[data-series="${key}"]`).forEach(canvas => {
+            if (charts[canvas.id]) {
+                patch_series(charts[canvas.id], update);
+            }
+        });
+    }
+}
+
+// Seconds a page has to stay visible before it opens a live stream, so short visits never take a slot
+const live_update_delay = 10;
+// Reconnects after the server refused a stream, and seconds before the first of them
+const live_update_retries = 2;
+const live_update_retry_delay = 60;
+
+/**
+ * Subscribe to a country's Server-Sent Events stream and patch the page with each update.
+ * The stream is only opened once the page has been visible for `live_update_delay` seconds
+ * and is closed while the page is hidden, so background tabs do not hold server threads.
+ * @param {string} url - Stream URL, e.g. "/api/v1/IS/stream?since=1745971200"
+ */
+function subscribe_to_updates(url) {
+    if (!window.EventSource) {
+        return;
+    }
+    const stream_url = new URL(url, window.location.href);
+    let source = null;
+    let timer = null;
+    let retries = live_update_retries;
+
+    const open = () => {
+        timer = null;
+        const stream = new EventSource(stream_url);
+        source = stream;
+        stream.addEventListener("update", event => {
+            // Reopened streams resume from the scan the page now shows
+            if (event.lastEventId) {
+                stream_url.searchParams.set("since", event.lastEventId);
+            }
+            retries = live_update_retries;
+            apply_update(JSON.parse(event.data));
+        });
+        stream.onerror = () => {
+            // The browser reconnects by itself after dropped streams, but gives up on
+            // error statuses such as 503 when the server is at its stream limit
+            if (stream.readyState !== EventSource.CLOSED || source !== stream) {
+                return;
+            }
+            source = null;
+            if (retries > 0 && document.visibilityState === "visible") {
+                timer = setTimeout(open, live_update_retry_delay * 1000 * (live_update_retries - retries + 1));
+                retries -= 1;
+            }
+        };
+    };
+
+    const schedule = () => {
+        if (document.visibilityState === "visible") {
+            if (!source && !timer && retries > 0) {
+                timer = setTimeout(open, live_update_delay * 1000);
+            }
+            return;
+        }
+        clearTimeout(timer);
+        timer = null;
+        if (source) {
+            source.close();
+            source = null;
+        }
+    };
+
+    document.addEventListener("visibilitychange", schedule);
+    schedule();
+}
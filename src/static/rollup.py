@@ -0,0 +1,78 @@
+"""
+Maintain the daily, weekly and monthly rollups the history endpoint reads from.
+
+Usage (from the project root):
+
+    python -m src.static.rollup --init             # once, creates the tables and backfills
+    python -m src.static.rollup                    # after every scan, e.g. from cron
+    python -m src.static.rollup --install-trigger  # optional, installs the change notification trigger
+
+Each run only re-aggregates the buckets that contain scan summaries added since the
+previous run, so it stays cheap however long the history grows.
+"""
+import argparse
+
+from dotenv import load_dotenv
+
+from src.include.data.DataWrapper import DataWrapper
+
+
+def update(init=False, full=False):
+    """
+    Create the rollup tables if asked and bring them up to date.
+
+    Args:
+        init (bool): Create the tables and index first.
+        full (bool): Rebuild every bucket instead of only those with new scans.
+
+    Returns:
+        int: Exit status, 0 on success.
+    """
+    dataWrapper = DataWrapper()
+    if init and not dataWrapper.create_rollup_tables():
+        print("[ROLLUP ERROR] could not create the rollup tables")
+        return 1
+
+    written = dataWrapper.update_rollups(full=full)
+    if written is None:
+        print("[ROLLUP ERROR] could not update the rollups")
+        return 1
+    print(f"[ROLLUP] {written} buckets updated")
+    return 0
+
+
+def install_trigger():
+    """
+    Install the trigger that notifies the app's listeners whenever a summary row changes.
+
+    Kept apart from ``--init`` because it adds work to every write on the summary table.
+
+    Returns:
+        int: Exit status, 0 on success.
+    """
+    if not DataWrapper().create_change_trigger():
+        print("[ROLLUP ERROR] could not create the summary change trigger")
+        return 1
+    print("[ROLLUP] summary change trigger installed")
+    return 0
+
+
+def main():
+    """Command line entry point."""
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Update the summary rollup tables.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--init', action='store_true', help="create the rollup tables and index")
+    mode.add_argument('--install-trigger', action='store_true',
+                      help="only install the summary change notification trigger")
+    parser.add_argument('--full', action='store_true', help="rebuild every bucket, not only those with new scans")
+    args = parser.parse_args()
+    if args.install_trigger:
+        if args.full:
+            parser.error("--full cannot be combined with --install-trigger")
+        raise SystemExit(install_trigger())
+    raise SystemExit(update(init=args.init, full=args.full))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import pytest
+
+from src.include.logic.CountryRegistry import CountryRegistry
+from src.include.models.countrySummaryModel import CountrySummaryModel
+
+
+class FakeClock:
+    """Stands in for the `time` module of the module under test, advanced by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """Replace a module's `time` with a FakeClock: `clock = fake_clock(module)`."""
+    def install(module):
+        clock = FakeClock()
+        monkeypatch.setattr(module, 'time', clock)
+        return clock
+
+    return install
+
+
+@pytest.fixture
+def web(monkeypatch):
+    """The Flask app module with empty response caches and GL and DK as the only known countries."""
+    from src.static import app as web_app
+
+    monkeypatch.setattr(web_app.logicWrapper.dbLogic, 'countryRegistry', CountryRegistry(lambda: ['GL', 'DK']))
+    web_app.landingCache.invalidate()
+    web_app.fragmentCache.invalidate()
+    yield web_app
+    web_app.landingCache.invalidate()
+    web_app.fragmentCache.invalidate()
+
+
+@pytest.fixture
+def client(web):
+    return web.app.test_client()
+
+
+@pytest.fixture
+def make_summary():
+    """Build a small CountrySummaryModel: `make_summary('GL', scanned_at, total_open_ports=...)`."""
+    def build(country_code, scanned_at=datetime(2025, 4, 1), **fields):
+        values = {
+            'ips_count': 1000, 'total_alive_hosts': 500, 'port_amount': 100, 'total_open_ports': 42,
+            'unique_open_ports': {'443': 9, '22': 7}, 'services_count': {'https': 9, 'ssh': 7},
+            'versions_count': {'OpenSSH 9.6': 7}, 'os_count': {'Linux': 12}, 'products_count': {'nginx': 5},
+            'cpe_count': {'cpe:/a:openbsd:openssh': 7},
+            'open_ports_dates': ['01-03-2025', '01-04-2025'], 'open_ports_values': [40, 42]
+        }
+        values.update(fields)
+        return CountrySummaryModel(country_code, port_scan_done_ts=scanned_at, **values)
+
+    return build
+
+
+@pytest.fixture
+def scans(web, monkeypatch, make_summary):
+    """Snapshots the app's LogicWrapper serves, by country code; tests replace or remove them."""
+    snapshots = {code: make_summary(code) for code in ('GL', 'DK')}
+
+    def last_scan_ts(country_code):
+        summary = snapshots.get(country_code.upper())
+        return summary.port_scan_done_ts if summary else None
+
+    monkeypatch.setattr(web.logicWrapper, 'get_country_summary', lambda code: snapshots.get(code.upper()))
+    monkeypatch.setattr(web.logicWrapper, 'get_last_scan_ts', last_scan_ts)
+    monkeypatch.setattr(web.logicWrapper, 'get_country_summaries',
+                        lambda codes: {code: snapshots[code] for code in codes if code in snapshots})
+    return snapshots
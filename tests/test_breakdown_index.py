@@ -0,0 +1,72 @@
+import pytest
+
+from src.include.logic.BreakdownIndex import BreakdownIndex
+
+ENTRIES = {f"service-{n:03d}": (n * 37) % 50 for n in range(120)}
+
+
+def all_pages(index, **kwargs):
+    rows, cursor, pages = [], None, 0
+    while True:
+        page, cursor = index.page(after=cursor, **kwargs)
+        rows.extend(page)
+        pages += 1
+        if cursor is None:
+            return rows, pages
+
+
+def test_count_order_pages_cover_every_entry_once():
+    index = BreakdownIndex(ENTRIES)
+    rows, pages = all_pages(index, sort='count', limit=25)
+
+    assert pages == 5
+    assert [name for name, _ in rows] == [name for _, name in sorted((-c, n) for n, c in ENTRIES.items())]
+
+
+def test_name_order_pages_are_case_insensitive():
+    index = BreakdownIndex({'beta': 1, 'Alpha': 2, 'gamma': 3, 'alpha2': 4})
+    rows, _ = all_pages(index, sort='name', limit=1)
+    assert [name for name, _ in rows] == ['Alpha', 'alpha2', 'beta', 'gamma']
+
+
+def test_page_ending_exactly_at_the_last_entry_has_no_cursor():
+    index = BreakdownIndex({'a': 1, 'b': 2, 'c': 3, 'd': 4})
+    first, cursor = index.page(limit=2)
+    second, cursor = index.page(after=cursor, limit=2)
+    assert [name for name, _ in first + second] == ['d', 'c', 'b', 'a']
+    assert cursor is None
+
+
+def test_prefix_and_substring_search_across_pages():
+    index = BreakdownIndex(ENTRIES)
+    prefix, _ = all_pages(index, sort='name', query='SERVICE-01', limit=3)
+    assert [name for name, _ in prefix] == [f"service-{n:03d}" for n in range(10, 20)]
+
+    substring, _ = all_pages(index, sort='count', query='9', match='substring', limit=4)
+    assert sorted(name for name, _ in substring) == sorted(name for name in ENTRIES if '9' in name)
+
+
+@pytest.mark.parametrize('cursor', [['x'], [1, 2], ['a', 'b'], 'abc'])
+def test_malformed_count_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        BreakdownIndex(ENTRIES).page(sort='count', after=cursor)
+
+
+@pytest.mark.parametrize('limit', [0, -1])
+def test_limit_below_one_is_rejected(limit):
+    with pytest.raises(ValueError):
+        BreakdownIndex(ENTRIES).page(limit=limit)
+
+
+@pytest.mark.parametrize('sort', ['count', 'name'])
+@pytest.mark.parametrize('match', ['prefix', 'substring'])
+@pytest.mark.parametrize('query', ['s', 'SERVICE-1', 'ce-0', '-', '99', 'x', 'Ärger'])
+def test_search_pages_match_a_plain_filter(sort, match, query):
+    entries = dict(ENTRIES, **{'ÄRGER-1': 3, 'ärger': 3, 'Nice-Service': 12})
+    rows, _ = all_pages(BreakdownIndex(entries), sort=sort, query=query, match=match, limit=7)
+    everything, _ = all_pages(BreakdownIndex(entries), sort=sort, limit=1000)
+
+    folded = query.casefold()
+    expected = [row for row in everything
+                if (row[0].casefold().startswith(folded) if match == 'prefix' else folded in row[0].casefold())]
+    assert rows == expected
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from src.include.models.countrySummaryModel import CountrySummaryModel
+
+
+def test_api_compares_the_requested_countries_in_order(client, scans):
+    response = client.get('/api/v1/compare?countries=dk,GL,DK')
+    assert response.status_code == 200
+    assert [country['country'] for country in response.json['countries']] == ['DK', 'GL']
+    assert response.json['open_ports']['labels'] == ['01-03-2025', '01-04-2025']
+    assert set(response.json['countries'][0]['top']) == {'ports', 'services', 'versions', 'os', 'products', 'cpe'}
+
+
+def test_defaults_to_the_first_known_countries(client, web, scans, monkeypatch):
+    monkeypatch.setattr(web, 'COMPARE_MAX_COUNTRIES', 1)
+    assert [country['country'] for country in client.get('/api/v1/compare').json['countries']] == ['DK']
+
+
+def test_rejects_unknown_and_too_many_countries(client, web, scans, monkeypatch):
+    unknown = client.get('/api/v1/compare?countries=GL,XX')
+    assert unknown.status_code == 404
+    assert unknown.json == {'error': 'unknown country codes: XX'}
+    assert client.get('/compare?countries=GL,XX').status_code == 404
+
+    monkeypatch.setattr(web, 'COMPARE_MAX_COUNTRIES', 1)
+    assert client.get('/api/v1/compare?countries=GL,DK').status_code == 400
+    assert client.get('/compare?countries=GL,DK').status_code == 400
+
+
+def test_page_revalidates_against_every_scan(client, scans, make_summary):
+    first = client.get('/compare?countries=GL,DK')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert client.get('/compare?countries=GL,DK', headers={'If-None-Match': etag}).status_code == 304
+
+    scans['DK'] = make_summary('DK', datetime(2025, 4, 2))
+    assert client.get('/compare?countries=GL,DK', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_landing_page_from_a_fallback_snapshot_is_not_cached_or_validated(client, web, scans):
+    scans['GL'].is_fallback = True
+    response = client.get('/GL')
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+    assert web.landingCache.peek('GL') is None
+
+    scans['GL'].is_fallback = False
+    assert 'ETag' in client.get('/GL').headers
+    assert web.landingCache.peek('GL') is not None
+
+
+def test_fallback_flag_is_not_serialized(make_summary):
+    fallback = make_summary('GL')
+    fallback.is_fallback = True
+    data = fallback.to_dict()
+    assert 'is_fallback' not in data
+
+    restored = CountrySummaryModel.from_dict(data)
+    assert not restored.is_fallback
+    assert restored.to_dict() == make_summary('GL').to_dict()
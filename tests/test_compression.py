@@ -0,0 +1,85 @@
+import gzip
+import zlib
+
+import pytest
+from flask import Flask, make_response, request
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+from src.static import compression
+from src.static.compression import compress_stream, install_compression, negotiate_encoding
+
+CHUNKS = ['<html><head>', 'x' * 3000, '<p>cell</p>' * 200, '</html>']
+
+
+def accept(header):
+    return parse_accept_header(header, Accept)
+
+
+def test_negotiation_prefers_brotli_and_honours_q_zero(monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', object())
+    assert negotiate_encoding(accept('gzip, deflate, br')) == 'br'
+    assert negotiate_encoding(accept('br;q=0, gzip')) == 'gzip'
+    assert negotiate_encoding(accept('identity')) is None
+
+    monkeypatch.setattr(compression, 'brotli', None)
+    assert negotiate_encoding(accept('br')) is None
+
+
+def test_gzip_stream_round_trips_and_every_chunk_is_decodable():
+    decoder = zlib.decompressobj(31)
+    decoded = []
+    pieces = list(compress_stream(CHUNKS, 'gzip'))
+    for piece, chunk in zip(pieces, CHUNKS):
+        decoded.append(decoder.decompress(piece).decode())
+        assert decoded[-1] == chunk
+    assert gzip.decompress(b''.join(pieces)).decode() == ''.join(CHUNKS)
+
+
+def test_brotli_stream_round_trips():
+    brotli = pytest.importorskip('brotli')
+    decoder = brotli.Decompressor()
+    pieces = list(compress_stream(CHUNKS, 'br'))
+    for piece, chunk in zip(pieces, CHUNKS):
+        assert decoder.process(piece).decode() == chunk
+    assert brotli.decompress(b''.join(pieces)).decode() == ''.join(CHUNKS)
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    install_compression(app, min_size=100)
+
+    @app.route('/page')
+    def page():
+        response = make_response('<p>cell</p>' * 100)
+        response.set_etag('IS-1')
+        return response.make_conditional(request)
+
+    @app.route('/events')
+    def events():
+        return app.response_class(iter(['data: x\n\n'] * 100), mimetype='text/event-stream')
+
+    return app.test_client()
+
+
+def test_compressed_200_and_304_carry_the_same_weak_etag(client):
+    response = client.get('/page', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'] == 'W/"IS-1"'
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+    revalidated = client.get('/page', headers={'Accept-Encoding': 'gzip', 'If-None-Match': 'W/"IS-1"'})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == 'W/"IS-1"'
+
+
+def test_uncompressed_client_gets_strong_etag(client):
+    response = client.get('/page', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['ETag'] == '"IS-1"'
+
+
+def test_server_sent_events_are_not_compressed(client):
+    response = client.get('/events', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
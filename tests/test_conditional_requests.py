@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pytest
+
+
+@pytest.mark.parametrize('path', ['/GL', '/api/v1/GL/summary', '/api/v1/GL/top'])
+def test_unchanged_scan_is_answered_with_304(client, scans, path):
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert etag.startswith(('"GL-', 'W/"GL-'))
+    assert first.headers['Last-Modified'] == 'Tue, 01 Apr 2025 00:00:00 GMT'
+
+    assert client.get(path, headers={'If-None-Match': etag}).status_code == 304
+    assert client.get(path, headers={'If-Modified-Since': first.headers['Last-Modified']}).status_code == 304
+
+
+def test_304_is_sent_without_fetching_the_snapshot(client, web, scans, monkeypatch):
+    api_etag = client.get('/api/v1/GL/summary').headers['ETag']
+    page_etag = client.get('/GL').headers['ETag']
+    web.landingCache.invalidate()
+    monkeypatch.setattr(web.logicWrapper, 'get_country_summary', lambda code: pytest.fail('snapshot fetched'))
+
+    assert client.get('/api/v1/GL/summary', headers={'If-None-Match': api_etag}).status_code == 304
+    assert client.get('/GL', headers={'If-None-Match': page_etag}).status_code == 304
+
+
+def test_new_scan_changes_the_validators(client, web, scans, make_summary):
+    etag = client.get('/GL').headers['ETag']
+    scans['GL'] = make_summary('GL', datetime(2025, 4, 2), total_open_ports=50)
+    web.landingCache.invalidate()
+
+    response = client.get('/GL', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.cache_control.no_cache
+
+
+def test_validators_differ_between_countries(client, scans):
+    assert client.get('/GL').headers['ETag'] != client.get('/DK').headers['ETag']
@@ -0,0 +1,92 @@
+import pytest
+from psycopg2 import extensions
+
+from src.include.data.ConnectionPool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """The parts of a psycopg2 connection the pool uses."""
+
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = False
+
+    def get_transaction_status(self):
+        return extensions.TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+class Factory:
+    """Connection factory recording what it opened; returns None while `failing`."""
+
+    def __init__(self):
+        self.opened = []
+        self.failing = False
+
+    def __call__(self):
+        if self.failing:
+            return None
+        conn = FakeConnection()
+        self.opened.append(conn)
+        return conn
+
+
+@pytest.fixture
+def factory():
+    return Factory()
+
+
+def test_released_connection_is_reused(factory):
+    pool = ConnectionPool(factory, max_size=2)
+    conn = pool.acquire()
+    assert conn.autocommit
+    pool.release(conn)
+    assert pool.acquire() is conn
+    assert len(factory.opened) == 1
+
+
+def test_exhausted_pool_raises_pool_timeout(factory):
+    pool = ConnectionPool(factory, max_size=1, checkout_timeout=0.05)
+    pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+
+def test_failed_connect_returns_none_and_frees_the_slot(factory):
+    pool = ConnectionPool(factory, max_size=1, checkout_timeout=0.05)
+    factory.failing = True
+    assert pool.acquire() is None
+    factory.failing = False
+    assert pool.acquire() is not None
+
+
+def test_close_all_closes_idle_and_later_released_connections(factory):
+    pool = ConnectionPool(factory, max_size=2, checkout_timeout=0.05)
+    held = pool.acquire()
+    idle = pool.acquire()
+    pool.release(idle)
+
+    pool.close_all()
+    assert idle.closed
+    assert not held.closed
+
+    pool.release(held)
+    assert held.closed
+    # Both slots are free again, for new connections
+    assert pool.acquire() not in (held, idle)
+    assert pool.acquire() not in (held, idle)
+
+
+def test_idle_connections_above_min_size_are_reaped(factory):
+    pool = ConnectionPool(factory, min_size=1, max_size=3, max_idle=0)
+    conns = [pool.acquire() for _ in range(3)]
+    for conn in conns:
+        pool.release(conn)
+
+    pool.reap_idle()
+    assert sum(1 for conn in conns if conn.closed) == 2
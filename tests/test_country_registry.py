@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from src.include.logic import CountryRegistry as country_registry_module
+from src.include.logic.CountryRegistry import CountryRegistry
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(country_registry_module)
+
+
+class Loader:
+    """Returns the queued results in turn and counts its calls."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.results.pop(0) if len(self.results) > 1 else self.results[0]
+
+
+def wait_for_refresh():
+    for thread in threading.enumerate():
+        if thread.name == 'country-registry-refresh':
+            thread.join(timeout=5)
+
+
+def test_loads_once_and_is_case_insensitive(clock):
+    loader = Loader(['IS', 'GL'])
+    registry = CountryRegistry(loader, ttl=60)
+
+    assert registry.contains('is') is True
+    assert registry.contains('XX') is False
+    assert registry.codes() == frozenset({'IS', 'GL'})
+    assert loader.calls == 1
+
+
+def test_unavailable_codes_are_reported_as_none(clock):
+    assert CountryRegistry(Loader(None)).contains('IS') is None
+
+
+def test_stale_codes_are_served_while_reloaded_in_the_background(clock):
+    loader = Loader(['IS'], ['IS', 'FO'])
+    registry = CountryRegistry(loader, ttl=60)
+    assert registry.contains('FO') is False
+
+    clock.now += 61
+    assert registry.contains('FO') is False
+    wait_for_refresh()
+    assert registry.contains('FO') is True
+    assert loader.calls == 2
+
+
+def test_failed_reload_keeps_the_codes_and_waits_another_ttl(clock):
+    loader = Loader(['IS'], None)
+    registry = CountryRegistry(loader, ttl=60)
+    registry.contains('IS')
+
+    clock.now += 61
+    assert registry.contains('IS') is True
+    wait_for_refresh()
+    for _ in range(5):
+        assert registry.contains('IS') is True
+        wait_for_refresh()
+    assert loader.calls == 2
+
+    clock.now += 61
+    registry.contains('IS')
+    wait_for_refresh()
+    assert loader.calls == 3
+
+
+def test_concurrent_callers_start_a_single_reload(clock):
+    release = threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(timeout=5)
+        return ['IS']
+
+    registry = CountryRegistry(slow_loader, ttl=60)
+    registry.contains('IS')
+    clock.now += 61
+
+    callers = [threading.Thread(target=registry.contains, args=('IS',)) for _ in range(16)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    release.set()
+    wait_for_refresh()
+    assert len(calls) == 2
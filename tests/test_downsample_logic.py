@@ -0,0 +1,25 @@
+import math
+
+from src.include.logic.downsampleLogic import DownsampleLogic
+
+
+def test_short_series_is_kept_whole():
+    assert DownsampleLogic.lttb([0, 1, 2], [5, 6, 7], 10) == [0, 1, 2]
+
+
+def test_keeps_endpoints_and_exactly_threshold_points():
+    x_vals = list(range(1000))
+    y_vals = [math.sin(x / 20) for x in x_vals]
+    kept = DownsampleLogic.lttb(x_vals, y_vals, 100)
+
+    assert len(kept) == 100
+    assert kept[0] == 0
+    assert kept[-1] == 999
+    assert kept == sorted(set(kept))
+
+
+def test_keeps_a_single_spike():
+    x_vals = list(range(500))
+    y_vals = [0] * 500
+    y_vals[321] = 1000
+    assert 321 in DownsampleLogic.lttb(x_vals, y_vals, 20)
@@ -0,0 +1,16 @@
+from src.static import export
+
+
+def test_exported_pages_leave_out_live_updates_and_unexported_links(client, web, scans, monkeypatch):
+    live = client.get('/GL').get_data(as_text=True)
+    assert 'subscribe_to_updates("/api/v1/GL/stream' in live
+    assert '/GL/breakdown/ports' in live
+    assert 'href="/compare"' in live
+
+    monkeypatch.setitem(web.app.config, 'STATIC_EXPORT', True)
+    web.landingCache.invalidate()
+    exported = export.fetch(client, '/GL').decode()
+    assert 'subscribe_to_updates(' not in exported
+    assert '/breakdown/' not in exported
+    assert 'href="/compare"' not in exported
+    assert 'Show all' not in exported
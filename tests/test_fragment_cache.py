@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+
+
+@pytest.fixture
+def renders(web, monkeypatch):
+    """Templates whose macros were rendered rather than served from the fragment cache."""
+    rendered = []
+    original = web.metrics.inc
+
+    def inc(name, *args, **labels):
+        if name == 'volva_fragment_renders_total':
+            rendered.append(labels['template'])
+        return original(name, *args, **labels)
+
+    monkeypatch.setattr(web.metrics, 'inc', inc)
+    monkeypatch.setattr(web.app.jinja_env, 'auto_reload', False)
+    return rendered
+
+
+def test_rebuilt_page_reuses_every_fragment(client, web, scans, renders):
+    first = client.get('/GL').get_data(as_text=True)
+    assert 'multi_cell.html' in renders and 'cell.html' in renders
+    count = len(renders)
+
+    web.landingCache.invalidate()
+    assert client.get('/GL').get_data(as_text=True) == first
+    assert len(renders) == count
+
+
+def test_only_changed_cells_are_rendered_again(client, web, scans, make_summary, renders):
+    client.get('/GL')
+    renders.clear()
+
+    scans['GL'] = make_summary('GL', datetime(2025, 4, 2), total_open_ports=50)
+    web.landingCache.invalidate()
+    page = client.get('/GL').get_data(as_text=True)
+
+    assert '50' in page
+    assert renders == ['cell.html']
+
+
+def test_fragments_are_rendered_fresh_with_auto_reload(web, scans, renders, monkeypatch):
+    monkeypatch.setattr(web.app.jinja_env, 'auto_reload', True)
+    with web.app.test_request_context():
+        first = web.fragment('cell.html', 'cell', 'Total IPs Scanned', 1000, 'ips_count')
+        second = web.fragment('cell.html', 'cell', 'Total IPs Scanned', 1000, 'ips_count')
+    assert first == second
+    assert renders == ['cell.html', 'cell.html']
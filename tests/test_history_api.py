@@ -0,0 +1,29 @@
+HISTORY = '/api/v1/GL/open-ports/history'
+
+
+def test_etag_follows_the_series_not_the_scan(client, web, monkeypatch):
+    series = {'values': [3, 4]}
+    monkeypatch.setattr(web.logicWrapper, 'get_open_ports_history',
+                        lambda code, start, end, granularity, points: (['2025-01-01', '2025-01-02'],
+                                                                       series['values']))
+
+    first = client.get(HISTORY + '?from=2025-01-01&to=2025-02-01')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert client.get(HISTORY + '?from=2025-01-01&to=2025-02-01',
+                      headers={'If-None-Match': etag}).status_code == 304
+
+    other_window = client.get(HISTORY + '?from=2025-01-02&to=2025-02-01', headers={'If-None-Match': etag})
+    assert other_window.status_code == 200
+
+    series['values'] = [3, 5]
+    caught_up = client.get(HISTORY + '?from=2025-01-01&to=2025-02-01', headers={'If-None-Match': etag})
+    assert caught_up.status_code == 200
+    assert caught_up.json['values'] == [3, 5]
+
+
+def test_rejects_bad_parameters(client):
+    assert client.get(HISTORY + '?granularity=hour').status_code == 400
+    assert client.get(HISTORY + '?from=nope').status_code == 400
+    assert client.get(HISTORY + '?from=2025-02-01&to=2025-01-01').status_code == 400
+    assert client.get('/api/v1/XX/open-ports/history').status_code == 404
@@ -0,0 +1,52 @@
+from src.include.logic.CountryRegistry import CountryRegistry
+
+
+def test_countries(client, scans):
+    response = client.get('/api/v1/countries')
+    assert response.json == {'countries': ['DK', 'GL']}
+    assert response.get_data(as_text=True) == '{"countries":["DK","GL"]}'
+
+
+def test_summary_shape_and_caching_headers(client, scans):
+    response = client.get('/api/v1/gl/summary')
+    assert response.status_code == 200
+    assert response.json == {
+        'country': 'GL',
+        'scanned_at': '2025-04-01T00:00:00',
+        'ips_count': 1000,
+        'total_alive_hosts': 500,
+        'port_amount': 100,
+        'total_open_ports': 42
+    }
+    assert response.cache_control.public
+    assert response.cache_control.max_age == 60
+
+
+def test_top_keeps_the_ranking_order(client, scans):
+    top = client.get('/api/v1/GL/top').json
+    assert top['ports'] == [['443', 9], ['22', 7]]
+    assert set(top) == {'country', 'ports', 'services', 'versions', 'os', 'products', 'cpe'}
+
+
+def test_open_ports_series(client, scans):
+    assert client.get('/api/v1/GL/open-ports').json == {
+        'country': 'GL', 'labels': ['01-03-2025', '01-04-2025'], 'values': [40, 42]
+    }
+
+
+def test_unknown_country_is_404(client, scans):
+    for endpoint in ('summary', 'top', 'open-ports'):
+        response = client.get(f'/api/v1/XX/{endpoint}')
+        assert response.status_code == 404
+        assert response.json == {'error': 'unknown country code'}
+        assert 'ETag' not in response.headers
+
+
+def test_unavailable_data_is_503(client, web, scans, monkeypatch):
+    del scans['GL']
+    assert client.get('/api/v1/GL/summary').status_code == 503
+    assert client.get('/api/v1/GL/summary').json == {'error': 'data unavailable'}
+
+    monkeypatch.setattr(web.logicWrapper.dbLogic, 'countryRegistry', CountryRegistry(lambda: None))
+    assert client.get('/api/v1/countries').status_code == 503
+    assert client.get('/api/v1/DK/summary').status_code == 503
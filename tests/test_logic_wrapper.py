@@ -0,0 +1,12 @@
+from src.include.logic.CountryRegistry import CountryRegistry
+
+
+def test_concurrent_summary_is_none_for_unknown_or_unverifiable_codes(web, monkeypatch):
+    wrapper = web.logicWrapper
+    lookups = []
+    monkeypatch.setattr(wrapper, 'fetch_concurrently', lambda *args: lookups.append(args))
+
+    assert wrapper.get_country_summary_concurrently('XX') is None
+    monkeypatch.setattr(wrapper.dbLogic, 'countryRegistry', CountryRegistry(lambda: None))
+    assert wrapper.get_country_summary_concurrently('GL') is None
+    assert lookups == []
@@ -0,0 +1,63 @@
+import pytest
+
+from src.static.build_assets import _split_code, _starts_regex, minify_css, minify_js
+
+JS_QUOTES = '"\'`'
+
+
+def test_split_code_keeps_strings_whole_and_separates_comments():
+    tokens = _split_code("a = 'it\\'s // not' /* c */ + b // tail\nc", JS_QUOTES)
+    assert ('string', "'it\\'s // not'") in tokens
+    assert ('comment', '/* c */') in tokens
+    assert ('comment', '// tail') in tokens
+    assert ''.join(token for _, token in tokens) == "a = 'it\\'s // not' /* c */ + b // tail\nc"
+
+
+def test_css_has_no_line_comments():
+    tokens = _split_code('a { background: url(http://example.org/x.png); }', '"\'')
+    assert all(kind == 'code' for kind, _ in tokens)
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('x = /ab/', True),
+    ('f(/ab/)', True),
+    ('/ab/.test(s)', True),
+    ('return /ab/', True),
+    ('typeof /ab/', True),
+    ('a / b', False),
+    ('f(x) / 2', False),
+    ('items.length / 2', False),
+    ('obj.return / 2', False),
+    ('total_return / 2', False),
+])
+def test_starts_regex(source, expected):
+    assert _starts_regex(source, source.index('/')) is expected
+
+
+def test_regex_after_return_is_kept_verbatim():
+    source = "function quoted(s) {\n    return /[\"'/*]/.test(s); // any quote\n}\n"
+    assert minify_js(source) == "function quoted(s) {\nreturn/[\"'/*]/.test(s);\n}"
+
+
+def test_strings_and_templates_with_comment_markers_survive():
+    source = "const a = \"http://example.org\";\nconst b = 'a /* b */ c';\nconst c = `//${a}/*${b}*/`;\n"
+    assert minify_js(source).split('\n') == [
+        'const a ="http://example.org";',
+        "const b ='a /* b */ c';",
+        'const c =`//${a}/*${b}*/`;'
+    ]
+
+
+def test_line_breaks_are_kept_for_semicolon_insertion():
+    source = "let a = b\n(c || d).run()\nreturn\n    value\nx\n++y\n"
+    assert minify_js(source).split('\n') == ['let a = b', '(c || d).run()', 'return', 'value', 'x', '++y']
+
+
+def test_multi_line_block_comment_still_ends_the_statement():
+    assert minify_js('return /* why\n*/ value') == 'return\nvalue'
+    assert minify_js('a = 1 /* one */ + 2') == 'a = 1 + 2'
+
+
+def test_css_drops_comments_and_whitespace_but_not_string_content():
+    source = '/* theme */\na > b ,\nc {\n    content: "/* kept */ ;";\n    margin : 0 auto ;\n}\n'
+    assert minify_css(source) == 'a>b,c{content:"/* kept */ ;";margin :0 auto}'
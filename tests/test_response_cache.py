@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from src.include.logic import ResponseCache as response_cache_module
+from src.include.logic.ResponseCache import ResponseCache
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(response_cache_module)
+
+
+def counting_builder(value):
+    calls = []
+
+    def build():
+        calls.append(1)
+        return value
+
+    return build, calls
+
+
+def test_fresh_entry_is_not_rebuilt(clock):
+    cache = ResponseCache(ttl=10)
+    build, calls = counting_builder('a')
+
+    assert cache.get('IS', build) == 'a'
+    clock.now += 5
+    assert cache.get('IS', build) == 'a'
+    assert len(calls) == 1
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(clock):
+    cache = ResponseCache(ttl=10)
+    cache.get('IS', lambda: 'old')
+    clock.now += 11
+
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_build():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'new'
+
+    assert cache.get('IS', slow_build) == 'old'
+    assert started.wait(5)
+    # A second stale read while the refresh runs neither blocks nor starts another build
+    assert cache.get('IS', slow_build) == 'old'
+    release.set()
+
+    for _ in range(500):
+        if cache.peek('IS') == 'new':
+            break
+        threading.Event().wait(0.01)
+    assert cache.peek('IS') == 'new'
+    assert len(calls) == 1
+
+
+def test_failed_build_is_not_cached(clock):
+    cache = ResponseCache(ttl=10)
+    assert cache.get('IS', lambda: None) is None
+    build, calls = counting_builder('a')
+    assert cache.get('IS', build) == 'a'
+    assert len(calls) == 1
+
+
+def test_concurrent_misses_share_one_build(clock):
+    cache = ResponseCache(ttl=10)
+    release = threading.Event()
+    calls = []
+
+    def slow_build():
+        calls.append(1)
+        release.wait(5)
+        return 'a'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('IS', slow_build))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    threading.Event().wait(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ['a'] * 4
+    assert len(calls) == 1
+
+
+def test_peek_only_returns_fresh_entries(clock):
+    cache = ResponseCache(ttl=10)
+    assert cache.peek('IS') is None
+    cache.put('IS', 'a')
+    assert cache.peek('IS') == 'a'
+    clock.now += 11
+    assert cache.peek('IS') is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResponseCache(ttl=10, max_entries=2)
+    cache.put('IS', 'is')
+    cache.put('GL', 'gl')
+    cache.get('IS', lambda: 'rebuilt')
+    cache.put('FO', 'fo')
+
+    assert cache.peek('IS') == 'is'
+    assert cache.peek('GL') is None
+    assert cache.peek('FO') == 'fo'
+
+
+def test_values_failing_cacheable_are_returned_but_not_stored(clock):
+    cache = ResponseCache(ttl=10, cacheable=lambda value: value != 'degraded')
+    build, calls = counting_builder('degraded')
+
+    assert cache.get('IS', build) == 'degraded'
+    assert cache.get('IS', build) == 'degraded'
+    assert len(calls) == 2
+    assert cache.peek('IS') is None
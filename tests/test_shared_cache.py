@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from src.include.data import SharedCache as shared_cache_module
+from src.include.data.SharedCache import SharedCache
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(shared_cache_module)
+
+
+def entry_files(cache):
+    return sorted(name for name in os.listdir(cache.directory) if name.endswith('.json'))
+
+
+def test_values_are_shared_between_instances_until_they_expire(tmp_path, clock):
+    writer = SharedCache(str(tmp_path), ttl=10)
+    reader = SharedCache(str(tmp_path), ttl=10)
+    writer.set('summary:IS', {'total_open_ports': 42})
+
+    assert reader.get('summary:IS') == {'total_open_ports': 42}
+    clock.now += 11
+    assert reader.get('summary:IS') is None
+    assert reader.get('summary:GL') is None
+
+
+def test_oldest_entries_are_evicted(tmp_path, clock):
+    cache = SharedCache(str(tmp_path), max_entries=2)
+    for age, key in enumerate(['c', 'b', 'a']):
+        cache.set(key, key)
+        # Entries are aged by file modification time; make it independent of the file system's resolution
+        for name in entry_files(cache):
+            path = os.path.join(cache.directory, name)
+            os.utime(path, (os.stat(path).st_mtime - 10, os.stat(path).st_mtime - 10))
+
+    assert len(entry_files(cache)) == 2
+    assert cache.get('c') is None
+    assert cache.get('b') == 'b'
+    assert cache.get('a') == 'a'
+
+
+def test_delete_and_clear(tmp_path, clock):
+    cache = SharedCache(str(tmp_path))
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    cache.delete('a')
+    cache.delete('missing')
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+
+    cache.clear()
+    assert entry_files(cache) == []
+
+
+def test_unserializable_values_and_corrupt_files_are_ignored(tmp_path, clock):
+    cache = SharedCache(str(tmp_path))
+    cache.set('bad', object())
+    assert cache.get('bad') is None
+    assert os.listdir(cache.directory) == []
+
+    cache.set('a', 1)
+    with open(os.path.join(cache.directory, entry_files(cache)[0]), 'w') as f:
+        f.write('{not json')
+    assert cache.get('a') is None
+
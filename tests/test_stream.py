@@ -0,0 +1,19 @@
+import threading
+
+
+def test_streams_beyond_the_cap_are_refused_with_retry_after(client, web, scans, monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(web, 'streamSlots', slots)
+    slots.acquire()
+
+    refused = client.get('/api/v1/GL/stream?since=0')
+    assert refused.status_code == 503
+    assert refused.headers['Retry-After'] == '60'
+
+    slots.release()
+    monkeypatch.setattr(web, 'SSE_STREAM_LIFETIME', 0)
+    stream = client.get('/api/v1/GL/stream?since=0')
+    assert stream.mimetype == 'text/event-stream'
+    assert 'event: update' in stream.get_data(as_text=True)
+    stream.close()
+    assert slots.acquire(blocking=False)
@@ -0,0 +1,43 @@
+import copy
+from datetime import datetime
+
+from src.include.logic.summaryDiffLogic import SummaryDiffLogic
+from src.include.models.countrySummaryModel import CountrySummaryModel
+
+
+def summary():
+    return CountrySummaryModel(
+        'IS', 100, 50, 10, 20,
+        {'22': 5, '80': 3}, {'ssh': 5}, {}, {}, {}, {},
+        ['01-04-2025', '02-04-2025'], [20, 21],
+        datetime(2025, 4, 2)
+    )
+
+
+def test_identical_snapshots_have_no_diff():
+    assert SummaryDiffLogic.diff(summary(), summary()) == {}
+
+
+def test_only_changed_counters_and_breakdowns_are_sent():
+    previous = summary()
+    current = copy.deepcopy(previous)
+    current.total_open_ports = 25
+    current.services_count = {'ssh': 6}
+
+    delta = SummaryDiffLogic.diff(previous, current)
+    assert delta['counters'] == {'total_open_ports': 25}
+    assert delta['breakdowns'] == {'services_count': [['ssh', 6]]}
+    assert 'series' not in delta
+    assert delta['scanned_at'] == '2025-04-02T00:00:00'
+
+
+def test_series_window_moving_forward_is_an_append():
+    previous = [('01', 1), ('02', 2), ('03', 3)]
+    current = [('02', 2), ('03', 3), ('04', 4)]
+    assert SummaryDiffLogic.series_update(previous, current) == {'append': [['04', 4]], 'window': 3}
+
+
+def test_rewritten_series_is_replaced():
+    assert SummaryDiffLogic.series_update([('01', 1)], [('01', 5)]) == {'replace': [['01', 5]]}
+    assert SummaryDiffLogic.series_update(None, [('01', 1)]) == {'replace': [['01', 1]]}
+    assert SummaryDiffLogic.series_update([('01', 1)], [('01', 1)]) is None
@@ -0,0 +1,61 @@
+import hashlib
+import io
+import json
+import os
+
+import pytest
+
+from src.static import build_assets
+from src.static.assets import VENDOR_LOCK, VENDORED
+from src.static.build_assets import vendor_files
+
+PATH, URL = next(iter(VENDORED.items()))
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    """Serve `downloads[URL]` instead of the network; a missing URL fails like an offline host."""
+    served = {}
+
+    def urlopen(url, timeout):
+        if url not in served:
+            raise OSError('offline')
+        return io.BytesIO(served[url])
+
+    monkeypatch.setattr(build_assets.urllib.request, 'urlopen', urlopen)
+    return served
+
+
+def read_lock(static_dir):
+    with open(os.path.join(static_dir, VENDOR_LOCK), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_first_download_is_pinned_and_then_used_offline(tmp_path, downloads):
+    downloads[URL] = b'chart v1'
+    assert vendor_files(str(tmp_path))
+    assert (tmp_path / PATH).read_bytes() == b'chart v1'
+    assert read_lock(str(tmp_path)) == {URL: hashlib.sha256(b'chart v1').hexdigest()}
+
+    del downloads[URL]
+    assert vendor_files(str(tmp_path))
+
+
+def test_download_not_matching_the_pin_is_refused(tmp_path, downloads):
+    downloads[URL] = b'chart v1'
+    vendor_files(str(tmp_path))
+
+    downloads[URL] = b'tampered'
+    assert not vendor_files(str(tmp_path), download=True)
+    assert (tmp_path / PATH).read_bytes() == b'chart v1'
+
+
+def test_edited_vendored_file_fails_the_build(tmp_path, downloads):
+    downloads[URL] = b'chart v1'
+    vendor_files(str(tmp_path))
+    (tmp_path / PATH).write_bytes(b'edited')
+    assert not vendor_files(str(tmp_path))
+
+
+def test_missing_file_without_network_fails_the_build(tmp_path, downloads):
+    assert not vendor_files(str(tmp_path))